@@ -0,0 +1,35 @@
+"""server generated created_at and updated_at
+
+Revision ID: 1f6d3b8a2c47
+Revises: e4a7c2b91f03
+Create Date: 2026-10-19 16:31:24.906115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1f6d3b8a2c47'
+down_revision: Union[str, None] = 'e4a7c2b91f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['archived_records', 'awards', 'blacklisted_tokens', 'blogs', 'categories', 'category_association', 'certifications', 'education', 'experiences', 'files', 'messages', 'profile', 'projects', 'services', 'skills', 'tag_association', 'tags', 'testimonials', 'tokens', 'users']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(timezone=True), server_default=sa.func.now())
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(timezone=True), server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(timezone=True), server_default=None)
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(timezone=True), server_default=None)
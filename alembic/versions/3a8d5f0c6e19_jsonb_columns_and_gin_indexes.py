@@ -0,0 +1,62 @@
+"""store json columns as jsonb with gin indexes on tools and skills
+
+Revision ID: 3a8d5f0c6e19
+Revises: 7c4e1a9f2b68
+Create Date: 2026-10-19 18:37:12.604851
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8d5f0c6e19'
+down_revision: Union[str, None] = '7c4e1a9f2b68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSON_COLUMNS = [
+    ('projects', 'tools'),
+    ('projects', 'features'),
+    ('projects', 'challenges_and_solutions'),
+    ('projects', 'results'),
+    ('projects', 'technical_details'),
+    ('services', 'skills'),
+    ('profile', 'interests'),
+    ('profile', 'hobbies'),
+]
+
+# Expression indexes matching the case insensitive containment filter (json_array_contains)
+GIN_INDEXES = [
+    ('ix_projects_tools_gin', 'projects', 'tools'),
+    ('ix_services_skills_gin', 'services', 'skills'),
+]
+
+
+def upgrade() -> None:
+    # Other backends keep JSON stored as text
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column in JSON_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb')
+
+    for name, table, column in GIN_INDEXES:
+        op.create_index(
+            name, table, [sa.text(f'(lower({column}::text)::jsonb) jsonb_path_ops')],
+            unique=False, postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in reversed(GIN_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    for table, column in JSON_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING {column}::json')
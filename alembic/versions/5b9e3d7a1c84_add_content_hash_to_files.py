@@ -0,0 +1,27 @@
+"""add content_hash to files
+
+Revision ID: 5b9e3d7a1c84
+Revises: e8a4c2f61d39
+Create Date: 2026-10-19 22:06:43.915207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e3d7a1c84'
+down_revision: Union[str, None] = 'e8a4c2f61d39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('files') as batch_op:
+        batch_op.drop_column('content_hash')
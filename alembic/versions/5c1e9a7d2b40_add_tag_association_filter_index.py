@@ -0,0 +1,26 @@
+"""add tag_association (model_type, tag_id, entity_id) index
+
+Revision ID: 5c1e9a7d2b40
+Revises: 84a1337bf5e1
+Create Date: 2026-10-19 09:12:31.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d2b40'
+down_revision: Union[str, None] = '84a1337bf5e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tag_association_model_type_tag_id_entity_id', 'tag_association', ['model_type', 'tag_id', 'entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tag_association_model_type_tag_id_entity_id', table_name='tag_association')
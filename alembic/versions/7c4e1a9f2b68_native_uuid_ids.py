@@ -0,0 +1,113 @@
+"""store ids and id references as native uuid
+
+Revision ID: 7c4e1a9f2b68
+Revises: 1f6d3b8a2c47
+Create Date: 2026-10-19 17:52:40.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e1a9f2b68'
+down_revision: Union[str, None] = '1f6d3b8a2c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['archived_records', 'awards', 'blacklisted_tokens', 'blogs', 'categories', 'category_association', 'certifications', 'education', 'experiences', 'files', 'messages', 'profile', 'projects', 'services', 'skills', 'tag_association', 'tags', 'testimonials', 'tokens', 'users']
+
+# Columns holding the id of another row
+REFERENCES = [
+    ('awards', 'file_id'),
+    ('blacklisted_tokens', 'user_id'),
+    ('category_association', 'entity_id'),
+    ('category_association', 'category_id'),
+    ('certifications', 'issuer_file_id'),
+    ('education', 'file_id'),
+    ('experiences', 'file_id'),
+    ('files', 'model_id'),
+    ('services', 'file_id'),
+    ('skills', 'file_id'),
+    ('tag_association', 'entity_id'),
+    ('tag_association', 'tag_id'),
+    ('tokens', 'user_id'),
+]
+
+COLUMNS = [(table, 'id') for table in TABLES] + REFERENCES
+
+UUID_PATTERN = '^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$'
+
+
+def _foreign_keys(bind):
+    '''Foreign keys between the converted columns. They are dropped while the
+    column types change, as both sides of a key must have the same type.
+    '''
+
+    converted = set(COLUMNS)
+    inspector = sa.inspect(bind)
+
+    return [
+        (table, fk)
+        for table in TABLES
+        for fk in inspector.get_foreign_keys(table)
+        if any((table, column) in converted for column in fk['constrained_columns'])
+    ]
+
+
+def _check_values():
+    '''Refuses to convert when a column holds a value that is not a UUID'''
+
+    bind = op.get_bind()
+    invalid = []
+
+    for table, column in COLUMNS:
+        count = bind.execute(sa.text(
+            f'SELECT count(*) FROM {table} WHERE {column} IS NOT NULL AND {column} !~ :pattern'
+        ), {'pattern': UUID_PATTERN}).scalar()
+
+        if count:
+            invalid.append(f'{table}.{column} ({count} rows)')
+
+    if invalid:
+        raise RuntimeError(
+            'Cannot convert ids to uuid, these columns hold values that are not UUIDs: '
+            + ', '.join(invalid)
+        )
+
+
+def _convert(type_: str, using: str):
+    bind = op.get_bind()
+    foreign_keys = _foreign_keys(bind)
+
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    for table, column in COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_} USING {using.format(column=column)}')
+
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+        )
+
+
+def upgrade() -> None:
+    # Other backends keep storing ids as text: HexUUID normalizes them to 32 hex digits
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    _check_values()
+    _convert('uuid', '{column}::uuid')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Back to the 32 hex digit form the ids had as strings
+    _convert('varchar', "replace({column}::text, '-', '')")
@@ -0,0 +1,48 @@
+"""add composite and partial indexes for hot query shapes
+
+Revision ID: 9b3f2c6d1a57
+Revises: 5c1e9a7d2b40
+Create Date: 2026-10-19 11:40:07.523914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f2c6d1a57'
+down_revision: Union[str, None] = '5c1e9a7d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_ROWS = dict(
+    postgresql_where=sa.text('is_deleted = false'),
+    sqlite_where=sa.text('is_deleted = 0'),
+)
+
+PARTIAL_INDEXES = [
+    ('ix_projects_position_active', 'projects', ['position']),
+    ('ix_services_position_active', 'services', ['position']),
+    ('ix_skills_position_active', 'skills', ['position']),
+    ('ix_certifications_position_active', 'certifications', ['position']),
+    ('ix_files_model_name_model_id_position_active', 'files', ['model_name', 'model_id', 'position']),
+    ('ix_tag_association_entity_id_model_type_active', 'tag_association', ['entity_id', 'model_type']),
+    ('ix_category_association_entity_id_model_type_active', 'category_association', ['entity_id', 'model_type']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in PARTIAL_INDEXES:
+        op.create_index(name, table, columns, unique=False, **ACTIVE_ROWS)
+
+    op.create_index('ix_tokens_user_id_token_type', 'tokens', ['user_id', 'token_type'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tokens_user_id_token_type', table_name='tokens')
+
+    for name, table, _ in reversed(PARTIAL_INDEXES):
+        op.drop_index(name, table_name=table, **ACTIVE_ROWS)
@@ -0,0 +1,89 @@
+"""unique live tags and tag/category associations
+
+Revision ID: b6e2d8c4f917
+Revises: 3a8d5f0c6e19
+Create Date: 2026-10-19 19:14:55.271930
+
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d8c4f917'
+down_revision: Union[str, None] = '3a8d5f0c6e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_ROWS = dict(
+    postgresql_where=sa.text('is_deleted = false'),
+    sqlite_where=sa.text('is_deleted = 0'),
+)
+
+UNIQUE_INDEXES = [
+    ('ix_tags_model_type_name_active', 'tags', ['model_type', 'name']),
+    ('ix_tag_association_model_type_tag_id_entity_id_active', 'tag_association', ['model_type', 'tag_id', 'entity_id']),
+    ('ix_category_association_model_type_category_id_entity_id_active', 'category_association', ['model_type', 'category_id', 'entity_id']),
+]
+
+
+def _duplicates(bind, table: str, columns: list):
+    '''Ids of the live rows of `table` repeating an earlier row's `columns`, with the id of that earlier row'''
+
+    rows = bind.execute(sa.text(
+        f'SELECT id, {", ".join(columns)} FROM {table} WHERE is_deleted = :false ORDER BY created_at, id'
+    ), {'false': False}).all()
+
+    groups = defaultdict(list)
+    for row in rows:
+        groups[tuple(row[1:])].append(row[0])
+
+    return [(ids[0], duplicate) for ids in groups.values() for duplicate in ids[1:]]
+
+
+def _soft_delete(bind, table: str, ids: list):
+    for id in ids:
+        bind.execute(
+            sa.text(f'UPDATE {table} SET is_deleted = :true, deleted_at = :now WHERE id = :id'),
+            {'true': True, 'now': datetime.now(timezone.utc), 'id': id},
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Merge duplicate tags into the oldest one before associations are deduplicated
+    tag_duplicates = _duplicates(bind, 'tags', ['model_type', 'name'])
+    for keep, duplicate in tag_duplicates:
+        bind.execute(
+            sa.text('UPDATE tag_association SET tag_id = :keep WHERE tag_id = :duplicate'),
+            {'keep': keep, 'duplicate': duplicate},
+        )
+    _soft_delete(bind, 'tags', [duplicate for _, duplicate in tag_duplicates])
+
+    for table, columns in (
+        ('tag_association', ['model_type', 'tag_id', 'entity_id']),
+        ('category_association', ['model_type', 'category_id', 'entity_id']),
+    ):
+        _soft_delete(bind, table, [duplicate for _, duplicate in _duplicates(bind, table, columns)])
+
+    # Replaced by the unique partial index over the same columns
+    op.drop_index('ix_tag_association_model_type_tag_id_entity_id', table_name='tag_association')
+
+    for name, table, columns in UNIQUE_INDEXES:
+        op.create_index(name, table, columns, unique=True, **ACTIVE_ROWS)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(UNIQUE_INDEXES):
+        op.drop_index(name, table_name=table, **ACTIVE_ROWS)
+
+    op.create_index(
+        'ix_tag_association_model_type_tag_id_entity_id', 'tag_association',
+        ['model_type', 'tag_id', 'entity_id'], unique=False,
+    )
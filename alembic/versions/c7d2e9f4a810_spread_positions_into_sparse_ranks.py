@@ -0,0 +1,62 @@
+"""spread positions into sparse ranks
+
+Revision ID: c7d2e9f4a810
+Revises: 5b9e3d7a1c84
+Create Date: 2026-10-19 23:41:08.602514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9f4a810'
+down_revision: Union[str, None] = '5b9e3d7a1c84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match BaseTableModel.POSITION_GAP
+POSITION_GAP = 1024
+
+# Tables clients reorder, with the columns partitioning their positions
+ORDERED_TABLES = [
+    ('blogs', []),
+    ('certifications', []),
+    ('projects', []),
+    ('services', []),
+    ('skills', []),
+    ('testimonials', []),
+    ('files', ['model_name', 'model_id']),
+]
+
+
+def _spread(bind, table: str, scope: list, gap: int):
+    '''Sets the position of each live row of `table` to its place in its scope times `gap`, in one UPDATE
+    (the same statement as BaseTableModel.rebalance_positions, run over every scope at once)
+    '''
+
+    partition = f'PARTITION BY {", ".join(scope)} ' if scope else ''
+    bind.execute(sa.text(
+        f'UPDATE {table} SET position = ranked.ordinal * :gap FROM ('
+        f'SELECT id, row_number() OVER ({partition}ORDER BY position, id) AS ordinal '
+        f'FROM {table} WHERE is_deleted = :false'
+        f') AS ranked WHERE {table}.id = ranked.id'
+    ), {'gap': gap, 'false': False})
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Positions were dense (1, 2, 3, ...), which leaves no room for a move between two rows
+    for table, scope in ORDERED_TABLES:
+        _spread(bind, table, scope, POSITION_GAP)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    for table, scope in ORDERED_TABLES:
+        _spread(bind, table, scope, 1)
@@ -0,0 +1,43 @@
+"""add token_digest to blacklisted_tokens
+
+Revision ID: d3f91b7a5c20
+Revises: b6e2d8c4f917
+Create Date: 2026-10-19 19:58:31.840262
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f91b7a5c20'
+down_revision: Union[str, None] = 'b6e2d8c4f917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blacklisted_tokens', sa.Column('token_digest', sa.String(length=64), nullable=True))
+
+    # Backfill the sha256 digests of the tokens already blacklisted
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT id, token FROM blacklisted_tokens')).all()
+    for id, token in rows:
+        bind.execute(
+            sa.text('UPDATE blacklisted_tokens SET token_digest = :digest WHERE id = :id'),
+            {'digest': hashlib.sha256(token.encode()).hexdigest(), 'id': id},
+        )
+
+    op.create_index(op.f('ix_blacklisted_tokens_token_digest'), 'blacklisted_tokens', ['token_digest'], unique=False)
+    op.create_index('ix_blacklisted_tokens_created_at', 'blacklisted_tokens', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blacklisted_tokens_created_at', table_name='blacklisted_tokens')
+    op.drop_index(op.f('ix_blacklisted_tokens_token_digest'), table_name='blacklisted_tokens')
+
+    with op.batch_alter_table('blacklisted_tokens') as batch_op:
+        batch_op.drop_column('token_digest')
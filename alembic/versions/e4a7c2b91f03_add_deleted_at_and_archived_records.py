@@ -0,0 +1,58 @@
+"""add deleted_at and archived_records table
+
+Revision ID: e4a7c2b91f03
+Revises: 9b3f2c6d1a57
+Create Date: 2026-10-19 14:05:52.187340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2b91f03'
+down_revision: Union[str, None] = '9b3f2c6d1a57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['awards', 'blacklisted_tokens', 'blogs', 'categories', 'category_association', 'certifications', 'education', 'experiences', 'files', 'messages', 'profile', 'projects', 'services', 'skills', 'tag_association', 'tags', 'testimonials', 'tokens', 'users']
+
+
+def upgrade() -> None:
+    op.create_table('archived_records',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('record_id', sa.String(), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('unique_id', sa.String(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_archived_records_id'), 'archived_records', ['id'], unique=False)
+    op.create_index(op.f('ix_archived_records_unique_id'), 'archived_records', ['unique_id'], unique=False)
+    op.create_index('ix_archived_records_table_name_record_id', 'archived_records', ['table_name', 'record_id'], unique=False)
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Rows deleted before deleted_at existed start their retention window now
+    for table in TABLES:
+        op.execute(sa.text(f'UPDATE {table} SET deleted_at = CURRENT_TIMESTAMP WHERE is_deleted = true'))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, 'deleted_at')
+
+    op.drop_index('ix_archived_records_table_name_record_id', table_name='archived_records')
+    op.drop_index(op.f('ix_archived_records_unique_id'), table_name='archived_records')
+    op.drop_index(op.f('ix_archived_records_id'), table_name='archived_records')
+    op.drop_table('archived_records')
@@ -0,0 +1,57 @@
+"""add expiry_time to blacklisted_tokens and index token expiry
+
+Revision ID: e8a4c2f61d39
+Revises: d3f91b7a5c20
+Create Date: 2026-10-19 20:41:07.318524
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from jose import JWTError, jwt
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a4c2f61d39'
+down_revision: Union[str, None] = 'd3f91b7a5c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _expiry_time(token: str):
+    '''Naive UTC expiry of a JWT, from its unverified `exp` claim'''
+
+    try:
+        exp = jwt.get_unverified_claims(token).get('exp')
+    except JWTError:
+        return None
+    if exp is None:
+        return None
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+def upgrade() -> None:
+    op.add_column('blacklisted_tokens', sa.Column('expiry_time', sa.DateTime(), nullable=True))
+
+    # Backfill the expiry of the tokens already blacklisted. Entries whose token
+    # cannot be decoded expire with their creation, so the next purge removes them.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT id, token, created_at FROM blacklisted_tokens')).all()
+    for id, token, created_at in rows:
+        bind.execute(
+            sa.text('UPDATE blacklisted_tokens SET expiry_time = :expiry_time WHERE id = :id'),
+            {'expiry_time': _expiry_time(token) or created_at, 'id': id},
+        )
+
+    op.create_index(op.f('ix_blacklisted_tokens_expiry_time'), 'blacklisted_tokens', ['expiry_time'], unique=False)
+    op.create_index(op.f('ix_tokens_expiry_time'), 'tokens', ['expiry_time'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tokens_expiry_time'), table_name='tokens')
+    op.drop_index(op.f('ix_blacklisted_tokens_expiry_time'), table_name='blacklisted_tokens')
+
+    with op.batch_alter_table('blacklisted_tokens') as batch_op:
+        batch_op.drop_column('expiry_time')
@@ -1,37 +1,105 @@
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 import sqlalchemy as sa
-from sqlalchemy.orm import Session, class_mapper
-from uuid import uuid4
-from fastapi import HTTPException
-from sqlalchemy.ext.hybrid import hybrid_property
-from inspect import getmembers
-
-from api.db.database import Base
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, class_mapper, load_only, joinedload, selectinload
+from fastapi import BackgroundTasks, HTTPException
+
+from api.core.base.identifiers import classify_identifier, generate_id, identifier_map, parse_id
+from api.core.base.serializer import FieldSelection, get_serializer_plan
+from api.db.database import Base, get_db_with_ctx_manager
+from api.db.types import HexUUID
 from api.utils import helpers
 from api.utils.loggers import create_logger
 
 
 logger = create_logger(__name__)
 
+def active_index(name: str, *columns: str, unique: bool = False) -> sa.Index:
+    """Partial index over the rows that are not soft deleted (`WHERE is_deleted = false`).
+    List and lookup queries always filter on `is_deleted == False`, so the index only
+    holds the rows those queries can return. A unique one only constrains live rows.
+    """
+    
+    return sa.Index(
+        name, *columns,
+        unique=unique,
+        postgresql_where=sa.text('is_deleted = false'),
+        sqlite_where=sa.text('is_deleted = 0'),
+    )
+
+
+def json_array_index(name: str, column: str) -> sa.Index:
+    """GIN index over the lower cased JSON array in `column` (PostgreSQL only).
+    Serves the case insensitive containment filters built with `json_array_contains`.
+    """
+    
+    return sa.Index(
+        name, sa.text(f'(lower({column}::text)::jsonb) jsonb_path_ops'),
+        postgresql_using='gin',
+    ).ddl_if(dialect='postgresql')
+
+
 class BaseTableModel(Base):
     """This model creates helper methods for all models"""
 
     __abstract__ = True
+    
+    # Server generated values (timestamps, server defaults) are fetched with
+    # RETURNING as part of the INSERT/UPDATE instead of a refresh afterwards
+    __mapper_args__ = {'eager_defaults': True}
 
     # Add flag to skip logging dynamically
     _disable_activity_logging = False
     
-    id = sa.Column(sa.String, primary_key=True, index=True, default=lambda: str(uuid4().hex))
+    # Fields that are never included in `to_dict`
+    _serializer_excludes: tuple = ()
+    
+    # Relationships clients can expand with `include=`. Relationships are
+    # lazy by default and only eager loaded when included.
+    _includable_relationships: tuple = ()
+    
+    # Columns whose value counts are served as facets (see FacetService)
+    _facet_columns: tuple = ()
+    
+    # Columns that partition `position`, eg. files are ordered per entity
+    _position_scope: tuple = ()
+    
+    # Whether clients order these rows (reorder and PATCH `position`). Their
+    # `position` is then served as the 1 based place of the row in its scope,
+    # the same index PATCH takes, instead of its sparse rank.
+    _ordered: bool = False
+    _ordinal: Optional[int] = None
+    
+    # `position` holds sparse ranks, POSITION_GAP apart after a rebalance
+    POSITION_GAP = 1024
+    # Gap size below which a move schedules a rebalance in the background
+    POSITION_REBALANCE_THRESHOLD = 8
+    
+    # Whether soft deleted rows are copied to `archived_records` before they
+    # are purged (see ArchiveService). Plain link tables are purged outright.
+    _archive_deleted: bool = True
+    
+    # FeatureCaches (api/utils/cache.py) serving this model's rows, cleared when a
+    # row changes outside the routes that own them (eg. a restore). Defaults to
+    # the table name; see `cache_names` for caches that depend on the row.
+    _cache_names: Optional[tuple] = None
+    
+    # Time ordered (UUIDv7), so inserts append to the primary key index instead of
+    # landing on random pages. Stored as a native uuid on PostgreSQL.
+    id = sa.Column(HexUUID, primary_key=True, index=True, default=generate_id)
     unique_id = sa.Column(sa.String, nullable=True, index=True, default=lambda: helpers.generate_unique_id())
     position = sa.Column(sa.Integer, nullable=False, default=0)
     is_deleted = sa.Column(sa.Boolean, default=False)
-    created_at = sa.Column(sa.DateTime(timezone=True), default=datetime.now(timezone.utc))
-    updated_at = sa.Column(sa.DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    deleted_at = sa.Column(sa.DateTime(timezone=True), nullable=True)
+    created_at = sa.Column(sa.DateTime(timezone=True), server_default=sa.func.now())
+    updated_at = sa.Column(sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now())
 
     
-    def to_dict(self, excludes: List[str] = [], visited=None) -> Dict[str, Any]:
-        """Returns a dictionary representation of the instance"""
+    def to_dict(self, excludes: List[str] = [], visited=None, selection: Optional[FieldSelection] = None) -> Dict[str, Any]:
+        """Returns a dictionary representation of the instance.\n
+        If `selection` is provided, only its fields and included relationships are returned.
+        """
         
         # Preventing recursion error
         if visited is None:
@@ -43,29 +111,63 @@ class BaseTableModel(Base):
 
         visited.add(self.id)
         
-        obj_dict = self.__dict__.copy()
+        return get_serializer_plan(type(self)).serialize(self, excludes=excludes, visited=visited, selection=selection)
+    
+    @classmethod
+    def resolve_selection(cls, fields: Optional[str] = None, include: Optional[str] = None) -> FieldSelection:
+        """Parses the comma separated `fields` and `include` query parameters.\n
+        Includable relationships listed in `fields` are included as well.
+        Raises a 400 error if any of the names is not exposed by the model.
+        """
+        
+        plan = get_serializer_plan(cls)
+        field_list = helpers.parse_csv(fields)
+        include_list = helpers.parse_csv(include)
         
-        del obj_dict["_sa_instance_state"]
-        del obj_dict["is_deleted"]
-        obj_dict["id"] = self.id
+        invalid_fields = [field for field in field_list if field not in plan.fields]
+        invalid_fields += [key for key in include_list if key not in plan.includable]
         
-        if self.created_at:
-            obj_dict["created_at"] = self.created_at.isoformat()
-        if self.updated_at:
-            obj_dict["updated_at"] = self.updated_at.isoformat()
-            
-        # Get hybrid properties
-        for name, attr in getmembers(self):
-            if isinstance(attr, hybrid_property):
-                obj_dict[name] = getattr(self, name)
-                
-        # Exclude specified fields
-        for exclude in excludes:
-            if exclude in list(obj_dict.keys()):
-                # for exclude in excludes:
-                obj_dict.pop(exclude, None)
-            
-        return obj_dict
+        if invalid_fields:
+            raise HTTPException(status_code=400, detail=f"Invalid field(s) for `{cls.__tablename__}`: {', '.join(invalid_fields)}")
+        
+        include_list += [field for field in field_list if field in plan.includable and field not in include_list]
+        
+        return FieldSelection(
+            fields=field_list or None,
+            include=include_list,
+            omit=[key for key in plan.includable if key not in include_list]
+        )
+    
+    @classmethod
+    def full_selection(cls) -> FieldSelection:
+        """Selection of every field with every includable relationship expanded"""
+        
+        return FieldSelection(include=list(get_serializer_plan(cls).includable))
+    
+    @classmethod
+    def apply_selection(cls, query, selection: Optional[FieldSelection] = None):
+        """Restricts the columns selected by `query` to the selection's fields
+        and eager loads its included relationships.
+        """
+        
+        if selection is None:
+            return query
+        
+        options = []
+        
+        if selection.fields:
+            plan = get_serializer_plan(cls)
+            options.append(load_only(*[
+                getattr(cls, key) for key in plan.columns
+                if key in selection.fields or key == 'id'
+            ]))
+        
+        for key in selection.include:
+            relationship = getattr(cls, key)
+            # Collections are loaded with one extra SELECT ... IN, single objects are joined in
+            options.append(selectinload(relationship) if relationship.property.uselist else joinedload(relationship))
+        
+        return query.options(*options) if options else query
     
     @classmethod
     def load_properties(cls, db: Session, objects: list):
@@ -74,23 +176,143 @@ class BaseTableModel(Base):
         Must NOT do per-object DB calls.
         """
         
-        pass
+        cls.load_ordinals(db, objects)
+    
+    @classmethod
+    def load_ordinals(cls, db: Session, objects: list):
+        """Sets `_ordinal` on `objects` and on the ordered rows already loaded in
+        their relationships, with one query per ordered model.
+        """
+        
+        objects = [obj for obj in objects if obj is not None]
+        if not objects:
+            return
+        
+        if cls._ordered:
+            cls._set_ordinals(db, objects)
+        
+        for relationship in sa.inspect(cls).relationships:
+            target = relationship.mapper.class_
+            if not getattr(target, '_ordered', False):
+                continue
+            
+            related = []
+            for obj in objects:
+                value = obj.__dict__.get(relationship.key)
+                if isinstance(value, (list, set, tuple)):
+                    related.extend(value)
+                elif value is not None:
+                    related.append(value)
+            
+            if related:
+                target._set_ordinals(db, related)
+    
+    @classmethod
+    def _set_ordinals(cls, db: Session, objects: list):
+        """Sets `_ordinal` on `objects` from a row_number() over their scopes"""
+        
+        if db.dirty:
+            # Pending ranks, eg. from a move with commit=False, must be numbered too
+            db.flush()
+        
+        ranked = db.query(
+            cls.id,
+            sa.func.row_number().over(
+                partition_by=[getattr(cls, field) for field in cls._position_scope] or None,
+                order_by=(cls.position, cls.id),
+            ).label('ordinal'),
+        ).filter(cls.is_deleted == False)
+        
+        if cls._position_scope and all(
+            field in obj.__dict__ for obj in objects for field in cls._position_scope
+        ):
+            # Only number the scopes the objects belong to
+            scopes = {tuple(obj.__dict__[field] for field in cls._position_scope) for obj in objects}
+            ranked = ranked.filter(sa.or_(*[
+                sa.and_(*cls._scope_filters(dict(zip(cls._position_scope, scope))))
+                for scope in scopes
+            ]))
+        
+        ranked = ranked.subquery()
+        ordinals = dict(
+            db.query(ranked.c.id, ranked.c.ordinal)
+            .filter(ranked.c.id.in_({obj.id for obj in objects}))
+            .all()
+        )
+        
+        for obj in objects:
+            obj._ordinal = ordinals.get(obj.id)
 
 
     @classmethod
     def create(cls, db: Session, commit: bool = True, **kwargs):
-        """Creates a new instance of the model"""
+        """Creates a new instance of the model.\n
+        With `commit=False` the row is only flushed, eg. inside a `unit_of_work`.
+        """
         
         obj = cls(**kwargs)
         db.add(obj)
         if commit:
             db.commit()
-            db.refresh(obj)
+        else:
+            db.flush()
         
         if hasattr(cls, "load_properties"):
             cls.load_properties(db, [obj])
             
         return obj
+    
+    def cache_names(self) -> List[str]:
+        """Names of the FeatureCaches that can hold this row or data derived from it"""
+        
+        return list(self._cache_names) if self._cache_names is not None else [self.__tablename__]
+    
+    @classmethod
+    def insert_missing(cls, db: Session, rows: List[Dict[str, Any]], conflict_columns: tuple, active_only: bool = False):
+        """Inserts `rows` in a single statement, skipping those that conflict with an
+        existing row on the unique index over `conflict_columns` (`ON CONFLICT DO NOTHING`).\n
+        Set `active_only` when that index is partial over the rows that are not soft deleted.
+        Nothing is committed, so it can share a transaction with the statements around it.\n
+        Backends without `ON CONFLICT` select the keys that already exist and insert the
+        other rows, in the same transaction.
+        """
+        
+        if not rows:
+            return
+        
+        dialect = db.get_bind().dialect.name
+        insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(dialect)
+        if insert is None:
+            cls._insert_missing_by_select(db, rows, conflict_columns, active_only)
+            return
+        
+        statement = insert(cls).on_conflict_do_nothing(
+            index_elements=list(conflict_columns),
+            index_where=(cls.is_deleted == False) if active_only else None,
+        )
+        db.execute(statement, rows)
+    
+    @classmethod
+    def _insert_missing_by_select(cls, db: Session, rows: List[Dict[str, Any]], conflict_columns: tuple, active_only: bool):
+        columns = [getattr(cls, column) for column in conflict_columns]
+        
+        query = db.query(*columns).filter(sa.or_(*(
+            sa.and_(*(column == row[column.key] for column in columns)) for row in rows
+        )))
+        if active_only:
+            query = query.filter(cls.is_deleted == False)
+        
+        existing = {tuple(key) for key in query}
+        
+        # Also drops rows repeated within `rows`, which would conflict with each other
+        missing = {}
+        for row in rows:
+            key = tuple(row[column] for column in conflict_columns)
+            if key not in existing:
+                missing.setdefault(key, row)
+        
+        if missing:
+            db.execute(sa.insert(cls), list(missing.values()))
 
     @classmethod
     def all(
@@ -133,27 +355,54 @@ class BaseTableModel(Base):
          
     
     @classmethod
-    def fetch_by_id(cls, db: Session, id: str, error_message: Optional[str] = None):
-        """Fetches a single instance by ID. (ignores soft-deleted records).\n
-        If checking by ID fails, it checks by unique id before then throwing an error if it fails.
+    def fetch_by_id(cls, db: Session, id: str, error_message: Optional[str] = None, selection: Optional[FieldSelection] = None):
+        """Fetches a single instance by ID, unique id or slug (ignores soft-deleted records).\n
+        The identifier's shape decides which column is looked up, so a lookup is a single query.
+        Unique ids and slugs resolved before are fetched by primary key through `identifier_map`.
+        Raises a 404 error if no record matches.
         """
         
-        query = db.query(cls).filter(
-            cls.is_deleted == False,
-            sa.or_(
-                cls.id == id,
-                cls.unique_id == id,
-            )
-        )
+        kind = classify_identifier(id)
+        if kind == 'id':
+            # Clients often send the hyphenated or upper case form
+            id = parse_id(id)
         
-        obj = query.first()
+        if kind == 'slug' and not hasattr(cls, 'slug'):
+            # Not a shape this model generates, it can only be a unique id
+            column = cls.unique_id == id
+        else:
+            column = getattr(cls, kind) == id
+        
+        # Only unique ids and slugs are mapped, ids already are primary keys
+        use_map = kind != 'id' and hasattr(cls, kind)
+        
+        obj = None
+        pk = identifier_map.get(cls.__tablename__, id) if use_map else None
         
-        if obj is None and hasattr(cls, "slug"):
-            obj = db.query(cls).filter_by(slug=id, is_deleted=False).first()
+        if pk is not None:
+            row = cls.apply_selection(db.query(cls), selection).add_columns(getattr(cls, kind)).filter(
+                cls.id == pk,
+                cls.is_deleted == False,
+            ).first()
             
+            if row is not None and row[1] == id:
+                obj = row[0]
+            else:
+                # Deleted, or its unique id/slug changed since it was mapped
+                identifier_map.discard(cls.__tablename__, id)
+        
+        if obj is None:
+            obj = cls.apply_selection(db.query(cls), selection).filter(
+                cls.is_deleted == False,
+                column,
+            ).first()
+        
             if obj is None:
                 raise HTTPException(status_code=404, detail=error_message or f"Record not found in table `{cls.__tablename__}`")
             
+            if use_map:
+                identifier_map.set(cls.__tablename__, id, obj.id)
+            
         if hasattr(cls, "load_properties"):
             cls.load_properties(db, [obj])
             
@@ -219,13 +468,15 @@ class BaseTableModel(Base):
         ignore_none_kwarg: bool = True,
         paginate: bool = True,
         filter_expr=None,
+        selection: Optional[FieldSelection] = None,
         **kwargs
     ):
         """
         Fetches all records that match the given field(s), supporting complex SQLAlchemy filter expressions
         such as and_(), or_(), etc. via the filter_expr argument.
+        `selection` restricts the selected columns and eager loads relationships (see `apply_selection`).
         """
-        query = db.query(cls)
+        query = cls.apply_selection(db.query(cls), selection)
 
         # Handle is_deleted logic
         if not show_deleted and hasattr(cls, "is_deleted"):
@@ -271,7 +522,10 @@ class BaseTableModel(Base):
 
     @classmethod
     def update(cls, db: Session, id: str, commit: bool = True, error_message: Optional[str] = None, **kwargs):
-        """Updates an instance with the given ID"""
+        """Updates an instance with the given ID.\n
+        With `commit=False` the changes are left pending, eg. inside a `unit_of_work`,
+        so they are written together with the other changes to the row.
+        """
         
         obj = cls.fetch_by_id(db=db, id=id, error_message=error_message)
         
@@ -280,7 +534,6 @@ class BaseTableModel(Base):
         
         if commit:
             db.commit()
-            db.refresh(obj)
             
         if hasattr(cls, "load_properties"):
             cls.load_properties(db, [obj])
@@ -294,6 +547,7 @@ class BaseTableModel(Base):
         
         obj = cls.fetch_by_id(db=db, id=id, error_message=error_message)
         obj.is_deleted = True
+        obj.deleted_at = datetime.now(timezone.utc)
         if commit:
             db.commit()
             
@@ -368,40 +622,179 @@ class BaseTableModel(Base):
 
 
     @classmethod
-    def move_to_position(cls, db: Session, id: str, new_position: int):
-        # Get the obj to move
-        obj = cls.fetch_by_id(db, id)
+    def _scope_filters(cls, scope: Dict[str, Any]) -> list:
+        """Filters on the position scope fields given in `scope`. None is a scope of its own
+        (eg. files with no model_id), matched with IS NULL.
+        """
+        
+        return [
+            getattr(cls, field).is_(None) if scope[field] is None else getattr(cls, field) == scope[field]
+            for field in cls._position_scope if field in scope
+        ]
+    
+    @classmethod
+    def _position_query(cls, db: Session, *entities, **scope):
+        """Query over the live rows sharing a position scope (see `_position_scope`).\n
+        Scope fields that are not given are not filtered on.
+        """
+        
+        query = db.query(*entities) if entities else db.query(cls)
+        return query.filter(cls.is_deleted == False, *cls._scope_filters(scope))
+    
+    @classmethod
+    def _rank_between(cls, before: Optional[int], after: Optional[int]) -> Optional[int]:
+        """Returns a rank strictly between `before` and `after`, or None if there is no gap left"""
+        
+        if after is None:
+            return (before or 0) + cls.POSITION_GAP
+        
+        before = before or 0
+        rank = (before + after) // 2
+        return rank if before < rank < after else None
+    
+    @classmethod
+    def _neighbour_ranks(cls, db: Session, obj, index: int, scope: Dict[str, Any]):
+        """Ranks of the rows that would sit before and after `obj` at zero based `index`"""
+        
+        siblings = cls._position_query(db, cls.position, **scope).filter(cls.id != obj.id)
+        ranks = [
+            rank for rank, in siblings
+            .order_by(cls.position, cls.id)
+            .offset(max(index - 1, 0))
+            .limit(2 if index else 1)
+        ]
+        
+        if index == 0:
+            return None, ranks[0] if ranks else None
+        
+        if not ranks:
+            # Past the end of the list
+            return siblings.with_entities(sa.func.max(cls.position)).scalar(), None
+        
+        return ranks[0], ranks[1] if len(ranks) > 1 else None
 
-        current_position = obj.position
+    @classmethod
+    def move_to_position(
+        cls,
+        db: Session,
+        id: str,
+        new_position: int,
+        bg_tasks: Optional[BackgroundTasks] = None,
+        commit: bool = True,
+    ):
+        """Moves an object to `new_position` (1 based) among the live rows of its scope.\n
+        Only the moved row is updated: it gets a rank halfway between its new neighbours.
+        When the gap is used up the scope is rebalanced first. When it is getting small and
+        `bg_tasks` is given, the rebalance is scheduled to run after the response.
+        With `commit=False` the new rank is left pending, like in `update`.
+        """
+        
+        obj = cls.fetch_by_id(db, id)
+        scope = {field: getattr(obj, field) for field in cls._position_scope}
+        index = max(new_position, 1) - 1
 
-        if new_position == current_position:
+        before, after = cls._neighbour_ranks(db, obj, index, scope)
+        
+        if (before is None or before < obj.position) and (after is None or obj.position < after):
             return  # No change needed
+        
+        rank = cls._rank_between(before, after)
+        if rank is None:
+            cls.rebalance_positions(db, commit=False, **scope)
+            before, after = cls._neighbour_ranks(db, obj, index, scope)
+            rank = cls._rank_between(before, after)
 
-        # Shift positions of other objs accordingly
-        if new_position < current_position:
-            # Moving up: shift others down
-            db.query(cls).filter(
-                cls.position >= new_position,
-                cls.position < current_position,
-                cls.id != obj.id
-            ).update({cls.position: cls.position + 1}, synchronize_session="fetch")
-        else:
-            # Moving down: shift others up
-            db.query(cls).filter(
-                cls.position <= new_position,
-                cls.position > current_position,
-                cls.id != obj.id
-            ).update({cls.position: cls.position - 1}, synchronize_session="fetch")
-
-        # Set new position for the dragged obj
-        obj.position = new_position
-        db.commit()
-        db.refresh(obj)
+        obj.position = rank
+        if commit:
+            db.commit()
+        
+        if bg_tasks and min(
+            rank - (before or 0),
+            (after - rank) if after is not None else cls.POSITION_GAP
+        ) < cls.POSITION_REBALANCE_THRESHOLD:
+            bg_tasks.add_task(cls.rebalance_positions_in_background, **scope)
         
         if hasattr(cls, "load_properties"):
             cls.load_properties(db, [obj])
+    
+    @classmethod
+    def rebalance_positions(cls, db: Session, commit: bool = True, **scope):
+        """Spreads the ranks of the live rows in a scope POSITION_GAP apart, keeping their order, in one UPDATE"""
+        
+        ranked = cls._position_query(
+            db, cls.id,
+            sa.func.row_number().over(order_by=(cls.position, cls.id)).label('row_number'),
+            **scope
+        ).subquery()
+        
+        db.execute(
+            sa.update(cls)
+            .where(cls.id == ranked.c.id)
+            .values(position=ranked.c.row_number * cls.POSITION_GAP)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if commit:
+            db.commit()
+    
+    @classmethod
+    def rebalance_positions_in_background(cls, **scope):
+        """Runs `rebalance_positions` in its own session, eg. from a background task"""
+        
+        with get_db_with_ctx_manager() as db:
+            cls.rebalance_positions(db, **scope)
+        
+        logger.info(f'Rebalanced positions on table {cls.__tablename__} {scope or ""}')
+    
+    @classmethod
+    def reorder(cls, db: Session, ids: List[str], commit: bool = True):
+        """Applies a full ordering with a single UPDATE.\n
+        `ids` must list every live row of one position scope, first to last.
+        Returns the scope that was reordered.
+        """
+        
+        if len(set(ids)) != len(ids):
+            raise HTTPException(400, 'Ordering contains duplicate ids')
+        
+        if not ids and cls._position_scope:
+            # The scope is read from the rows, an empty ordering has none
+            raise HTTPException(400, f'Ordering must list the {cls.__tablename__} of one {"/".join(cls._position_scope)}')
+        
+        scope_columns = [getattr(cls, field) for field in cls._position_scope]
+        rows = cls._position_query(db, cls.id, *scope_columns).filter(cls.id.in_(ids)).all()
+        
+        if len(rows) != len(ids):
+            raise HTTPException(404, f'Some {cls.__tablename__} in the ordering were not found')
+        
+        scopes = {tuple(row[1:]) for row in rows}
+        if len(scopes) > 1:
+            raise HTTPException(400, f'Ordering mixes {cls.__tablename__} from different scopes')
+        
+        scope = dict(zip(cls._position_scope, scopes.pop() if scopes else ()))
+        total = cls._position_query(db, sa.func.count(cls.id), **scope).scalar()
+        if total != len(ids):
+            raise HTTPException(400, f'Ordering must list all {total} {cls.__tablename__}')
+        
+        if ids:
+            db.query(cls).filter(cls.id.in_(ids)).update(
+                {cls.position: sa.case(
+                    {id: (index + 1) * cls.POSITION_GAP for index, id in enumerate(ids)},
+                    value=cls.id
+                )},
+                synchronize_session=False
+            )
+        
+        if commit:
+            db.commit()
+        
+        return scope
 
-
     @classmethod
-    def get_max_position(cls, db: Session):
-        return db.query(sa.func.max(cls.position)).scalar() or 0
+    def get_max_position(cls, db: Session, **scope):
+        return cls._position_query(db, sa.func.max(cls.position), **scope).scalar() or 0
+    
+    @classmethod
+    def next_position(cls, db: Session, **scope) -> int:
+        """Rank for a row appended to the end of its scope"""
+        
+        return cls.get_max_position(db, **scope) + cls.POSITION_GAP
@@ -0,0 +1,155 @@
+import os
+import re
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+# `id` defaults to generate_id() (a UUIDv7 as 32 hex digits) and `unique_id` to
+# helpers.generate_unique_id() (three upper case letters followed by digits).
+# Slugs are lower case.
+ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+UNIQUE_ID_PATTERN = re.compile(r'^[A-Z]{3}[0-9]+$')
+
+
+def parse_id(value) -> Optional[str]:
+    """Returns `value` as 32 lower case hex digits when it is a UUID in any of its
+    usual spellings (hex, hyphenated, braced, upper case), else None
+    """
+
+    try:
+        return uuid.UUID(str(value)).hex
+    except ValueError:
+        return None
+
+
+def classify_identifier(identifier: str) -> str:
+    """Returns which column `identifier` can belong to: `id`, `unique_id` or `slug`.
+    Any spelling of a UUID is an `id`, see `parse_id` to normalise it.
+    """
+
+    if parse_id(identifier) is not None:
+        return 'id'
+    if UNIQUE_ID_PATTERN.match(identifier):
+        return 'unique_id'
+    return 'slug'
+
+
+class MonotonicClock:
+    """Millisecond timestamps paired with a sequence number, strictly increasing
+    within the process even when several values are drawn in the same millisecond
+    or the wall clock steps back. When the sequence of a millisecond runs out the
+    timestamp is borrowed from the next one.
+    """
+
+    def __init__(self, sequence_bits: int, epoch_ms: int = 0):
+        self.max_sequence = (1 << sequence_bits) - 1
+        self.epoch_ms = epoch_ms
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next(self) -> Tuple[int, int]:
+        with self._lock:
+            now = time.time_ns() // 1_000_000 - self.epoch_ms
+
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            elif self._sequence < self.max_sequence:
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+
+            return self._last_ms, self._sequence
+
+
+_id_clock = MonotonicClock(sequence_bits=12)
+
+
+def generate_id() -> str:
+    """Returns a UUIDv7 (RFC 9562) as 32 lower case hex digits.
+
+    The leading 48 bits are the unix time in milliseconds, so new ids sort after
+    older ones and inserts land at the right edge of primary key indexes instead
+    of on random pages. The 12 bit sequence keeps ids from one process ordered
+    within a millisecond and the remaining 62 bits are random.
+    """
+
+    timestamp, sequence = _id_clock.next()
+
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                          # version
+    value |= sequence << 64
+    value |= 0b10 << 62                         # variant
+    value |= secrets.randbits(62)
+
+    return f'{value:032x}'
+
+
+# Snowflake style layout of the number in `unique_id`:
+# 41 bits of milliseconds since UNIQUE_ID_EPOCH_MS, 10 bits of node id and a 12 bit sequence
+UNIQUE_ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+_unique_id_clock = MonotonicClock(sequence_bits=12, epoch_ms=UNIQUE_ID_EPOCH_MS)
+_node_id = secrets.randbits(10)
+
+
+def _reset_node_id():
+    # Workers forked from one parent would otherwise share the parent's node id
+    global _node_id
+    _node_id = secrets.randbits(10)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_node_id)
+
+
+def generate_unique_number() -> int:
+    """Returns a time ordered 63 bit number that does not repeat within a process.
+    Processes draw a random node id, so two processes only collide if they share
+    a node id and draw the same sequence number in the same millisecond.
+    """
+
+    timestamp, sequence = _unique_id_clock.next()
+    return (timestamp << 22) | (_node_id << 12) | sequence
+
+
+class IdentifierMap:
+    """Bounded in-process map of (table, unique_id or slug) -> primary key.
+
+    Lets `fetch_by_id` resolve a unique_id or slug it has seen before with a
+    primary key lookup. Entries are hints only: callers check the resolved row
+    still carries the identifier and `discard` the entry when it does not.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data: 'OrderedDict[tuple, str]' = OrderedDict()
+
+    def get(self, table: str, identifier: str) -> Optional[str]:
+        key = (table, identifier)
+        pk = self._data.get(key)
+        if pk is not None:
+            self._data.move_to_end(key)
+        return pk
+
+    def set(self, table: str, identifier: str, pk: str):
+        key = (table, identifier)
+        self._data[key] = pk
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def discard(self, table: str, identifier: str):
+        self._data.pop((table, identifier), None)
+
+    def clear(self):
+        self._data.clear()
+
+
+identifier_map = IdentifierMap()
@@ -0,0 +1,163 @@
+from datetime import date, datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+import sqlalchemy as sa
+from sqlalchemy.ext.hybrid import HybridExtensionType
+
+
+class SerializerPlan:
+    """Precomputed serialization plan for one mapped class.
+
+    Everything `to_dict` used to work out per instance (which attributes are
+    columns, which are hybrids, which hold datetimes, which are relationships
+    and which are always excluded) is resolved once from the mapper and reused
+    for every row of that class.
+    """
+
+    __slots__ = ('model', 'columns', 'datetime_fields', 'hybrids', 'relationships', 'includable', 'excludes', 'ordered')
+
+    def __init__(self, model):
+        mapper = sa.inspect(model)
+
+        self.model = model
+        self.excludes: FrozenSet[str] = frozenset(getattr(model, '_serializer_excludes', ())) | {'is_deleted', 'deleted_at'}
+        self.columns: Tuple[str, ...] = tuple(
+            attr.key for attr in mapper.column_attrs
+            if attr.key not in self.excludes
+        )
+        self.datetime_fields: FrozenSet[str] = frozenset(
+            attr.key for attr in mapper.column_attrs
+            if isinstance(attr.columns[0].type, (sa.DateTime, sa.Date))
+        )
+        self.hybrids: Tuple[str, ...] = tuple(
+            name for name, descriptor in mapper.all_orm_descriptors.items()
+            if descriptor.extension_type is HybridExtensionType.HYBRID_PROPERTY
+            and name not in self.excludes
+        )
+        self.relationships: Tuple[str, ...] = tuple(
+            rel.key for rel in mapper.relationships
+            if rel.key not in self.excludes
+        )
+        self.includable: Tuple[str, ...] = tuple(
+            key for key in getattr(model, '_includable_relationships', ())
+            if key in self.relationships
+        )
+        self.ordered: bool = getattr(model, '_ordered', False)
+
+    @property
+    def fields(self) -> FrozenSet[str]:
+        """Every field name a client may ask for in a sparse fieldset"""
+
+        return frozenset(self.columns + self.hybrids + self.includable)
+
+    def serialize(
+        self,
+        obj,
+        excludes: Optional[Iterable[str]] = None,
+        visited: Optional[set] = None,
+        selection: Optional['FieldSelection'] = None,
+    ) -> Dict[str, Any]:
+        """Builds the dictionary representation of `obj`.
+
+        Only attributes already present on the instance are read, so deferred
+        columns and unloaded relationships are skipped instead of lazy loaded.
+        When `selection` is given, only its fields (and `id`) and included
+        relationships are serialized.
+        """
+
+        # Touching the primary key refreshes expired instances (eg. right
+        # after a commit) so their column values are back in __dict__
+        obj_id = obj.id
+        state = obj.__dict__
+        datetime_fields = self.datetime_fields
+
+        columns, hybrids, relationships = self.columns, self.hybrids, self.relationships
+        if selection is not None:
+            relationships = selection.include
+            if selection.fields:
+                fields = set(selection.fields)
+                columns = [key for key in columns if key in fields]
+                hybrids = [name for name in hybrids if name in fields]
+
+        data = {}
+        for key in columns:
+            if key in state:
+                value = state[key]
+                if key in datetime_fields and isinstance(value, (datetime, date)):
+                    value = value.isoformat()
+                data[key] = value
+
+        if self.ordered and 'position' in data and obj._ordinal is not None:
+            # Clients see the place of the row in its scope, not its rank
+            data['position'] = obj._ordinal
+
+        for name in hybrids:
+            data[name] = getattr(obj, name)
+
+        for key in relationships:
+            if key not in state:
+                continue
+
+            related = state[key]
+            if related is None:
+                data[key] = None
+            elif isinstance(related, (list, set, tuple)):
+                data[key] = [item.to_dict(visited=visited) for item in related]
+            else:
+                data[key] = related.to_dict(visited=visited)
+
+        data['id'] = obj_id
+
+        if excludes:
+            for key in excludes:
+                data.pop(key, None)
+
+        return data
+
+
+class FieldSelection:
+    """What a client asked to see of a resource.
+
+    `fields` is the sparse fieldset (`fields=`, None for every field),
+    `include` the relationships to expand (`include=`) and `omit` the
+    includable relationships that were not asked for.
+    """
+
+    __slots__ = ('fields', 'include', 'omit')
+
+    def __init__(
+        self,
+        fields: Optional[List[str]] = None,
+        include: Optional[List[str]] = None,
+        omit: Optional[List[str]] = None,
+    ):
+        self.fields = fields
+        self.include = include or []
+        self.omit = omit or []
+
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.fields or self.omit)
+
+    def project(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Narrows a full representation (eg. a cached item) down to this selection"""
+
+        if not self.is_partial:
+            return item
+
+        if self.fields:
+            keys = [*self.fields, *self.include, 'id']
+            return {key: item[key] for key in keys if key in item}
+
+        return {key: value for key, value in item.items() if key not in self.omit}
+
+
+_plans: Dict[type, SerializerPlan] = {}
+
+
+def get_serializer_plan(model) -> SerializerPlan:
+    """Returns the SerializerPlan for `model`, compiling it on first use."""
+
+    plan = _plans.get(model)
+    if plan is None:
+        plan = _plans[model] = SerializerPlan(model)
+    return plan
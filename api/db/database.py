@@ -1,9 +1,10 @@
 """ The database module
 """
-from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, scoped_session, declarative_base
 from sqlalchemy import create_engine
 from contextlib import contextmanager
 
+from api.db.instrumentation import instrument_engine
 from api.utils.settings import settings, BASE_DIR
 
 
@@ -38,8 +39,11 @@ def get_db_engine(test_mode: bool = False):
 
 
 engine = get_db_engine()
+instrument_engine(engine)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects keep their loaded state after a commit, so returning them does not
+# cost a refresh query per object
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 db_session = scoped_session(SessionLocal)
 
@@ -65,3 +69,17 @@ def get_db_with_ctx_manager():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def unit_of_work(db: Session):
+    """Runs the writes made in the block as a single transaction.\n
+    Model helpers called with `commit=False` inside the block only flush. The
+    transaction is committed once at the end and rolled back if the block raises.
+    """
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
@@ -0,0 +1,113 @@
+""" Per-request SQL instrumentation
+
+Engine event hooks time every statement and record it on the QueryStats of
+the current request, which the request middleware opens through a
+contextvar. Slow statements are logged with their parameters redacted and
+statements repeated within one request are reported as possible N+1 queries.
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from api.utils.loggers import create_logger
+from api.utils.settings import settings
+
+
+logger = create_logger(__name__, log_file='logs/performance.log')
+
+_IN_LIST = re.compile(r'\bIN \((?:[^()]|\([^()]*\))*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement: str) -> str:
+    """Normalizes a statement so executions differing only in their IN-list length compare equal"""
+
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('IN (...)', statement)).strip()
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replaces parameter values by their type names so they can be logged"""
+
+    if isinstance(parameters, dict):
+        return {key: f'<{type(value).__name__}>' for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return f'<{len(parameters)} parameter sets>'
+        return [f'<{type(value).__name__}>' for value in parameters]
+    return parameters
+
+
+class QueryStats:
+    """Queries issued while handling one request"""
+
+    __slots__ = ('count', 'duration', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int):
+        """Statement shapes executed at least `threshold` times, most repeated first"""
+
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+
+def start_query_stats():
+    """Starts recording queries for the current request.
+    Returns the QueryStats and the token to pass to `stop_query_stats`.
+    """
+
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_query_stats(token):
+    _current_stats.reset(token)
+
+
+def report_query_stats(stats: QueryStats, method: str, path: str):
+    """Logs the statements that were repeated often enough to look like N+1 queries"""
+
+    for shape, count in stats.repeated(settings.N_PLUS_ONE_THRESHOLD):
+        logger.warning(f'Possible N+1 on "{method} {path}": {count}x {shape[:300]}')
+
+
+def instrument_engine(engine: Engine):
+    """Registers the timing hooks on `engine`"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._query_start_time
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                f'Slow query ({duration * 1000:.1f}ms): {statement_shape(statement)} '
+                f'| params: {redact_parameters(parameters)}'
+            )
@@ -0,0 +1,100 @@
+""" Column types shared by the models
+"""
+import json
+import uuid
+from typing import Iterable
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import TypeDecorator
+
+
+# JSON stored as JSONB on PostgreSQL (indexable, containment operators) and
+# as plain JSON elsewhere
+JSONB = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+
+class HexUUID(TypeDecorator):
+    """UUID stored as a native `uuid` (16 bytes) on PostgreSQL and as CHAR(32)
+    elsewhere. Python values are always 32 lower case hex digits, so ids keep the
+    same shape in URLs, JSON and caches whichever backend stores them.
+
+    Binding a value that is not a UUID raises a ValueError (a StatementError once
+    wrapped by SQLAlchemy) on every backend, so it is never written as NULL or as
+    text. Client supplied ids are checked before they get here: `fetch_by_id`
+    answers a 404 and the request schemas reject malformed id fields.
+    """
+
+    impl = sa.CHAR(32)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(32))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+
+        if not isinstance(value, uuid.UUID):
+            try:
+                value = uuid.UUID(str(value))
+            except ValueError:
+                raise ValueError(f'{value!r} is not a valid UUID')
+
+        return value if dialect.name == 'postgresql' else value.hex
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value.hex
+        return value
+
+
+class json_array_contains(ColumnElement):
+    """Filter matching rows whose `column`, a JSON array of strings, contains
+    every one of `values`, ignoring case.
+
+    On PostgreSQL this is `lower(column::text)::jsonb @> values`, the expression
+    the GIN indexes built by `json_array_index` cover, so the filter is an index
+    lookup. SQLite compares the arrays with `json_each`.
+    """
+
+    type = sa.Boolean()
+    inherit_cache = False
+
+    def __init__(self, column, values: Iterable[str]):
+        self.column = column
+        self.values = json.dumps(sorted({value.lower() for value in values}))
+
+
+def _lower_jsonb(column):
+    return sa.cast(sa.func.lower(sa.cast(column, sa.Text)), postgresql.JSONB)
+
+
+@compiles(json_array_contains, 'postgresql')
+def _compile_json_array_contains_postgresql(element, compiler, **kw):
+    expression = _lower_jsonb(element.column).op('@>')(sa.cast(sa.literal(element.values), postgresql.JSONB))
+    return compiler.process(expression, **kw)
+
+
+@compiles(json_array_contains, 'sqlite')
+def _compile_json_array_contains_sqlite(element, compiler, **kw):
+    column = compiler.process(element.column, **kw)
+    values = compiler.process(sa.literal(element.values), **kw)
+
+    return (
+        f"json_type({column}) = 'array' AND "
+        f'NOT EXISTS (SELECT 1 FROM json_each({values}) AS wanted '
+        f'WHERE wanted.value NOT IN (SELECT lower(have.value) FROM json_each({column}) AS have))'
+    )
+
+
+@compiles(json_array_contains)
+def _compile_json_array_contains(element, compiler, **kw):
+    raise CompileError(f'json_array_contains is not supported on {compiler.dialect.name}')
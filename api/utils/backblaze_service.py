@@ -1,11 +1,15 @@
 import os, requests
-from typing import List, Optional
+import threading
+import time
+from typing import Callable, List, Optional, Set
 from uuid import uuid4
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from sqlalchemy.orm import Session
 from decouple import config
+from fastapi.concurrency import run_in_threadpool
 
 from api.utils.loggers import create_logger
 from api.utils.settings import settings
@@ -16,22 +20,90 @@ from api.v1.services.file import FileService
 
 
 logger = create_logger(__name__)
+# Separate name, as loggers are per name and this one writes to its own file
+performance_logger = create_logger('performance.backblaze', log_file='logs/performance.log')
+
+MB = 1024 * 1024
+
+
+class UploadProgress:
+    """boto3 transfer callback for one upload.
+
+    Multipart parts are sent from several threads, so byte counts are summed
+    under a lock. Progress is logged every 25%, and passed on to `on_progress`
+    (bytes sent, total bytes) when given. `finish` logs the upload's size,
+    duration and throughput.
+    """
+
+    def __init__(self, key: str, total_bytes: int, on_progress: Optional[Callable[[int, int], None]] = None):
+        self.key = key
+        self.total_bytes = total_bytes
+        self.on_progress = on_progress
+        self.bytes_sent = 0
+        self._logged_quarter = 0
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def __call__(self, bytes_amount: int):
+        with self._lock:
+            self.bytes_sent += bytes_amount
+            bytes_sent = self.bytes_sent
+            quarter = 4 * bytes_sent // self.total_bytes if self.total_bytes else 4
+            log_progress = quarter > self._logged_quarter
+            self._logged_quarter = max(quarter, self._logged_quarter)
+
+        if log_progress and quarter < 4:
+            logger.info(f'Uploading {self.key}: {quarter * 25}% of {self.total_bytes / MB:.1f} MB')
+        if self.on_progress is not None:
+            self.on_progress(bytes_sent, self.total_bytes)
+
+    def finish(self, multipart: bool) -> float:
+        duration = time.perf_counter() - self._started
+        throughput = self.total_bytes / MB / duration if duration else 0.0
+        performance_logger.info(
+            f'Uploaded {self.key}: {self.total_bytes / MB:.2f} MB in {duration * 1000:.0f}ms '
+            f'({throughput:.2f} MB/s, {"multipart" if multipart else "single part"})'
+        )
+        return duration
+
 
 class BackblazeService:
 
+    # Buckets known to exist, so each is checked once per process
+    _existing_buckets: Set[str] = set()
+
     @classmethod
     def __get_client(cls):
         if getattr(cls, '_b2_client', None) is None:
             cls._b2_client = boto3.client(
                 's3',
+                # Any S3 compatible endpoint, eg. a local MinIO container for testing
                 endpoint_url=config('B2_ENDPOINT'),
                 aws_access_key_id=config('B2_KEY_ID'),
                 aws_secret_access_key=config('B2_APPLICATION_KEY'),
-                config=Config(signature_version='s3v4'),
+                config=Config(
+                    signature_version='s3v4',
+                    # Enough connections for the parts of concurrent multipart uploads
+                    max_pool_connections=max(10, 2 * settings.B2_UPLOAD_MAX_CONCURRENCY),
+                ),
             )
         return cls._b2_client
 
 
+    @classmethod
+    def get_transfer_config(cls) -> TransferConfig:
+        """Files from B2_MULTIPART_THRESHOLD_MB up are sent as B2_MULTIPART_CHUNK_SIZE_MB
+        parts, B2_UPLOAD_MAX_CONCURRENCY at a time (B2 needs parts of at least 5 MB)
+        """
+
+        return TransferConfig(
+            multipart_threshold=settings.B2_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.B2_MULTIPART_CHUNK_SIZE_MB * MB,
+            max_concurrency=settings.B2_UPLOAD_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+
+
     @classmethod
     def __ensure_bucket_exists(cls, bucket_name: str):
         """Creates the bucket if it doesn't already exist.
@@ -41,11 +113,47 @@ class BackblazeService:
         native API) at creation time, not here.
         """
 
+        if bucket_name in cls._existing_buckets:
+            return
+
         try:
             cls.__get_client().head_bucket(Bucket=bucket_name)
         except ClientError:
             cls.__get_client().create_bucket(Bucket=bucket_name)
 
+        cls._existing_buckets.add(bucket_name)
+
+
+    @classmethod
+    def upload_object(
+        cls,
+        source_file: str,
+        bucket_name: str,
+        destination: str,
+        content_type: str,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> float:
+        """Uploads a local file with the configured transfer settings, multipart when large.
+        Blocking: async callers run it in a thread. Returns the upload's duration in seconds.
+        """
+
+        cls.__ensure_bucket_exists(bucket_name)
+
+        transfer_config = cls.get_transfer_config()
+        total_bytes = os.path.getsize(source_file)
+        progress = UploadProgress(destination, total_bytes, on_progress)
+
+        cls.__get_client().upload_file(
+            Filename=source_file,
+            Bucket=bucket_name,
+            Key=destination,
+            ExtraArgs={'ContentType': content_type},
+            Callback=progress,
+            Config=transfer_config,
+        )
+
+        return progress.finish(multipart=total_bytes >= transfer_config.multipart_threshold)
+
 
     @classmethod
     def generate_presigned_url(
@@ -84,9 +192,13 @@ class BackblazeService:
         model_id: Optional[str] = None,
         file_description: str = None,
         add_to_db: bool = False,
-        delete_after_upload: bool = True
+        delete_after_upload: bool = True,
+        on_progress: Optional[Callable[[int, int], None]] = None
     ):
-        '''This function uploads a file to a bucket in backblaze b2'''
+        '''This function uploads a file to a bucket in backblaze b2.\n
+        The upload runs in a worker thread, so the event loop is not blocked. `on_progress`
+        is called from that thread with the bytes sent so far and the file size.
+        '''
 
         # Create file in db
         new_file = await FileService.upload_file(
@@ -114,14 +226,14 @@ class BackblazeService:
         source_file = new_file.get('file_path')
 
         try:
-            cls.__ensure_bucket_exists(bucket_name)
-
             # Upload file
-            cls.__get_client().upload_file(
-                Filename=source_file,
-                Bucket=bucket_name,
-                Key=destination,
-                ExtraArgs={'ContentType': content_type}
+            await run_in_threadpool(
+                cls.upload_object,
+                source_file,
+                bucket_name,
+                destination,
+                content_type,
+                on_progress,
             )
 
             preview_url = cls.generate_presigned_url(
@@ -1,4 +1,9 @@
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from api.utils.settings import settings
 
 
 class FeatureCache:
@@ -19,12 +24,21 @@ class FeatureCache:
     Pagination assumes pages are walked sequentially (1, 2, 3, ...) under a
     stable sort/filter. Callers must bypass the cache whenever search/filter/
     sort params deviate from the route's default "browse all" case.
+
+    Only full representations (every field, every includable relationship)
+    are stored. `get_page`/`get_item` accept a FieldSelection (`fields=` /
+    `include=`) and project the cached items down to it, so callers must load
+    with the model's `full_selection()` whenever they store into the cache.
+    List pages of any other selection go to the variant returned by
+    `for_selection`, loaded with that selection and served as they are.
     """
 
-    def __init__(self):
+    def __init__(self, max_variants: Optional[int] = None):
         self._total: Optional[int] = None
         self._data: Dict[str, Dict[str, Any]] = {}
         self._order: List[Dict[str, Any]] = []
+        self.max_variants = max_variants if max_variants is not None else settings.FEATURE_CACHE_MAX_VARIANTS
+        self._variants: 'OrderedDict[str, FeatureCache]' = OrderedDict()
 
     def is_loaded(self) -> bool:
         return self._total is not None
@@ -45,9 +59,13 @@ class FeatureCache:
         required = page * per_page
         return self.cached_count() >= required or required >= self.total
 
-    def get_page(self, page: int, per_page: int) -> List[Dict[str, Any]]:
+    def get_page(self, page: int, per_page: int, selection=None) -> List[Dict[str, Any]]:
         offset = (page - 1) * per_page
-        return self._order[offset:offset + per_page]
+        items = self._order[offset:offset + per_page]
+
+        if selection is not None and selection.is_partial:
+            return [selection.project(item) for item in items]
+        return items
 
     def store_page(self, items: List[Dict[str, Any]], total: int, *id_fields: str):
         self._total = total
@@ -55,8 +73,12 @@ class FeatureCache:
             self._order.append(item)
             self._index_item(item, *id_fields)
 
-    def get_item(self, identifier: str) -> Optional[Dict[str, Any]]:
-        return self._data.get(identifier)
+    def get_item(self, identifier: str, selection=None) -> Optional[Dict[str, Any]]:
+        item = self._data.get(identifier)
+
+        if item is not None and selection is not None:
+            return selection.project(item)
+        return item
 
     def store_item(self, item: Dict[str, Any], *id_fields: str):
         self._index_item(item, *id_fields)
@@ -73,10 +95,45 @@ class FeatureCache:
             if key:
                 self._data[str(key)] = item
 
+    def variant(self, key: str) -> 'FeatureCache':
+        """Returns the child cache for a filtered view of this resource (eg. one
+        tag filter), creating it on first use. Variants are cleared together
+        with their parent, so writes that clear the resource cache also
+        invalidate every filtered view of it.
+
+        Keys usually come from query strings, so at most `max_variants` are kept;
+        creating one more evicts the least recently used.
+        """
+
+        cache = self._variants.get(key)
+        if cache is not None:
+            self._variants.move_to_end(key)
+            return cache
+
+        while self._variants and len(self._variants) >= self.max_variants:
+            self._variants.popitem(last=False)
+
+        cache = self._variants[key] = FeatureCache()
+        return cache
+
+    def for_selection(self, selection) -> 'FeatureCache':
+        """Returns the cache for pages of `selection`, a variant keyed by its fields
+        (`fields=`) and included relationships (`include=`), so filling it only
+        selects those columns and only eager loads those relationships.
+        Full representations stay in this cache.
+        """
+
+        if selection is None or not selection.is_partial:
+            return self
+        return self.variant(
+            f"fields:{','.join(sorted(selection.fields or []))}|include:{','.join(sorted(selection.include))}"
+        )
+
     def clear(self):
         self._total = None
         self._data = {}
         self._order = []
+        self._variants = OrderedDict()
 
 
 _caches: Dict[str, FeatureCache] = {}
@@ -88,3 +145,131 @@ def get_cache(name: str) -> FeatureCache:
     if name not in _caches:
         _caches[name] = FeatureCache()
     return _caches[name]
+
+
+class PrincipalCache:
+    """Per-process cache of authenticated users, keyed by the sha256 digest of
+    their access token, so repeated calls with one token skip the user lookup.
+
+    Entries hold a snapshot of the user's columns and expire after `ttl` seconds
+    or when the token expires, whichever comes first. `invalidate_user` drops
+    every entry of a user (the User model calls it on update and delete); other
+    workers drop theirs when the entries expire.
+    """
+
+    def __init__(self, ttl: int, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, Tuple[float, str, Dict[str, Any]]]' = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token_digest)
+            if entry is None:
+                return None
+
+            expires_at, user_id, snapshot = entry
+            if expires_at <= time.time():
+                self._remove(token_digest)
+                return None
+
+            self._entries.move_to_end(token_digest)
+            return snapshot
+
+    def put(self, token_digest: str, user_id: str, snapshot: Dict[str, Any], token_expires_at: Optional[float] = None):
+        if self.ttl <= 0:
+            return
+
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self._lock:
+            self._remove(token_digest)
+            self._entries[token_digest] = (expires_at, user_id, snapshot)
+            self._by_user.setdefault(user_id, set()).add(token_digest)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, token_digest: str):
+        with self._lock:
+            self._remove(token_digest)
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            for token_digest in list(self._by_user.get(user_id, ())):
+                self._remove(token_digest)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _remove(self, token_digest: str):
+        entry = self._entries.pop(token_digest, None)
+        if entry is None:
+            return
+
+        user_id = entry[1]
+        digests = self._by_user.get(user_id)
+        if digests is not None:
+            digests.discard(token_digest)
+            if not digests:
+                del self._by_user[user_id]
+
+
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+class TokenClaimsCache:
+    """Per-process LRU of the claims of tokens whose signature and claims were
+    verified, keyed by the sha256 digest of the token, so a token seen again is
+    not decoded and verified again.
+
+    Entries expire with their token's `exp`; tokens without one are not cached.
+    Revocation is checked by the caller on every use, cached or not, and
+    `invalidate` frees the entry of a revoked token. At most `max_size` tokens
+    are kept (0 disables the cache), the least recently used going first.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token_digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token_digest)
+            if entry is None:
+                return None
+
+            expires_at, claims = entry
+            if expires_at <= time.time():
+                del self._entries[token_digest]
+                return None
+
+            self._entries.move_to_end(token_digest)
+            return dict(claims)
+
+    def put(self, token_digest: str, claims: Dict[str, Any]):
+        expires_at = claims.get('exp')
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+
+        with self._lock:
+            self._entries[token_digest] = (expires_at, dict(claims))
+            self._entries.move_to_end(token_digest)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token_digest: str):
+        with self._lock:
+            self._entries.pop(token_digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -71,7 +71,6 @@ class FirebaseService:
             new_file.external_url = download_url
             new_file.url = download_url if delete_after_upload else new_file.url
             db.commit()
-            db.refresh(new_file)
             
         if delete_after_upload:
             try:
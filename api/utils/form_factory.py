@@ -1,6 +1,7 @@
 from fastapi import Form, File, UploadFile
+from fastapi.exceptions import RequestValidationError
 from typing import get_type_hints, Optional, List, Type
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 import inspect
 
 def as_form_factory(model: Type[BaseModel]):
@@ -34,7 +35,13 @@ def as_form_factory(model: Type[BaseModel]):
 
     # Create the function signature
     def as_form_func(*args, **kwargs):
-        return model(*args, **kwargs)
+        try:
+            return model(*args, **kwargs)
+        except ValidationError as e:
+            # Reported like the validation errors of any other request body
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])} for error in e.errors()
+            ])
 
     as_form_func.__signature__ = inspect.Signature(new_params)
     return as_form_func
\ No newline at end of file
@@ -0,0 +1,164 @@
+""" Local verification of Google ID tokens
+
+ID tokens are JWTs signed with one of Google's rotating RSA keys, published as
+a JWK set. Verifying the signature and claims here replaces a call to Google's
+`tokeninfo` endpoint per login with a key lookup. The key set is cached for
+the max-age Google sends with it. Once that has passed the cached keys keep
+being used while a refresh runs in the background; only a token signed with a
+key the cache does not have (eg. just after a rotation) waits for a refresh.
+
+Where keys come from is a `KeySource`, so a local stand-in (`StaticKeySource`)
+can replace Google's endpoint, eg. to sign test tokens with a local key.
+"""
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional, Protocol, Sequence, Tuple
+
+from fastapi import HTTPException
+from jose import JWTError, jwt
+
+from api.utils.http_client import get_http_client
+from api.utils.loggers import create_logger
+
+
+logger = create_logger(__name__)
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class KeySource(Protocol):
+    async def fetch(self) -> Tuple[Dict[str, Any], float]:
+        '''Returns a JWK set and the number of seconds it can be cached for'''
+        ...
+
+
+class GoogleKeySource:
+    """Google's published signing keys, cached for the max-age of their Cache-Control header"""
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, default_max_age: float = 3600):
+        self.url = url
+        self.default_max_age = default_max_age
+
+    async def fetch(self) -> Tuple[Dict[str, Any], float]:
+        response = await get_http_client().get(self.url)
+        response.raise_for_status()
+
+        max_age = _MAX_AGE.search(response.headers.get('cache-control', ''))
+        return response.json(), float(max_age.group(1)) if max_age else self.default_max_age
+
+
+class StaticKeySource:
+    """A fixed JWK set, eg. the public half of a local test key"""
+
+    def __init__(self, jwks: Dict[str, Any], max_age: float = 3600):
+        self.jwks = jwks
+        self.max_age = max_age
+
+    async def fetch(self) -> Tuple[Dict[str, Any], float]:
+        return self.jwks, self.max_age
+
+
+class GoogleIdTokenVerifier:
+    """Verifies Google ID tokens against the keys of `key_source`.
+
+    A token is accepted when its RS256 signature matches a key of the set and it
+    is unexpired, issued by Google for `audience` (the OAuth client id) and
+    carries a verified email.
+    """
+
+    # A token with an unknown key id triggers at most one refresh this often
+    MIN_REFRESH_INTERVAL = 30
+
+    def __init__(
+        self,
+        key_source: KeySource,
+        audience: str,
+        issuers: Sequence[str] = GOOGLE_ISSUERS,
+        leeway: int = 60,
+    ):
+        self.key_source = key_source
+        self.audience = audience
+        self.issuers = tuple(issuers)
+        self.leeway = leeway
+
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._refreshed_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._background_refresh: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        '''Reloads the key set. Concurrent callers share one fetch'''
+
+        started = time.monotonic()
+        async with self._refresh_lock:
+            # Another caller refreshed while this one waited for the lock
+            if self._refreshed_at > started:
+                return
+
+            jwks, max_age = await self.key_source.fetch()
+            self._keys = {key['kid']: key for key in jwks.get('keys', []) if 'kid' in key}
+            self._refreshed_at = time.monotonic()
+            self._expires_at = self._refreshed_at + max_age
+
+    def _refresh_in_background(self):
+        if self._background_refresh is None or self._background_refresh.done():
+            self._background_refresh = asyncio.create_task(self._safe_refresh())
+
+    async def _safe_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f'Could not refresh Google signing keys: {e}')
+
+    async def get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        if not self._keys:
+            await self.refresh()
+        elif time.monotonic() >= self._expires_at:
+            self._refresh_in_background()
+
+        if kid not in self._keys and time.monotonic() - self._refreshed_at >= self.MIN_REFRESH_INTERVAL:
+            await self.refresh()
+
+        return self._keys.get(kid)
+
+    async def verify(self, id_token: str) -> Dict[str, Any]:
+        '''Returns the claims of a valid ID token. Raises a 401 otherwise'''
+
+        invalid_token = HTTPException(401, 'Invalid Google ID token')
+
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except JWTError:
+            raise invalid_token
+
+        try:
+            key = await self.get_key(header.get('kid'))
+        except Exception as e:
+            logger.error(f'Could not load Google signing keys: {e}')
+            raise HTTPException(503, 'Could not verify Google ID token, please try again')
+
+        if key is None:
+            raise invalid_token
+
+        try:
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=['RS256'],
+                audience=self.audience,
+                issuer=self.issuers,
+                options={'leeway': self.leeway, 'verify_at_hash': False},
+            )
+        except JWTError as e:
+            logger.error(f'Invalid Google ID token: {e}')
+            raise invalid_token
+
+        if not claims.get('email') or claims.get('email_verified') not in (True, 'true'):
+            raise HTTPException(401, 'Google account email is not verified')
+
+        return claims
@@ -2,6 +2,7 @@ import random
 from fastapi import HTTPException
 from typing import List, Optional
 
+from api.core.base.identifiers import generate_unique_number
 from api.v1.schemas.base import AdditionalInfoSchema
 
 
@@ -9,36 +10,14 @@ def generate_logo_url(name: str):
     return f"https://ui-avatars.com/api/?name={name}"
 
 
-def generate_unique_id(
-    name: Optional[str]="Korede", 
-    passes: int = 6
-):
-    '''Function to geenrate a random unique id
+def generate_unique_id(name: Optional[str]="Korede"):
+    '''Function to generate a unique id: the first three letters of `name` upper cased,
+    followed by a time ordered number that does not repeat (see `generate_unique_number`)
     '''
-        
-    first_three_letters = name[:3].upper()
-    
-    # Convert first three letter to ascii
-    ascii_str = ''.join(str(ord(char)) for char in first_three_letters)
-    ascii_int = int(ascii_str)
     
-    # Determine number of number passes for the loop
-    if passes < 5:
-        passes = 5
-    elif passes > 10:
-        passes = 10
-        
-    number_string = ""
-    
-    for _ in range(passes):
-        random_number = f'{random.randint(0, 9)}'
-        number_string +=random_number
+    first_three_letters = name[:3].upper()
     
-    # Generate unique id
-    id_number = ascii_int + int(number_string)
-    unique_id = f"{first_three_letters}{id_number}"
-        
-    return unique_id
+    return f"{first_three_letters}{generate_unique_number()}"
 
 
 def format_additional_info_create(additional_info: List[AdditionalInfoSchema]):
@@ -115,6 +94,15 @@ def check_user_is_owner(user_id: str, model_instance, user_fk_name: str):
         raise HTTPException(403, 'You do not have permission to access this resource')
     
 
+def parse_csv(value: Optional[str]) -> List[str]:
+    '''Function to split a comma separated query parameter into its non-empty items'''
+    
+    if not value:
+        return []
+    
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
 def generate_random_hex():
     return "#{:06x}".format(random.randint(0, 0xFFFFFF))
 
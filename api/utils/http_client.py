@@ -0,0 +1,33 @@
+""" Shared async HTTP client
+
+One `httpx.AsyncClient` per process, so calls to external services reuse
+pooled keep-alive connections instead of opening a TLS connection each, and
+never block the event loop. It is closed by the app's lifespan on shutdown.
+"""
+from typing import Optional
+
+import httpx
+
+from api.utils.settings import settings
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
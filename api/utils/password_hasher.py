@@ -0,0 +1,162 @@
+""" Password hashing off the event loop
+
+Hashing a password costs 100-300ms of CPU by design. Done inline in an async
+route it blocks every other request of the worker for that long, so hashes
+are computed on a small dedicated thread pool instead (argon2-cffi and bcrypt
+release the GIL while hashing). The number of jobs waiting for the pool is
+bounded; past it requests fail fast with a 503 instead of queueing behind a
+burst of logins.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from api.utils.loggers import create_logger
+from api.utils.settings import settings
+
+
+logger = create_logger(__name__, log_file='logs/performance.log')
+
+# Hashes of every scheme here verify; those not of the configured scheme are
+# deprecated, so they are replaced on the user's next successful login.
+SCHEMES = ('argon2', 'bcrypt_sha256')
+
+# Jobs that waited longer than this for a free worker are logged
+SLOW_WAIT_MS = 250
+
+
+def build_context(scheme: str) -> CryptContext:
+    return CryptContext(
+        schemes=[scheme, *(other for other in SCHEMES if other != scheme)],
+        default=scheme,
+        deprecated='auto',
+        argon2__type='ID',
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+class PasswordHasher:
+    """Hashes and verifies secrets with `context` on a pool of `max_workers` threads.
+
+    At most `max_pending` jobs are running or waiting at a time. `stats()` reports the
+    current and peak queue depth along with job counts and timings, and `report_stats()`
+    logs them.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_pending: int):
+        self.context = context
+        self.max_pending = max_pending
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._reported: Tuple[int, int] = (0, 0)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created lazily so processes that never hash (scripts, forked workers
+        # before their first login) do not start threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers,
+                        thread_name_prefix='password-hasher',
+                    )
+        return self._executor
+
+    def _timed(self, queued_at: float, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._completed += 1
+                self._wait_seconds += started - queued_at
+                self._run_seconds += finished - started
+
+            wait_ms = (started - queued_at) * 1000
+            if wait_ms > SLOW_WAIT_MS:
+                logger.warning(f'Password hash job waited {wait_ms:.0f}ms for a worker ({self._pending} pending)')
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                logger.warning(f'Password hash queue full ({self._pending} pending), rejecting request')
+                raise HTTPException(503, 'Server is busy, please try again shortly')
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self._timed, time.perf_counter(), fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, secret: str) -> str:
+        return await self._submit(self.context.hash, secret)
+
+    async def verify(self, secret: str, hash: str) -> bool:
+        return await self._submit(self.context.verify, secret, hash)
+
+    async def verify_and_update(self, secret: str, hash: str) -> Tuple[bool, Optional[str]]:
+        '''Verifies `secret` against `hash`. The second value is a new hash to store when
+        `hash` is valid but of a deprecated scheme or of outdated parameters, else None.
+        '''
+
+        return await self._submit(self.context.verify_and_update, secret, hash)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                'pending': self._pending,
+                'peak_pending': self._peak_pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'avg_wait_ms': round(self._wait_seconds / completed * 1000, 1),
+                'avg_run_ms': round(self._run_seconds / completed * 1000, 1),
+            }
+
+    def report_stats(self):
+        '''Logs `stats()` if jobs ran, were rejected or are pending since the last report,
+        then restarts the peak queue depth so each report shows the peak of its interval
+        '''
+
+        stats = self.stats()
+        with self._lock:
+            self._peak_pending = self._pending
+
+        activity = (stats['completed'], stats['rejected'])
+        if activity == self._reported and not stats['pending']:
+            return
+        self._reported = activity
+
+        logger.info(
+            f"Password hasher: {stats['pending']} pending (peak {stats['peak_pending']}), "
+            f"{stats['completed']} completed, {stats['rejected']} rejected, "
+            f"avg wait {stats['avg_wait_ms']}ms, avg run {stats['avg_run_ms']}ms"
+        )
+
+
+password_hasher = PasswordHasher(
+    build_context(settings.PASSWORD_HASH_SCHEME),
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
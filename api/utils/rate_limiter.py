@@ -0,0 +1,233 @@
+""" Rate limiting shared by every worker
+
+Limits are counted with the sliding window counter strategy in the storage at
+RATE_LIMIT_STORAGE_URI, so all the workers of a deployment enforce one budget
+per client instead of one each. Besides the storages bundled with `limits`
+(redis://, memcached://, ...) a `sqlite:///path` storage is registered here for
+single host deployments without a cache server.
+
+Each worker also counts the hits it let through in a local fixed window. Once a
+client has used its budget in that window on this worker alone, further hits
+are refused without a round trip to the shared storage, which keeps the cost of
+a burst on the worker receiving it.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from math import floor
+from typing import Dict, Tuple
+
+from limits import RateLimitItem
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+from limits.strategies import SlidingWindowCounterRateLimiter
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from api.utils.settings import settings
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """`limits` storage keeping counters in a SQLite database, eg. `sqlite:///./tmp/rate_limits.db`.
+
+    The database is shared by every process on the host. Each sliding window hit
+    reads and updates its counters in one write transaction, so concurrent workers
+    cannot both take the last entry of a window.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    # Expired counters are deleted every PURGE_EVERY writes of a process
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+        # Same convention as SQLAlchemy urls: sqlite:///relative.db, sqlite:////absolute.db
+        self.path = uri[len('sqlite:///'):]
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._local = threading.local()
+        self._writes = 0
+
+        with self._transaction() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limits ('
+                'key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)'
+            )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across threads, so each thread opens its own
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so reads and writes of the block are atomic
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _get(self, connection: sqlite3.Connection, key: str, now: float) -> int:
+        row = connection.execute(
+            'SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _incr(self, connection: sqlite3.Connection, key: str, expiry: float, amount: int, now: float) -> int:
+        # An expired counter restarts from `amount` with a new expiry
+        count, = connection.execute(
+            'INSERT INTO rate_limits (key, count, expires_at) VALUES (:key, :amount, :expires_at) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'count = CASE WHEN expires_at <= :now THEN :amount ELSE count + :amount END, '
+            'expires_at = CASE WHEN expires_at <= :now THEN :expires_at ELSE expires_at END '
+            'RETURNING count',
+            {'key': key, 'amount': amount, 'expires_at': now + expiry, 'now': now},
+        ).fetchone()
+
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            connection.execute('DELETE FROM rate_limits WHERE expires_at <= ?', (now,))
+
+        return count
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        with self._transaction() as connection:
+            return self._incr(connection, key, expiry, amount, time.time())
+
+    def get(self, key: str) -> int:
+        return self._get(self.connection, key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        row = self.connection.execute('SELECT expires_at FROM rate_limits WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            self.connection.execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute('DELETE FROM rate_limits').rowcount
+
+    def clear(self, key: str) -> None:
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def _sliding_window(self, connection: sqlite3.Connection, key: str, expiry: int, now: float) -> Tuple[int, float, int, float]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+
+        previous_count = self._get(connection, previous_key, now)
+        current_count = self._get(connection, current_key, now)
+
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        now = time.time()
+        with self._transaction() as connection:
+            previous_count, previous_ttl, current_count, _ = self._sliding_window(connection, key, expiry, now)
+            if floor(previous_count * previous_ttl / expiry + current_count) + amount > limit:
+                return False
+
+            # Kept for two windows, as it is the previous window of the next one
+            _, current_key = self.sliding_window_keys(key, expiry, now)
+            self._incr(connection, current_key, 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        return self._sliding_window(self.connection, key, expiry, time.time())
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                'DELETE FROM rate_limits WHERE key IN (?, ?)',
+                self.sliding_window_keys(key, expiry, time.time()),
+            )
+
+
+class LocalFirstRateLimiter(SlidingWindowCounterRateLimiter):
+    """Sliding window counter over the shared storage, behind a per-process fixed window.
+
+    The local windows are aligned with the storage's, and only count the hits the
+    storage accepted, so a client over its budget locally is over it globally and
+    is refused without querying the storage.
+    """
+
+    # Ended windows are dropped once this many keys are tracked
+    MAX_KEYS = 10000
+
+    def __init__(self, storage):
+        super().__init__(storage)
+        self._lock = threading.Lock()
+        # Rate limit key -> (end of its current window, hits accepted in it)
+        self._hits: Dict[str, Tuple[float, int]] = {}
+
+    def _local_count(self, key: str, now: float) -> int:
+        window_end, count = self._hits.get(key, (0.0, 0))
+        return count if window_end > now else 0
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        key = item.key_for(*identifiers)
+        now = time.time()
+
+        with self._lock:
+            if self._local_count(key, now) + cost > item.amount:
+                return False
+
+        if not super().hit(item, *identifiers, cost=cost):
+            return False
+
+        with self._lock:
+            count = self._local_count(key, now)
+            if not count and len(self._hits) >= self.MAX_KEYS:
+                self._hits = {
+                    hit_key: hit for hit_key, hit in self._hits.items() if hit[0] > now
+                }
+
+            expiry = item.get_expiry()
+            window_end = (int(now / expiry) + 1) * expiry
+            self._hits[key] = (window_end, count + cost)
+
+        return True
+
+    def clear(self, item: RateLimitItem, *identifiers: str) -> None:
+        with self._lock:
+            self._hits.pop(item.key_for(*identifiers), None)
+        super().clear(item, *identifiers)
+
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy='sliding-window-counter',
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+# slowapi builds its strategy from a name, so the local fast path is swapped in here
+limiter._limiter = LocalFirstRateLimiter(limiter._storage)
@@ -15,6 +15,41 @@ class Settings(BaseSettings):
     ALGORITHM: str = config("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config("ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_MINUTES: int = config("REFRESH_TOKEN_EXPIRE_MINUTES")
+    # Seconds between syncs of the in-process revoked token set with the blacklist table
+    TOKEN_REVOCATION_SYNC_SECONDS: int = config("TOKEN_REVOCATION_SYNC_SECONDS", default=5, cast=int)
+    # Seconds an authenticated user is served from the per-process principal cache (0 disables it)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = config("PRINCIPAL_CACHE_TTL_SECONDS", default=30, cast=int)
+    # Number of verified tokens whose claims are memoized per process (0 disables it)
+    TOKEN_CLAIMS_CACHE_SIZE: int = config("TOKEN_CLAIMS_CACHE_SIZE", default=10000, cast=int)
+    # Expired tokens and blacklist entries are purged every TOKEN_GC_INTERVAL_MINUTES (0 disables it)
+    TOKEN_GC_INTERVAL_MINUTES: int = config("TOKEN_GC_INTERVAL_MINUTES", default=60, cast=int)
+    TOKEN_GC_BATCH_SIZE: int = config("TOKEN_GC_BATCH_SIZE", default=1000, cast=int)
+    # Password hashing: scheme of new hashes (argon2 or bcrypt_sha256; hashes of the other are
+    # upgraded on login), argon2id cost, and the size and queue bound of the hashing thread pool
+    PASSWORD_HASH_SCHEME: str = config("PASSWORD_HASH_SCHEME", default="argon2")
+    ARGON2_TIME_COST: int = config("ARGON2_TIME_COST", default=3, cast=int)
+    ARGON2_MEMORY_COST: int = config("ARGON2_MEMORY_COST", default=65536, cast=int)
+    ARGON2_PARALLELISM: int = config("ARGON2_PARALLELISM", default=2, cast=int)
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+    PASSWORD_HASH_MAX_PENDING: int = config("PASSWORD_HASH_MAX_PENDING", default=32, cast=int)
+    # Seconds between the hashing pool's queue depth reports in logs/performance.log (0 disables them)
+    PASSWORD_HASH_STATS_INTERVAL_SECONDS: int = config("PASSWORD_HASH_STATS_INTERVAL_SECONDS", default=60, cast=int)
+    # Rate limits: storage shared by the workers (sqlite:///path, redis://host:port, ...)
+    # and per-route budgets in `limits` notation, eg. "5/minute;20/hour"
+    RATE_LIMIT_ENABLED: bool = config("RATE_LIMIT_ENABLED", default=True, cast=bool)
+    RATE_LIMIT_STORAGE_URI: str = config("RATE_LIMIT_STORAGE_URI", default="sqlite:///./tmp/rate_limits.db")
+    RATE_LIMIT_LOGIN: str = config("RATE_LIMIT_LOGIN", default="5/minute;30/hour")
+    RATE_LIMIT_SEND_MESSAGE: str = config("RATE_LIMIT_SEND_MESSAGE", default="3/minute;10/day")
+    RATE_LIMIT_CREATE_TESTIMONIAL: str = config("RATE_LIMIT_CREATE_TESTIMONIAL", default="2/minute;5/day")
+    # Shared async HTTP client used for calls to external services
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = config("HTTP_CLIENT_TIMEOUT_SECONDS", default=10, cast=float)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = config("HTTP_CLIENT_MAX_CONNECTIONS", default=20, cast=int)
+    # Uploads are written to disk in chunks of this size
+    FILE_UPLOAD_CHUNK_SIZE_KB: int = config("FILE_UPLOAD_CHUNK_SIZE_KB", default=1024, cast=int)
+    # Backblaze uploads: files from the threshold up are sent in parallel parts of the chunk size
+    B2_MULTIPART_THRESHOLD_MB: int = config("B2_MULTIPART_THRESHOLD_MB", default=16, cast=int)
+    B2_MULTIPART_CHUNK_SIZE_MB: int = config("B2_MULTIPART_CHUNK_SIZE_MB", default=8, cast=int)
+    B2_UPLOAD_MAX_CONCURRENCY: int = config("B2_UPLOAD_MAX_CONCURRENCY", default=4, cast=int)
     # ALLOWED_ORIGINS: list = config("ALLOWED_ORIGINS", cast=lambda v: [s.strip() for s in v.split(',')])
     # ALLOWED_ORIGINS: list = [origin.strip() for origin in config('ALLOWED_ORIGINS').split(',')]
 
@@ -33,6 +68,17 @@ class Settings(BaseSettings):
     DB_NAME: str = config("DB_NAME")
     DB_TYPE: str = config("DB_TYPE")
     DB_URL: str = config("DB_URL")
+
+    # Soft deleted rows older than this are archived/purged by scripts/maintenance/archive_deleted.py
+    SOFT_DELETE_RETENTION_DAYS: int = config("SOFT_DELETE_RETENTION_DAYS", default=30, cast=int)
+    ARCHIVE_BATCH_SIZE: int = config("ARCHIVE_BATCH_SIZE", default=500, cast=int)
+
+    # SQL instrumentation (see api/db/instrumentation.py)
+    SLOW_QUERY_MS: int = config("SLOW_QUERY_MS", default=200, cast=int)
+    N_PLUS_ONE_THRESHOLD: int = config("N_PLUS_ONE_THRESHOLD", default=5, cast=int)
+
+    # Filtered views (eg. one tag list) cached per resource; the least recently used is evicted past this
+    FEATURE_CACHE_MAX_VARIANTS: int = config("FEATURE_CACHE_MAX_VARIANTS", default=64, cast=int)
     
     TEMP_DIR: str = os.path.join(Path(__file__).resolve().parent.parent.parent, 'tmp', 'media') 
 
@@ -1,3 +1,4 @@
+from api.v1.models.archived_record import ArchivedRecord
 from api.v1.models.award import Award
 from api.v1.models.blog import Blog
 from api.v1.models.category import Category, CategoryAssociation
@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+import sqlalchemy as sa
+
+from api.core.base.base_model import BaseTableModel
+
+
+class ArchivedRecord(BaseTableModel):
+    __tablename__ = 'archived_records'
+    __table_args__ = (
+        sa.Index('ix_archived_records_table_name_record_id', 'table_name', 'record_id'),
+    )
+    
+    table_name = sa.Column(sa.String, nullable=False)
+    record_id = sa.Column(sa.String, nullable=False)
+    data = sa.Column(sa.JSON, nullable=False)
+    archived_at = sa.Column(sa.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
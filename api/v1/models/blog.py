@@ -7,6 +7,8 @@ from api.core.base.base_model import BaseTableModel
 
 class Blog(BaseTableModel):
     __tablename__ = 'blogs'
+    _includable_relationships = ('files', 'tags', 'categories')
+    _ordered = True
 
     title = sa.Column(sa.String, nullable=False)
     slug = sa.Column(sa.String, nullable=False, index=True, unique=True)
@@ -18,8 +20,7 @@ class Blog(BaseTableModel):
 
     files = relationship(
         'File',
-        primaryjoin="and_(foreign(File.model_id)==Blog.id, File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(foreign(File.model_id)==Blog.id, File.is_deleted==False)"
     )
 
     tags = relationship(
@@ -31,7 +32,6 @@ class Blog(BaseTableModel):
         secondaryjoin="and_(Tag.id==foreign(TagAssociation.tag_id), "
                      "Tag.is_deleted==False)",
         backref="blogs",
-        lazy='selectin',
         viewonly=True
     )
     
@@ -43,7 +43,6 @@ class Blog(BaseTableModel):
                    'CategoryAssociation.model_type=="blogs")',
         secondaryjoin='and_(Category.id==foreign(CategoryAssociation.category_id), '
                      'Category.is_deleted==False)',
-        lazy='selectin',
         backref='blogs',
         viewonly=True
     )
\ No newline at end of file
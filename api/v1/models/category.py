@@ -2,7 +2,8 @@ import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session, backref
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index
+from api.db.types import HexUUID
 
 
 class Category(BaseTableModel):
@@ -12,13 +13,27 @@ class Category(BaseTableModel):
     description = sa.Column(sa.Text, nullable=True)
     slug = sa.Column(sa.String, nullable=True, index=True, unique=True)
     model_type = sa.Column(sa.String, nullable=False, index=True)
+    
+    def cache_names(self):
+        # Categories are embedded in the cached items of their model type
+        return ['categories', self.model_type]
    
    
 class CategoryAssociation(BaseTableModel):
     __tablename__ = "category_association"
+    __table_args__ = (
+        # Backs loading the categories of an entity
+        active_index('ix_category_association_entity_id_model_type_active', 'entity_id', 'model_type'),
+        # Keeps live associations unique, the conflict target of bulk association inserts
+        active_index('ix_category_association_model_type_category_id_entity_id_active', 'model_type', 'category_id', 'entity_id', unique=True),
+    )
+    _archive_deleted = False
     
-    entity_id = sa.Column(sa.String, nullable=False, index=True)
+    entity_id = sa.Column(HexUUID, nullable=False, index=True)
     model_type = sa.Column(sa.String, nullable=False, index=True)
-    category_id = sa.Column(sa.String, sa.ForeignKey('categories.id'), nullable=False, index=True)
+    category_id = sa.Column(HexUUID, sa.ForeignKey('categories.id'), nullable=False, index=True)
+    
+    def cache_names(self):
+        return [self.model_type]
 
     category = relationship("Category", backref="category_assoc")
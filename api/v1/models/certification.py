@@ -2,27 +2,32 @@ import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index
+from api.db.types import HexUUID
 
 
 class Certification(BaseTableModel):
     __tablename__ = 'certifications'
+    __table_args__ = (
+        # Default listing: live rows ordered by position
+        active_index('ix_certifications_position_active', 'position'),
+    )
+    _includable_relationships = ('issuer_image', 'certification_file')
+    _ordered = True
 
     name = sa.Column(sa.String, nullable=False)
     issuer = sa.Column(sa.String, nullable=False)
     issue_date = sa.Column(sa.DateTime, nullable=True)
     credential_id = sa.Column(sa.String, nullable=True)
     credential_url = sa.Column(sa.String, nullable=True)
-    issuer_file_id = sa.Column(sa.String, nullable=True)
+    issuer_file_id = sa.Column(HexUUID, nullable=True)
     
     issuer_image = relationship(
         'File', uselist=False,
-        primaryjoin="and_(File.id==foreign(Certification.issuer_file_id), File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(File.id==foreign(Certification.issuer_file_id), File.is_deleted==False)"
     )
     
     certification_file = relationship(
         'File', uselist=False,
-        primaryjoin="and_(foreign(File.model_id)==Certification.id, File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(foreign(File.model_id)==Certification.id, File.is_deleted==False)"
     )
@@ -3,10 +3,13 @@ from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
 from api.core.base.base_model import BaseTableModel
+from api.db.types import HexUUID
 
 
 class Education(BaseTableModel):
     __tablename__ = 'education'
+    _includable_relationships = ('school_logo',)
+    _cache_names = ('educations',)
 
     school = sa.Column(sa.String, nullable=False)
     location = sa.Column(sa.String, nullable=False)
@@ -14,11 +17,10 @@ class Education(BaseTableModel):
     grade = sa.Column(sa.String, nullable=True)
     start_date = sa.Column(sa.DateTime, nullable=False)
     end_date = sa.Column(sa.DateTime, nullable=True)
-    file_id = sa.Column(sa.String, nullable=True)
+    file_id = sa.Column(HexUUID, nullable=True)
     description = sa.Column(sa.Text, nullable=True)
     
     school_logo = relationship(
         'File', uselist=False,
-        primaryjoin="and_(File.id==foreign(Education.file_id), File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(File.id==foreign(Education.file_id), File.is_deleted==False)"
     )
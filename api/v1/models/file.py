@@ -2,19 +2,37 @@ import sqlalchemy as sa
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.ext.hybrid import hybrid_property                      
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index
+from api.db.types import HexUUID
 
 
 class File(BaseTableModel):
     __tablename__ = 'files'
+    __table_args__ = (
+        # Files of one entity, in display order
+        active_index('ix_files_model_name_model_id_position_active', 'model_name', 'model_id', 'position'),
+    )
+    _position_scope = ('model_name', 'model_id')
+    _ordered = True
     
     file_name = sa.Column(sa.String(255), nullable=False, index=True)
     file_path = sa.Column(sa.String(1000), nullable=False, index=True)
     file_size = sa.Column(sa.Integer)
-    model_id = sa.Column(sa.String, nullable=True, index=True)
+    # sha256 of the content, computed while the upload is written
+    content_hash = sa.Column(sa.String(64), nullable=True)
+    model_id = sa.Column(HexUUID, nullable=True, index=True)
     model_name = sa.Column(sa.String(255), nullable=False, index=True)
     url = sa.Column(sa.Text, nullable=False)
     external_url = sa.Column(sa.Text, nullable=True)
     description = sa.Column(sa.Text)
     content = sa.Column(sa.Text)
     label = sa.Column(sa.String)
+    
+    def cache_names(self):
+        # Files are cached per (model_name, model_id), per model_name, across all of them and by id
+        return [
+            f'files:{self.model_name}:{self.model_id or "*"}',
+            f'files:{self.model_name}:*',
+            'files:*:*',
+            'files:by-id',
+        ]
@@ -5,6 +5,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 
 from api.core.base.base_model import BaseTableModel
 from api.db.database import get_db_with_ctx_manager
+from api.db.types import JSONB
 
 
 class Profile(BaseTableModel):
@@ -23,8 +24,8 @@ class Profile(BaseTableModel):
     address = sa.Column(sa.Text, nullable=True)
     short_bio = sa.Column(sa.Text, nullable=True)
     about = sa.Column(sa.Text, nullable=True)
-    interests = sa.Column(sa.JSON, nullable=True)
-    hobbies = sa.Column(sa.JSON, nullable=True)
+    interests = sa.Column(JSONB, nullable=True)
+    hobbies = sa.Column(JSONB, nullable=True)
     resume_url = sa.Column(sa.String, nullable=True)
     github_url = sa.Column(sa.String, nullable=True)
     linkedin_url = sa.Column(sa.String, nullable=True)
@@ -2,21 +2,33 @@ import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index, json_array_index
+from api.db.types import JSONB
 
 
 class Project(BaseTableModel):
     __tablename__ = 'projects'
+    __table_args__ = (
+        # Default listing: live rows ordered by position
+        active_index('ix_projects_position_active', 'position'),
+        # Tool filters (`tools=fastapi,postgres`)
+        json_array_index('ix_projects_tools_gin', 'tools'),
+    )
+    _includable_relationships = ('files', 'tags')
+    _ordered = True
+    # The profile caches its project count
+    _cache_names = ('projects', 'profile')
+    _facet_columns = ('domain', 'project_type', 'sector', 'status')
 
     name = sa.Column(sa.String, nullable=False)
     tagline = sa.Column(sa.String, nullable=True)
     slug = sa.Column(sa.String, nullable=False, index=True, unique=True)
     description = sa.Column(sa.Text)
-    tools = sa.Column(sa.JSON)
-    features = sa.Column(sa.JSON, nullable=True)
-    challenges_and_solutions = sa.Column(sa.JSON, nullable=True)
-    results = sa.Column(sa.JSON, nullable=True)
-    technical_details = sa.Column(sa.JSON, nullable=True)
+    tools = sa.Column(JSONB)
+    features = sa.Column(JSONB, nullable=True)
+    challenges_and_solutions = sa.Column(JSONB, nullable=True)
+    results = sa.Column(JSONB, nullable=True)
+    technical_details = sa.Column(JSONB, nullable=True)
     domain = sa.Column(sa.String, nullable=False, index=True)
     project_type = sa.Column(sa.String, nullable=False, index=True)
     role = sa.Column(sa.String, nullable=False, index=True)
@@ -33,8 +45,7 @@ class Project(BaseTableModel):
     
     files = relationship(
         'File',
-        primaryjoin="and_(foreign(File.model_id)==Project.id, File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(foreign(File.model_id)==Project.id, File.is_deleted==False)"
     )
     
     tags = relationship(
@@ -46,6 +57,5 @@ class Project(BaseTableModel):
         secondaryjoin="and_(Tag.id==foreign(TagAssociation.tag_id), "
                      "Tag.is_deleted==False)",
         backref="projects",
-        lazy='selectin',
         viewonly=True
     )
@@ -2,19 +2,27 @@ import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index, json_array_index
+from api.db.types import HexUUID, JSONB
 
 
 class Service(BaseTableModel):
     __tablename__ = 'services'
+    __table_args__ = (
+        # Default listing: live rows ordered by position
+        active_index('ix_services_position_active', 'position'),
+        # Skill filters (`skills=python,aws`)
+        json_array_index('ix_services_skills_gin', 'skills'),
+    )
+    _includable_relationships = ('service_logo',)
+    _ordered = True
 
     name = sa.Column(sa.String, nullable=False)
     description = sa.Column(sa.Text)
-    skills = sa.Column(sa.JSON)
-    file_id = sa.Column(sa.String, nullable=True)
+    skills = sa.Column(JSONB)
+    file_id = sa.Column(HexUUID, nullable=True)
     
     service_logo = relationship(
         'File', uselist=False,
-        primaryjoin="and_(File.id==foreign(Service.file_id), File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(File.id==foreign(Service.file_id), File.is_deleted==False)"
     )
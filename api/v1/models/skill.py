@@ -2,18 +2,26 @@ import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index
+from api.db.types import HexUUID
 
 
 class Skill(BaseTableModel):
     __tablename__ = 'skills'
+    __table_args__ = (
+        # Default listing: live rows ordered by position
+        active_index('ix_skills_position_active', 'position'),
+    )
+    _includable_relationships = ('skill_logo',)
+    _ordered = True
+    # The profile caches its skill count
+    _cache_names = ('skills', 'profile')
 
     name = sa.Column(sa.String, nullable=False)
     proficiency = sa.Column(sa.Integer)
-    file_id = sa.Column(sa.String, nullable=True)
+    file_id = sa.Column(HexUUID, nullable=True)
     
     skill_logo = relationship(
         'File', uselist=False,
-        primaryjoin="and_(File.id==foreign(Skill.file_id), File.is_deleted==False)",
-        lazy='selectin'
+        primaryjoin="and_(File.id==foreign(Skill.file_id), File.is_deleted==False)"
     )
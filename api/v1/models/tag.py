@@ -2,22 +2,42 @@ import sqlalchemy as sa
 from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
-from api.core.base.base_model import BaseTableModel
+from api.core.base.base_model import BaseTableModel, active_index
+from api.db.types import HexUUID
 
 
 class Tag(BaseTableModel):
     __tablename__ = 'tags'
+    __table_args__ = (
+        # One live tag per name and model type, the conflict target of bulk tag inserts
+        active_index('ix_tags_model_type_name_active', 'model_type', 'name', unique=True),
+    )
 
     name = sa.Column(sa.String, nullable=False, index=True)
     model_type = sa.Column(sa.String, nullable=False, index=True)
+    
+    def cache_names(self):
+        # Tags are embedded in the cached items of their model type
+        return ['tags', self.model_type]
 
 
 class TagAssociation(BaseTableModel):
     __tablename__ = "tag_association"
+    __table_args__ = (
+        # Backs tag filtering (tag ids -> entity ids for one model type) and keeps
+        # live associations unique, the conflict target of bulk association inserts
+        active_index('ix_tag_association_model_type_tag_id_entity_id_active', 'model_type', 'tag_id', 'entity_id', unique=True),
+        # Backs loading the tags of an entity
+        active_index('ix_tag_association_entity_id_model_type_active', 'entity_id', 'model_type'),
+    )
+    _archive_deleted = False
     
-    entity_id = sa.Column(sa.String, nullable=False, index=True)
+    entity_id = sa.Column(HexUUID, nullable=False, index=True)
     model_type = sa.Column(sa.String, nullable=False, index=True)
-    tag_id = sa.Column(sa.String, sa.ForeignKey('tags.id'), nullable=False, index=True)
+    tag_id = sa.Column(HexUUID, sa.ForeignKey('tags.id'), nullable=False, index=True)
+    
+    def cache_names(self):
+        return [self.model_type]
 
     tag = relationship("Tag", backref="tag_assoc")
     
\ No newline at end of file
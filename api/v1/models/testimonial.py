@@ -7,6 +7,7 @@ from api.core.base.base_model import BaseTableModel
 
 class Testimonial(BaseTableModel):
     __tablename__ = 'testimonials'
+    _ordered = True
 
     name = sa.Column(sa.String, nullable=False)
     title = sa.Column(sa.String, nullable=False)
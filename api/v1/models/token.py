@@ -1,8 +1,10 @@
+import datetime as dt
 import sqlalchemy as sa, enum
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from api.core.base.base_model import BaseTableModel
+from api.db.types import HexUUID
 
 
 class TokenType(enum.Enum):
@@ -16,20 +18,37 @@ class TokenType(enum.Enum):
 
 class Token(BaseTableModel):
     __tablename__ = 'tokens'
+    __table_args__ = (
+        # Token lookup and revocation by user and type
+        sa.Index('ix_tokens_user_id_token_type', 'user_id', 'token_type'),
+    )
     
     token = sa.Column(sa.String, nullable=False)
     token_type = sa.Column(sa.String, server_default=TokenType.ACCESS.value)
-    expiry_time = sa.Column(sa.DateTime, nullable=False)
+    # Indexed for the purge of expired tokens
+    expiry_time = sa.Column(sa.DateTime, nullable=False, index=True)
     
-    user_id = sa.Column(sa.String, nullable=True)
+    user_id = sa.Column(HexUUID, nullable=True)
     
     @hybrid_property
     def is_expired(self):
-        return self.expiry_time < sa.func.now()
+        return self.expiry_time < dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+    
+    @is_expired.expression
+    def is_expired(cls):
+        return cls.expiry_time < sa.func.now()
 
 
 class BlacklistedToken(BaseTableModel):
     __tablename__ = 'blacklisted_tokens'
+    __table_args__ = (
+        # Incremental syncs of the in-process revoked token set (see RevokedTokens)
+        sa.Index('ix_blacklisted_tokens_created_at', 'created_at'),
+    )
     
     token = sa.Column(sa.String, nullable=False)
-    user_id = sa.Column(sa.String, nullable=True)
+    # sha256 of `token`, what revocation checks compare
+    token_digest = sa.Column(sa.String(64), nullable=True, index=True)
+    # Expiry of the blacklisted token, after which the entry is purged
+    expiry_time = sa.Column(sa.DateTime, nullable=True, index=True)
+    user_id = sa.Column(HexUUID, nullable=True)
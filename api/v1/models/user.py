@@ -3,6 +3,7 @@ from sqlalchemy import event
 from sqlalchemy.orm import relationship, Session
 
 from api.core.base.base_model import BaseTableModel
+from api.utils.cache import principal_cache
 
 
 class User(BaseTableModel):
@@ -14,5 +15,11 @@ class User(BaseTableModel):
     is_superuser = sa.Column(sa.Boolean, server_default='false')
     last_login = sa.Column(sa.DateTime(timezone=True), server_default=sa.func.now())
     
-    def to_dict(self, excludes = ...):
-        return super().to_dict(excludes=['password', 'is_superuser'])
+    _serializer_excludes = ('password', 'is_superuser')
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_principal(mapper, connection, target):
+    # Deactivation, password and role changes must not be served from the auth cache
+    principal_cache.invalidate_user(target.id)
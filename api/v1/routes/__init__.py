@@ -8,6 +8,7 @@ from api.v1.routes.category import category_router
 from api.v1.routes.certification import certification_router
 from api.v1.routes.education import education_router
 from api.v1.routes.experience import experience_router
+from api.v1.routes.facet import facet_router
 from api.v1.routes.file import file_router
 from api.v1.routes.message import message_router
 from api.v1.routes.project import project_router
@@ -29,6 +30,7 @@ v1_router.include_router(category_router)
 v1_router.include_router(certification_router)
 v1_router.include_router(education_router)
 v1_router.include_router(experience_router)
+v1_router.include_router(facet_router)
 v1_router.include_router(file_router)
 v1_router.include_router(message_router)
 v1_router.include_router(project_router)
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from decouple import config
 
 from api.db.database import get_db
+from api.utils.rate_limiter import limiter
 from api.utils.settings import settings
 from api.utils.loggers import create_logger
 from api.utils.responses import success_response
@@ -39,7 +40,7 @@ async def register(
     if count > 0:
         raise HTTPException(400, "An admin user already exists. Cannot have more than one.")
     
-    new_user, access_token, refresh_token = UserService.create(db, payload, bg_tasks)
+    new_user, access_token, refresh_token = await UserService.create(db, payload, bg_tasks)
     
     logger.info(f'User {new_user.email} created successfully')
         
@@ -67,7 +68,8 @@ async def register(
 
 
 @auth_router.post('/login', status_code=200, response_model=success_response)
-async def login(payload: auth_schemas.LoginSchema, db: Session=Depends(get_db)):
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
+async def login(request: Request, payload: auth_schemas.LoginSchema, db: Session=Depends(get_db)):
     """Endpoint to log in a user
 
     Args:
@@ -75,7 +77,7 @@ async def login(payload: auth_schemas.LoginSchema, db: Session=Depends(get_db)):
         db (Session, optional): _description_. Defaults to Depends(get_db).
     """
     
-    user, access_token, refresh_token = AuthService.authenticate(
+    user, access_token, refresh_token = await AuthService.authenticate(
         db, 
         email=payload.email, 
         password=payload.password
@@ -186,7 +188,7 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
         db (Session, optional): Database session. Defaults to Depends(get_db).
     """
     
-    user, access_token, refresh_token = GoogleOauthService.callback(
+    user, access_token, refresh_token = await GoogleOauthService.callback(
         db=db,
         request=request
     )
@@ -240,7 +242,7 @@ async def google_login(
     ```
     """
     
-    user, access_token, refresh_token = GoogleOauthService.authenticate(
+    user, access_token, refresh_token = await GoogleOauthService.authenticate(
         db=db,
         id_token=token_request.id_token
     )
@@ -305,7 +307,7 @@ async def reset_password(token: str, payload: auth_schemas.ResetPassword, db: Se
     user_id = AuthService.verify_password_reset_token(db, token)
     
     # Update user password
-    password_hash = AuthService.hash_secret(payload.password)
+    password_hash = await AuthService.hash_password(payload.password)
     User.update(db, id=user_id, password=password_hash)
     
     return success_response(
@@ -45,6 +45,8 @@ async def create_award(
 @award_router.get("", status_code=200)
 async def get_awards(
     name: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 30,
     sort_by: str = 'issue_date',
@@ -53,15 +55,19 @@ async def get_awards(
 ):
     """Endpoint to get all awards"""
 
+    selection = Award.resolve_selection(fields=fields, include=include)
+
     use_cache = not name and sort_by == 'issue_date' and order.lower() == 'desc'
 
-    if use_cache and award_cache.has_page(page, per_page):
+    list_cache = award_cache.for_selection(selection) if use_cache else award_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=award_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/awards',
             page=page,
             size=per_page,
-            total=award_cache.total,
+            total=list_cache.total,
         )
 
     query, awards, count = Award.fetch_by_field(
@@ -70,13 +76,14 @@ async def get_awards(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={'name': name},
     )
 
-    items = [award.to_dict() for award in awards]
+    items = [award.to_dict(selection=selection) for award in awards]
 
     if use_cache:
-        award_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -90,12 +97,16 @@ async def get_awards(
 @award_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_award_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a award by ID or unique_id in case ID fails."""
 
-    cached_award = award_cache.get_item(id)
+    selection = Award.resolve_selection(fields=fields, include=include)
+
+    cached_award = award_cache.get_item(id, selection=selection)
     if cached_award:
         return success_response(
             message=f"Fetched award successfully",
@@ -103,14 +114,14 @@ async def get_award_by_id(
             data=cached_award
         )
 
-    award = Award.fetch_by_id(db, id)
+    award = Award.fetch_by_id(db, id, selection=Award.full_selection())
     award_dict = award.to_dict()
     award_cache.store_item(award_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched award successfully",
         status_code=200,
-        data=award_dict
+        data=selection.project(award_dict)
     )
 
 
@@ -1,9 +1,9 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from slugify import slugify
 from sqlalchemy.orm import Session
 
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
 from api.utils import paginator, helpers
 from api.utils.backblaze_service import BackblazeService
 from api.utils.cache import get_cache
@@ -11,10 +11,11 @@ from api.utils.responses import success_response
 from api.utils.settings import settings
 from api.v1.models.user import User
 from api.v1.models.blog import Blog
-from api.v1.models.tag import Tag
 from api.v1.services.auth import AuthService
 from api.v1.services.blog import BlogService
+from api.v1.services.tag import TagService
 from api.v1.schemas import blog as blog_schemas
+from api.v1.schemas.base import ReorderItems
 from api.utils.loggers import create_logger
 
 
@@ -30,19 +31,18 @@ async def create_blog(
 ):
     """Endpoint to create a new blog"""
 
-    max_position = Blog.get_max_position(db)
+    # Slug is derived from the unique id, so both are set before the insert
+    unique_id = helpers.generate_unique_id()
 
     blog = Blog.create(
         db=db,
-        slug=" ",
-        position=max_position+1,
+        unique_id=unique_id,
+        slug=slugify(f"{unique_id}-{payload.title}"),
+        position=Blog.next_position(db),
         published_at=datetime.now(timezone.utc) if payload.is_published else None,
         **payload.model_dump(exclude_unset=True)
     )
 
-    blog.slug = slugify(f"{blog.unique_id}-{blog.title}")
-    db.commit()
-
     blog_cache.clear()
 
     logger.info(f'Blog with id {blog.id} created')
@@ -59,6 +59,9 @@ async def get_blogs(
     search: str = None,
     is_published: bool = None,
     tags: str = None,
+    tag_match: str = 'any',
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 10,
     sort_by: str = 'created_at',
@@ -67,18 +70,40 @@ async def get_blogs(
 ):
     """Endpoint to get all blogs"""
 
+    selection = Blog.resolve_selection(fields=fields, include=include)
+
+    # Tag filtered listings are paginated in the query and cached per filter
+    tag_filter = None
+    variant_key = None
+    if tags:
+        if tag_match.lower() not in ('any', 'all'):
+            raise HTTPException(400, detail="tag_match must be either 'any' or 'all'")
+
+        tag_list = sorted({tag.lower() for tag in helpers.parse_csv(tags)})
+        match_all = tag_match.lower() == 'all'
+        tag_filter = TagService.build_tag_filter(Blog, tag_list, match_all=match_all)
+        variant_key = f"tags:{tag_match.lower()}:{','.join(tag_list)}"
+
     use_cache = (
-        not search and not tags and is_published is None
+        not search and is_published is None
         and sort_by == 'created_at' and order.lower() == 'desc'
     )
 
-    if use_cache and blog_cache.has_page(page, per_page):
+    list_cache = blog_cache
+    if use_cache and variant_key:
+        list_cache = blog_cache.variant(variant_key)
+
+    if use_cache:
+        # Pages are cached per selection, see `for_selection`
+        list_cache = list_cache.for_selection(selection)
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=blog_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/blogs',
             page=page,
             size=per_page,
-            total=blog_cache.total,
+            total=list_cache.total,
         )
 
     query, blogs, count = Blog.fetch_by_field(
@@ -87,21 +112,18 @@ async def get_blogs(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
+        filter_expr=tag_filter,
         search_fields={
             'title': search,
         },
         is_published=is_published,
     )
 
-    if tags:
-        tag_list = tags.split(',')
-        query = query.filter(Blog.tags.any(Tag.name.in_(tag_list)))
-        blogs, count = query.all(), query.count()
-
-    items = [blog.to_dict() for blog in blogs]
+    items = [blog.to_dict(selection=selection) for blog in blogs]
 
     if use_cache:
-        blog_cache.store_page(items, count, 'id', 'unique_id', 'slug')
+        list_cache.store_page(items, count, 'id', 'unique_id', 'slug')
 
     return paginator.build_paginated_response(
         items=items,
@@ -115,11 +137,15 @@ async def get_blogs(
 @blog_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_blog_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
 ):
     """Endpoint to get a blog by ID or unique_id in case ID fails."""
 
-    cached_blog = blog_cache.get_item(id)
+    selection = Blog.resolve_selection(fields=fields, include=include)
+
+    cached_blog = blog_cache.get_item(id, selection=selection)
     if cached_blog:
         return success_response(
             message=f"Fetched blog successfully",
@@ -127,38 +153,60 @@ async def get_blog_by_id(
             data=cached_blog
         )
 
-    blog = Blog.fetch_by_id(db, id)
+    blog = Blog.fetch_by_id(db, id, selection=Blog.full_selection())
     blog_dict = blog.to_dict()
     blog_cache.store_item(blog_dict, 'id', 'unique_id', 'slug')
 
     return success_response(
         message=f"Fetched blog successfully",
         status_code=200,
-        data=blog_dict
+        data=selection.project(blog_dict)
+    )
+
+
+@blog_router.put("/order", status_code=200, response_model=success_response)
+async def reorder_blogs(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder blogs. `ids` lists every blog in the new order."""
+
+    Blog.reorder(db, payload.ids)
+
+    blog_cache.clear()
+
+    logger.info(f'Blog order updated')
+
+    return success_response(
+        message=f"Blogs reordered successfully",
+        status_code=200
     )
 
 
 @blog_router.patch("/{id}", status_code=200, response_model=success_response)
 async def update_blog(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: blog_schemas.UpdateBlog,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to update a blog"""
 
-    if payload.position:
-        Blog.move_to_position(db, id, payload.position)
+    with unit_of_work(db):
+        if payload.position:
+            Blog.move_to_position(db, id, payload.position, bg_tasks=bg_tasks, commit=False)
 
-    blog = Blog.update(
-        db=db,
-        id=id,
-        **payload.model_dump(exclude_unset=True, exclude={'position'})
-    )
+        blog = Blog.update(
+            db=db,
+            id=id,
+            commit=False,
+            **payload.model_dump(exclude_unset=True, exclude={'position'})
+        )
 
-    if payload.is_published and not blog.published_at:
-        blog.published_at = datetime.now(timezone.utc)
-        db.commit()
+        if payload.is_published and not blog.published_at:
+            blog.published_at = datetime.now(timezone.utc)
 
     blog_cache.clear()
 
@@ -50,6 +50,7 @@ async def get_categories(
     name: str = None,
     slug: str = None,
     model_type: str = None,
+    fields: str = None,
     page: int = 1,
     per_page: int = 25,
     sort_by: str = 'created_at',
@@ -59,18 +60,22 @@ async def get_categories(
 ):
     """Endpoint to get all categories"""
 
+    selection = Category.resolve_selection(fields=fields)
+
     use_cache = (
         not unique_id and not name and not slug and not model_type
         and sort_by == 'created_at' and order.lower() == 'desc'
     )
 
-    if use_cache and category_cache.has_page(page, per_page):
+    list_cache = category_cache.for_selection(selection) if use_cache else category_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=category_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/categories',
             page=page,
             size=per_page,
-            total=category_cache.total,
+            total=list_cache.total,
         )
 
     query, categories, count = Category.fetch_by_field(
@@ -79,6 +84,7 @@ async def get_categories(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={
             'name': name,
             'unique_id': unique_id,
@@ -87,10 +93,10 @@ async def get_categories(
         model_type=model_type,
     )
 
-    items = [category.to_dict() for category in categories]
+    items = [category.to_dict(selection=selection) for category in categories]
 
     if use_cache:
-        category_cache.store_page(items, count, 'id', 'unique_id', 'slug')
+        list_cache.store_page(items, count, 'id', 'unique_id', 'slug')
 
     return paginator.build_paginated_response(
         items=items,
@@ -152,12 +158,15 @@ async def detatch_category_from_entity(
 @category_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_category_by_id(
     id: str,
+    fields: str = None,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a category by ID or unique_id in case ID fails."""
 
-    cached_category = category_cache.get_item(id)
+    selection = Category.resolve_selection(fields=fields)
+
+    cached_category = category_cache.get_item(id, selection=selection)
     if cached_category:
         return success_response(
             message=f"Fetched category successfully",
@@ -165,14 +174,14 @@ async def get_category_by_id(
             data=cached_category
         )
 
-    category = Category.fetch_by_id(db, id)
+    category = Category.fetch_by_id(db, id, selection=Category.full_selection())
     category_dict = category.to_dict()
     category_cache.store_item(category_dict, 'id', 'unique_id', 'slug')
 
     return success_response(
         message=f"Fetched category successfully",
         status_code=200,
-        data=category_dict
+        data=selection.project(category_dict)
     )
 
 
@@ -194,6 +203,9 @@ async def update_category(
     )
 
     category_cache.clear()
+    # cached `categories` fields and category facet counts of the categorised model are stale
+    get_cache(prev_category.model_type).clear()
+    get_cache(category.model_type).clear()
 
     return success_response(
         message=f"Category updated successfully",
@@ -210,9 +222,11 @@ async def delete_category(
 ):
     """Endpoint to delete a category"""
 
-    Category.soft_delete(db, id)
+    category = Category.fetch_by_id(db, id)
+    Category.soft_delete(db, category.id)
 
     category_cache.clear()
+    get_cache(category.model_type).clear()
 
     return success_response(
         message=f"Deleted successfully",
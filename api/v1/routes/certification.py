@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
 from api.utils import paginator, helpers
 from api.utils.cache import get_cache
 from api.utils.responses import success_response
@@ -12,6 +12,7 @@ from api.v1.models.certification import Certification
 from api.v1.services.auth import AuthService
 from api.v1.services.certification import CertificationService
 from api.v1.schemas import certification as certification_schemas
+from api.v1.schemas.base import ReorderItems
 from api.utils.loggers import create_logger
 
 
@@ -27,11 +28,9 @@ async def create_certification(
 ):
     """Endpoint to create a new certification"""
 
-    max_position = Certification.get_max_position(db)
-
     certification = Certification.create(
         db=db,
-        position=max_position+1,
+        position=Certification.next_position(db),
         **payload.model_dump(exclude_unset=True)
     )
 
@@ -49,6 +48,8 @@ async def create_certification(
 @certification_router.get("", status_code=200)
 async def get_certifications(
     name: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 10,
     sort_by: str = 'position',
@@ -57,15 +58,19 @@ async def get_certifications(
 ):
     """Endpoint to get all certifications"""
 
+    selection = Certification.resolve_selection(fields=fields, include=include)
+
     use_cache = not name and sort_by == 'position' and order.lower() == 'asc'
 
-    if use_cache and certification_cache.has_page(page, per_page):
+    list_cache = certification_cache.for_selection(selection) if use_cache else certification_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=certification_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/certifications',
             page=page,
             size=per_page,
-            total=certification_cache.total,
+            total=list_cache.total,
         )
 
     query, certifications, count = Certification.fetch_by_field(
@@ -74,13 +79,14 @@ async def get_certifications(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={'name': name},
     )
 
-    items = [certification.to_dict() for certification in certifications]
+    items = [certification.to_dict(selection=selection) for certification in certifications]
 
     if use_cache:
-        certification_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -94,12 +100,16 @@ async def get_certifications(
 @certification_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_certification_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a certification by ID or unique_id in case ID fails."""
 
-    cached_certification = certification_cache.get_item(id)
+    selection = Certification.resolve_selection(fields=fields, include=include)
+
+    cached_certification = certification_cache.get_item(id, selection=selection)
     if cached_certification:
         return success_response(
             message=f"Fetched certification successfully",
@@ -107,34 +117,57 @@ async def get_certification_by_id(
             data=cached_certification
         )
 
-    certification = Certification.fetch_by_id(db, id)
+    certification = Certification.fetch_by_id(db, id, selection=Certification.full_selection())
     certification_dict = certification.to_dict()
     certification_cache.store_item(certification_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched certification successfully",
         status_code=200,
-        data=certification_dict
+        data=selection.project(certification_dict)
+    )
+
+
+@certification_router.put("/order", status_code=200, response_model=success_response)
+async def reorder_certifications(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder certifications. `ids` lists every certification in the new order."""
+
+    Certification.reorder(db, payload.ids)
+
+    certification_cache.clear()
+
+    logger.info(f'Certification order updated')
+
+    return success_response(
+        message=f"Certifications reordered successfully",
+        status_code=200
     )
 
 
 @certification_router.patch("/{id}", status_code=200, response_model=success_response)
 async def update_certification(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: certification_schemas.UpdateCertification,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to update a certification"""
     
-    if payload.position:
-        Certification.move_to_position(db, id, payload.position)
-
-    certification = Certification.update(
-        db=db,
-        id=id,
-        **payload.model_dump(exclude_unset=True)
-    )
+    with unit_of_work(db):
+        if payload.position:
+            Certification.move_to_position(db, id, payload.position, bg_tasks=bg_tasks, commit=False)
+
+        certification = Certification.update(
+            db=db,
+            id=id,
+            commit=False,
+            **payload.model_dump(exclude_unset=True, exclude={'position'})
+        )
 
     certification_cache.clear()
 
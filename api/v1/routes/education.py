@@ -45,6 +45,8 @@ async def create_education(
 @education_router.get("", status_code=200)
 async def get_educations(
     school: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 10,
     sort_by: str = 'start_date',
@@ -53,15 +55,19 @@ async def get_educations(
 ):
     """Endpoint to get all educations"""
 
+    selection = Education.resolve_selection(fields=fields, include=include)
+
     use_cache = not school and sort_by == 'start_date' and order.lower() == 'desc'
 
-    if use_cache and education_cache.has_page(page, per_page):
+    list_cache = education_cache.for_selection(selection) if use_cache else education_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=education_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/educations',
             page=page,
             size=per_page,
-            total=education_cache.total,
+            total=list_cache.total,
         )
 
     query, educations, count = Education.fetch_by_field(
@@ -70,13 +76,14 @@ async def get_educations(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={'school': school},
     )
 
-    items = [education.to_dict() for education in educations]
+    items = [education.to_dict(selection=selection) for education in educations]
 
     if use_cache:
-        education_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -90,12 +97,16 @@ async def get_educations(
 @education_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_education_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a education by ID or unique_id in case ID fails."""
 
-    cached_education = education_cache.get_item(id)
+    selection = Education.resolve_selection(fields=fields, include=include)
+
+    cached_education = education_cache.get_item(id, selection=selection)
     if cached_education:
         return success_response(
             message=f"Fetched education successfully",
@@ -103,14 +114,14 @@ async def get_education_by_id(
             data=cached_education
         )
 
-    education = Education.fetch_by_id(db, id)
+    education = Education.fetch_by_id(db, id, selection=Education.full_selection())
     education_dict = education.to_dict()
     education_cache.store_item(education_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched education successfully",
         status_code=200,
-        data=education_dict
+        data=selection.project(education_dict)
     )
 
 
@@ -45,6 +45,8 @@ async def create_experience(
 @experience_router.get("", status_code=200)
 async def get_experiences(
     company: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 30,
     sort_by: str = 'start_date',
@@ -53,15 +55,19 @@ async def get_experiences(
 ):
     """Endpoint to get all experiences"""
 
+    selection = Experience.resolve_selection(fields=fields, include=include)
+
     use_cache = not company and sort_by == 'start_date' and order.lower() == 'desc'
 
-    if use_cache and experience_cache.has_page(page, per_page):
+    list_cache = experience_cache.for_selection(selection) if use_cache else experience_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=experience_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/experiences',
             page=page,
             size=per_page,
-            total=experience_cache.total,
+            total=list_cache.total,
         )
 
     query, experiences, count = Experience.fetch_by_field(
@@ -70,13 +76,14 @@ async def get_experiences(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={'company': company},
     )
 
-    items = [experience.to_dict() for experience in experiences]
+    items = [experience.to_dict(selection=selection) for experience in experiences]
 
     if use_cache:
-        experience_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -90,12 +97,16 @@ async def get_experiences(
 @experience_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_experience_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a experience by ID or unique_id in case ID fails."""
 
-    cached_experience = experience_cache.get_item(id)
+    selection = Experience.resolve_selection(fields=fields, include=include)
+
+    cached_experience = experience_cache.get_item(id, selection=selection)
     if cached_experience:
         return success_response(
             message=f"Fetched experience successfully",
@@ -103,14 +114,14 @@ async def get_experience_by_id(
             data=cached_experience
         )
 
-    experience = Experience.fetch_by_id(db, id)
+    experience = Experience.fetch_by_id(db, id, selection=Experience.full_selection())
     experience_dict = experience.to_dict()
     experience_cache.store_item(experience_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched experience successfully",
         status_code=200,
-        data=experience_dict
+        data=selection.project(experience_dict)
     )
 
 
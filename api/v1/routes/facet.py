@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from api.db.database import get_db
+from api.utils.cache import get_cache
+from api.utils.responses import success_response
+from api.v1.services.facet import FacetService
+from api.utils.loggers import create_logger
+
+
+facet_router = APIRouter(prefix='/facets', tags=['Facet'])
+logger = create_logger(__name__)
+FACETS_CACHE_KEY = 'facets'
+
+@facet_router.get("/{model_type}", status_code=200, response_model=success_response)
+async def get_facets(
+    model_type: str,
+    db: Session=Depends(get_db), 
+):
+    """Endpoint to get the facet counts of a model type (eg. `projects`), for tag clouds
+    and filter sidebars: how many live records carry each tag and category, and each
+    value of the model's filterable columns.
+    """
+
+    model_type = model_type.lower()
+    FacetService.get_model(model_type)
+
+    # Kept as a variant of the model's cache, so every write that clears it
+    # (entity writes, tag/category attach, detach, update and delete) also
+    # invalidates the counts
+    facet_cache = get_cache(model_type).variant(FACETS_CACHE_KEY)
+
+    facets = facet_cache.get_item(FACETS_CACHE_KEY)
+    if facets is None:
+        facets = FacetService.get_facets(db, model_type)
+        facet_cache.put(FACETS_CACHE_KEY, facets)
+
+    return success_response(
+        message=f"Fetched facets successfully",
+        status_code=200,
+        data=facets
+    )
@@ -1,5 +1,6 @@
 import os
-from fastapi import APIRouter, Depends, Form
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Form
 from sqlalchemy.orm import Session
 
 from api.db.database import get_db
@@ -14,6 +15,7 @@ from api.v1.models.file import File as FileModel
 from api.v1.services.auth import AuthService
 from api.v1.services.file import FileService
 from api.v1.schemas import file as file_schemas
+from api.v1.schemas.base import RecordId, ReorderItems
 from api.utils.loggers import create_logger
 
 
@@ -203,9 +205,10 @@ async def upload_file_to_backblaze(
 @file_router.get("/files", status_code=200)
 async def get_files(
     model_name: str = None,
-    model_id: str = None,
+    model_id: Optional[RecordId] = None,
     file_name: str = None,
     label: str = None,
+    fields: str = None,
     page: int = 1,
     per_page: int = 500,
     sort_by: str = 'position',
@@ -220,9 +223,15 @@ async def get_files(
         entity (User, optional): Current logged in user for authentication. Defaults to Depends(AuthService.get_current_entity).
     """
 
+    selection = FileModel.resolve_selection(fields=fields)
+
     use_cache = not file_name and not label and sort_by == 'position' and order.lower() == 'asc'
     list_cache = _file_list_cache(model_name, model_id)
 
+    if use_cache:
+        # Pages are cached per selection, see `for_selection`
+        list_cache = list_cache.for_selection(selection)
+
     if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
             items=list_cache.get_page(page, per_page),
@@ -238,6 +247,7 @@ async def get_files(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={
             'file_name': file_name,
             'label': label,
@@ -246,12 +256,14 @@ async def get_files(
         model_id=model_id,
     )
 
-    items = [file.to_dict() for file in files]
+    items = [file.to_dict(selection=selection) for file in files]
 
     if use_cache:
         list_cache.store_page(items, count, 'id', 'unique_id')
-        for item in items:
-            file_id_cache.store_item(item, 'id', 'unique_id')
+        if not selection.is_partial:
+            # Id lookups are served full files only
+            for item in items:
+                file_id_cache.store_item(item, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -265,6 +277,7 @@ async def get_files(
 @file_router.get("/files/{id}", status_code=200, response_model=success_response)
 async def get_file_by_id(
     id: str,
+    fields: str = None,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
@@ -275,7 +288,9 @@ async def get_file_by_id(
         current_user (User, optional): Current logged in user for authentication. Defaults to Depends(AuthService.get_current_entity).
     """
 
-    cached_file = file_id_cache.get_item(id)
+    selection = FileModel.resolve_selection(fields=fields)
+
+    cached_file = file_id_cache.get_item(id, selection=selection)
     if cached_file:
         return success_response(
             message=f"Fetched file successfully",
@@ -283,20 +298,47 @@ async def get_file_by_id(
             data=cached_file
         )
 
-    file = FileModel.fetch_by_id(db, id)
+    file = FileModel.fetch_by_id(db, id, selection=FileModel.full_selection())
     file_dict = file.to_dict()
     file_id_cache.store_item(file_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched file successfully",
         status_code=200,
-        data=file_dict
+        data=selection.project(file_dict)
+    )
+
+
+@file_router.put("/files/order", status_code=200, response_model=success_response)
+async def reorder_files(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder the files of an entity
+
+    Args:
+        payload: `ids` lists every file of one model_name/model_id in the new order.
+        db (Session, optional): DB session. Defaults to Depends(get_db).
+        entity (User, optional): Current logged in user for authentication. Defaults to Depends(AuthService.get_current_entity).
+    """
+
+    scope = FileModel.reorder(db, payload.ids)
+
+    _clear_file_caches(scope.get('model_name'), scope.get('model_id'))
+
+    logger.info(f'File order updated for {scope}')
+
+    return success_response(
+        message=f"Files reordered successfully",
+        status_code=200
     )
 
 
 @file_router.patch("/files/{id}", status_code=200, response_model=success_response)
 async def update_file(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: file_schemas.UpdateFile = Depends(file_schemas.UpdateFile.as_form),
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
@@ -313,9 +355,12 @@ async def update_file(
     file_instance = FileModel.fetch_by_id(db, id)
     
     if payload.position:
+        # Left pending, the update below commits it along with the other changes
         FileService.move_file_to_position(
             db=db, file_id=file_instance.id,
-            new_position=payload.position
+            new_position=payload.position,
+            bg_tasks=bg_tasks,
+            commit=False
         )
     
     # if payload.file:
@@ -348,7 +393,7 @@ async def update_file(
     updated_file = FileModel.update(
         db=db,
         id=id,
-        **payload.model_dump(exclude_unset=True)
+        **payload.model_dump(exclude_unset=True, exclude={'position'})
     )
 
     _clear_file_caches(file_instance.model_name, file_instance.model_id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from sqlalchemy.orm import Session
 from decouple import config
 
@@ -6,6 +6,7 @@ from api.core.dependencies.email_sending_service import send_email
 from api.db.database import get_db
 from api.utils import paginator, helpers
 from api.utils.cache import get_cache
+from api.utils.rate_limiter import limiter
 from api.utils.responses import success_response
 from api.utils.settings import settings
 from api.v1.models.user import User
@@ -21,7 +22,9 @@ logger = create_logger(__name__)
 message_cache = get_cache('messages')
 
 @message_router.post("/send", status_code=201, response_model=success_response)
+@limiter.limit(settings.RATE_LIMIT_SEND_MESSAGE)
 async def send_message(
+    request: Request,
     bg_tasks: BackgroundTasks,
     payload: message_schemas.MessageBase,
     db: Session=Depends(get_db),
@@ -64,6 +67,7 @@ async def send_message(
 async def get_messages(
     name: str = None,
     email: str = None,
+    fields: str = None,
     page: int = 1,
     per_page: int = 10,
     sort_by: str = 'created_at',
@@ -73,15 +77,19 @@ async def get_messages(
 ):
     """Endpoint to get all messages"""
 
+    selection = Message.resolve_selection(fields=fields)
+
     use_cache = not name and not email and sort_by == 'created_at' and order.lower() == 'desc'
 
-    if use_cache and message_cache.has_page(page, per_page):
+    list_cache = message_cache.for_selection(selection) if use_cache else message_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=message_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/messages',
             page=page,
             size=per_page,
-            total=message_cache.total,
+            total=list_cache.total,
         )
 
     query, messages, count = Message.fetch_by_field(
@@ -90,16 +98,17 @@ async def get_messages(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={
             'name': name,
             'email': email,
         },
     )
 
-    items = [message.to_dict() for message in messages]
+    items = [message.to_dict(selection=selection) for message in messages]
 
     if use_cache:
-        message_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -113,12 +122,15 @@ async def get_messages(
 @message_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_message_by_id(
     id: str,
+    fields: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a message by ID or unique_id in case ID fails."""
 
-    cached_message = message_cache.get_item(id)
+    selection = Message.resolve_selection(fields=fields)
+
+    cached_message = message_cache.get_item(id, selection=selection)
     if cached_message:
         return success_response(
             message=f"Fetched message successfully",
@@ -126,14 +138,14 @@ async def get_message_by_id(
             data=cached_message
         )
 
-    message = Message.fetch_by_id(db, id)
+    message = Message.fetch_by_id(db, id, selection=Message.full_selection())
     message_dict = message.to_dict()
     message_cache.store_item(message_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched message successfully",
         status_code=200,
-        data=message_dict
+        data=selection.project(message_dict)
     )
 
 
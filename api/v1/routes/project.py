@@ -1,24 +1,27 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from slugify import slugify
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
+from api.db.types import json_array_contains
 from api.utils import paginator, helpers
 from api.utils.cache import get_cache
 from api.utils.responses import success_response
 from api.utils.settings import settings
 from api.v1.models.user import User
 from api.v1.models.project import Project
-from api.v1.models.tag import Tag
 from api.v1.services.auth import AuthService
 from api.v1.services.project import ProjectService
+from api.v1.services.tag import TagService
 from api.v1.schemas import project as project_schemas
+from api.v1.schemas.base import ReorderItems
 from api.utils.loggers import create_logger
 
 
 project_router = APIRouter(prefix='/projects', tags=['Project'])
 logger = create_logger(__name__)
+profile_cache = get_cache('profile')
 project_cache = get_cache('projects')
 
 @project_router.post("", status_code=201, response_model=success_response)
@@ -29,25 +32,26 @@ async def create_project(
 ):
     """Endpoint to create a new project"""
     
-    max_position = Project.get_max_position(db)
-    
     if payload.technical_details:
         payload.technical_details = helpers.format_additional_info_create(payload.technical_details)
         
     if payload.challenges_and_solutions:
         payload.challenges_and_solutions = helpers.format_additional_info_create(payload.challenges_and_solutions)
         
+    # Slug is derived from the unique id, so both are set before the insert
+    unique_id = helpers.generate_unique_id()
+    
     project = Project.create(
         db=db,
-        slug=" ",
-        position=max_position+1,
+        unique_id=unique_id,
+        slug=slugify(f"{unique_id}-{payload.name}"),
+        position=Project.next_position(db),
         **payload.model_dump(exclude_unset=True)
     )
-    
-    project.slug = slugify(f"{project.unique_id}-{project.name}")
-    db.commit()
 
     project_cache.clear()
+    # The cached profile holds projects_count
+    profile_cache.clear()
 
     logger.info(f'Project with id {project.id} created')
 
@@ -65,6 +69,10 @@ async def get_projects(
     slug: str = None,
     project_type: str = None,
     tags: str = None,
+    tag_match: str = 'any',
+    tools: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 10,
     sort_by: str = 'position',
@@ -73,18 +81,46 @@ async def get_projects(
 ):
     """Endpoint to get all projects"""
 
+    selection = Project.resolve_selection(fields=fields, include=include)
+
+    # Tag and tool filtered listings are paginated in the query and cached per filter
+    filters = []
+    variant_keys = []
+    if tags:
+        if tag_match.lower() not in ('any', 'all'):
+            raise HTTPException(400, detail="tag_match must be either 'any' or 'all'")
+
+        tag_list = sorted({tag.lower() for tag in helpers.parse_csv(tags)})
+        match_all = tag_match.lower() == 'all'
+        filters.append(TagService.build_tag_filter(Project, tag_list, match_all=match_all))
+        variant_keys.append(f"tags:{tag_match.lower()}:{','.join(tag_list)}")
+
+    if tools:
+        # Projects using every listed tool, served by the GIN index on tools
+        tool_list = sorted({tool.lower() for tool in helpers.parse_csv(tools)})
+        filters.append(json_array_contains(Project.tools, tool_list))
+        variant_keys.append(f"tools:{','.join(tool_list)}")
+
     use_cache = (
-        not name and not slug and not domain and not project_type and not tags
+        not name and not slug and not domain and not project_type
         and sort_by == 'position' and order.lower() == 'asc'
     )
 
-    if use_cache and project_cache.has_page(page, per_page):
+    list_cache = project_cache
+    if use_cache and variant_keys:
+        list_cache = project_cache.variant('|'.join(variant_keys))
+
+    if use_cache:
+        # Pages are cached per selection, see `for_selection`
+        list_cache = list_cache.for_selection(selection)
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=project_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/projects',
             page=page,
             size=per_page,
-            total=project_cache.total,
+            total=list_cache.total,
         )
 
     query, projects, count = Project.fetch_by_field(
@@ -93,6 +129,8 @@ async def get_projects(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
+        filter_expr=sa.and_(*filters) if filters else None,
         search_fields={
             'name': name,
         },
@@ -101,15 +139,10 @@ async def get_projects(
         project_type=project_type,
     )
 
-    if tags:
-        tag_list = tags.split(',')
-        query = query.filter(Project.tags.any(Tag.name.in_(tag_list)))
-        projects, count = query.all(), query.count()
-
-    items = [project.to_dict() for project in projects]
+    items = [project.to_dict(selection=selection) for project in projects]
 
     if use_cache:
-        project_cache.store_page(items, count, 'id', 'unique_id', 'slug')
+        list_cache.store_page(items, count, 'id', 'unique_id', 'slug')
 
     return paginator.build_paginated_response(
         items=items,
@@ -122,17 +155,24 @@ async def get_projects(
 
 @project_router.get("/featured", status_code=200)
 async def get_featured_projects(
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db)
 ):
     """Endpoint to get all projects"""
 
-    if project_cache.has_page(1, 4):
+    selection = Project.resolve_selection(fields=fields, include=include)
+
+    # The first page of the default listing, when it is cached for this selection
+    list_cache = project_cache.for_selection(selection)
+
+    if list_cache.has_page(1, 4):
         return paginator.build_paginated_response(
-            items=project_cache.get_page(1, 4),
+            items=list_cache.get_page(1, 4),
             endpoint='/projects/featured',
             page=1,
             size=4,
-            total=project_cache.total,
+            total=list_cache.total,
         )
 
     query, projects, count = Project.fetch_by_field(
@@ -141,10 +181,11 @@ async def get_featured_projects(
         order='asc',
         page=1,
         per_page=4,
+        selection=selection,
     )
 
     return paginator.build_paginated_response(
-        items=[project.to_dict() for project in projects],
+        items=[project.to_dict(selection=selection) for project in projects],
         endpoint='/projects/featured',
         page=1,
         size=4,
@@ -155,11 +196,15 @@ async def get_featured_projects(
 @project_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_project_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
 ):
     """Endpoint to get a project by ID or unique_id in case ID fails."""
 
-    cached_project = project_cache.get_item(id)
+    selection = Project.resolve_selection(fields=fields, include=include)
+
+    cached_project = project_cache.get_item(id, selection=selection)
     if cached_project:
         return success_response(
             message=f"Fetched project successfully",
@@ -167,52 +212,73 @@ async def get_project_by_id(
             data=cached_project
         )
 
-    project = Project.fetch_by_id(db, id)
+    project = Project.fetch_by_id(db, id, selection=Project.full_selection())
     project_dict = project.to_dict()
     project_cache.store_item(project_dict, 'id', 'unique_id', 'slug')
 
     return success_response(
         message=f"Fetched project successfully",
         status_code=200,
-        data=project_dict
+        data=selection.project(project_dict)
+    )
+
+
+@project_router.put("/order", status_code=200, response_model=success_response)
+async def reorder_projects(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder projects. `ids` lists every project in the new order."""
+
+    Project.reorder(db, payload.ids)
+
+    project_cache.clear()
+
+    logger.info(f'Project order updated')
+
+    return success_response(
+        message=f"Projects reordered successfully",
+        status_code=200
     )
 
 
 @project_router.patch("/{id}", status_code=200, response_model=success_response)
 async def update_project(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: project_schemas.UpdateProject,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to update a project"""
     
-    if payload.position:
-        Project.move_to_position(db, id, payload.position)
-
-    project = Project.update(
-        db=db,
-        id=id,
-        **payload.model_dump(exclude_unset=True, exclude={'technical_details', 'challenges_and_solutions'})
-    )
-    
-    if payload.technical_details:
-        project.technical_details = helpers.format_additional_info_update(
-            additional_info=payload.technical_details,
-            model_instance=project,
-            model_instance_additional_info_name='technical_details',
-            keys_to_remove=payload.technical_details_keys_to_remove
+    with unit_of_work(db):
+        if payload.position:
+            Project.move_to_position(db, id, payload.position, bg_tasks=bg_tasks, commit=False)
+
+        project = Project.update(
+            db=db,
+            id=id,
+            commit=False,
+            **payload.model_dump(exclude_unset=True, exclude={'position', 'technical_details', 'challenges_and_solutions'})
         )
-    
-    if payload.challenges_and_solutions:
-        project.challenges_and_solutions = helpers.format_additional_info_update(
-            additional_info=payload.challenges_and_solutions,
-            model_instance=project,
-            model_instance_additional_info_name='challenges_and_solutions',
-            keys_to_remove=payload.challenges_and_solutions_keys_to_remove
-        )
-        
-    db.commit()
+
+        if payload.technical_details:
+            project.technical_details = helpers.format_additional_info_update(
+                additional_info=payload.technical_details,
+                model_instance=project,
+                model_instance_additional_info_name='technical_details',
+                keys_to_remove=payload.technical_details_keys_to_remove
+            )
+
+        if payload.challenges_and_solutions:
+            project.challenges_and_solutions = helpers.format_additional_info_update(
+                additional_info=payload.challenges_and_solutions,
+                model_instance=project,
+                model_instance_additional_info_name='challenges_and_solutions',
+                keys_to_remove=payload.challenges_and_solutions_keys_to_remove
+            )
 
     project_cache.clear()
 
@@ -236,6 +302,8 @@ async def delete_project(
     Project.soft_delete(db, id)
 
     project_cache.clear()
+    # The cached profile holds projects_count
+    profile_cache.clear()
 
     return success_response(
         message=f"Deleted successfully",
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from sqlalchemy.orm import Session
 
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
+from api.db.types import json_array_contains
 from api.utils import paginator, helpers
 from api.utils.cache import get_cache
 from api.utils.responses import success_response
@@ -11,6 +12,7 @@ from api.v1.models.service import Service
 from api.v1.services.auth import AuthService
 from api.v1.services.service import ServiceService
 from api.v1.schemas import service as service_schemas
+from api.v1.schemas.base import ReorderItems
 from api.utils.loggers import create_logger
 
 
@@ -26,11 +28,9 @@ async def create_service(
 ):
     """Endpoint to create a new service"""
 
-    max_position = Service.get_max_position(db)
-
     service = Service.create(
         db=db,
-        position=max_position+1,
+        position=Service.next_position(db),
         **payload.model_dump(exclude_unset=True)
     )
 
@@ -48,6 +48,9 @@ async def create_service(
 @service_router.get("", status_code=200)
 async def get_services(
     name: str = None,
+    skills: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 20,
     sort_by: str = 'position',
@@ -56,15 +59,34 @@ async def get_services(
 ):
     """Endpoint to get all services"""
 
+    selection = Service.resolve_selection(fields=fields, include=include)
+
+    # Skill filtered listings are cached per filter
+    skill_filter = None
+    variant_key = None
+    if skills:
+        # Services offering every listed skill, served by the GIN index on skills
+        skill_list = sorted({skill.lower() for skill in helpers.parse_csv(skills)})
+        skill_filter = json_array_contains(Service.skills, skill_list)
+        variant_key = f"skills:{','.join(skill_list)}"
+
     use_cache = not name and sort_by == 'position' and order.lower() == 'asc'
 
-    if use_cache and service_cache.has_page(page, per_page):
+    list_cache = service_cache
+    if use_cache and variant_key:
+        list_cache = service_cache.variant(variant_key)
+
+    if use_cache:
+        # Pages are cached per selection, see `for_selection`
+        list_cache = list_cache.for_selection(selection)
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=service_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/services',
             page=page,
             size=per_page,
-            total=service_cache.total,
+            total=list_cache.total,
         )
 
     query, services, count = Service.fetch_by_field(
@@ -73,15 +95,17 @@ async def get_services(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
+        filter_expr=skill_filter,
         search_fields={
             'name': name,
         },
     )
 
-    items = [service.to_dict() for service in services]
+    items = [service.to_dict(selection=selection) for service in services]
 
     if use_cache:
-        service_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -95,12 +119,16 @@ async def get_services(
 @service_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_service_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a service by ID or unique_id in case ID fails."""
 
-    cached_service = service_cache.get_item(id)
+    selection = Service.resolve_selection(fields=fields, include=include)
+
+    cached_service = service_cache.get_item(id, selection=selection)
     if cached_service:
         return success_response(
             message=f"Fetched service successfully",
@@ -108,34 +136,57 @@ async def get_service_by_id(
             data=cached_service
         )
 
-    service = Service.fetch_by_id(db, id)
+    service = Service.fetch_by_id(db, id, selection=Service.full_selection())
     service_dict = service.to_dict()
     service_cache.store_item(service_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched service successfully",
         status_code=200,
-        data=service_dict
+        data=selection.project(service_dict)
+    )
+
+
+@service_router.put("/order", status_code=200, response_model=success_response)
+async def reorder_services(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder services. `ids` lists every service in the new order."""
+
+    Service.reorder(db, payload.ids)
+
+    service_cache.clear()
+
+    logger.info(f'Service order updated')
+
+    return success_response(
+        message=f"Services reordered successfully",
+        status_code=200
     )
 
 
 @service_router.patch("/{id}", status_code=200, response_model=success_response)
 async def update_service(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: service_schemas.UpdateService,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to update a service"""
     
-    if payload.position:
-        Service.move_to_position(db, id, payload.position)
-
-    service = Service.update(
-        db=db,
-        id=id,
-        **payload.model_dump(exclude_unset=True)
-    )
+    with unit_of_work(db):
+        if payload.position:
+            Service.move_to_position(db, id, payload.position, bg_tasks=bg_tasks, commit=False)
+
+        service = Service.update(
+            db=db,
+            id=id,
+            commit=False,
+            **payload.model_dump(exclude_unset=True, exclude={'position'})
+        )
 
     service_cache.clear()
 
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from sqlalchemy.orm import Session
 import sqlalchemy as sa
 
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
 from api.utils import paginator, helpers
 from api.utils.cache import get_cache
 from api.utils.responses import success_response
@@ -12,11 +12,13 @@ from api.v1.models.skill import Skill
 from api.v1.services.auth import AuthService
 from api.v1.services.skill import SkillService
 from api.v1.schemas import skill as skill_schemas
+from api.v1.schemas.base import ReorderItems
 from api.utils.loggers import create_logger
 
 
 skill_router = APIRouter(prefix='/skills', tags=['Skill'])
 logger = create_logger(__name__)
+profile_cache = get_cache('profile')
 skill_cache = get_cache('skills')
 
 @skill_router.post("", status_code=201, response_model=success_response)
@@ -27,15 +29,15 @@ async def create_skill(
 ):
     """Endpoint to create a new skill"""
 
-    max_position = Skill.get_max_position(db)
-
     skill = Skill.create(
         db=db,
-        position=max_position+1,
+        position=Skill.next_position(db),
         **payload.model_dump(exclude_unset=True)
     )
 
     skill_cache.clear()
+    # The cached profile holds skills_count
+    profile_cache.clear()
 
     logger.info(f'Skill with id {skill.id} created')
 
@@ -49,6 +51,8 @@ async def create_skill(
 @skill_router.get("", status_code=200)
 async def get_skills(
     name: str = None,
+    fields: str = None,
+    include: str = None,
     page: int = 1,
     per_page: int = 50,
     sort_by: str = 'position',
@@ -57,15 +61,19 @@ async def get_skills(
 ):
     """Endpoint to get all skills"""
 
+    selection = Skill.resolve_selection(fields=fields, include=include)
+
     use_cache = not name and sort_by == 'position' and order.lower() == 'asc'
 
-    if use_cache and skill_cache.has_page(page, per_page):
+    list_cache = skill_cache.for_selection(selection) if use_cache else skill_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=skill_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/skills',
             page=page,
             size=per_page,
-            total=skill_cache.total,
+            total=list_cache.total,
         )
 
     query, skills, count = Skill.fetch_by_field(
@@ -74,15 +82,16 @@ async def get_skills(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={
             'name': name,
         },
     )
 
-    items = [skill.to_dict() for skill in skills]
+    items = [skill.to_dict(selection=selection) for skill in skills]
 
     if use_cache:
-        skill_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -96,12 +105,16 @@ async def get_skills(
 @skill_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_skill_by_id(
     id: str,
+    fields: str = None,
+    include: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a skill by ID or unique_id in case ID fails."""
 
-    cached_skill = skill_cache.get_item(id)
+    selection = Skill.resolve_selection(fields=fields, include=include)
+
+    cached_skill = skill_cache.get_item(id, selection=selection)
     if cached_skill:
         return success_response(
             message=f"Fetched skill successfully",
@@ -109,34 +122,57 @@ async def get_skill_by_id(
             data=cached_skill
         )
 
-    skill = Skill.fetch_by_id(db, id)
+    skill = Skill.fetch_by_id(db, id, selection=Skill.full_selection())
     skill_dict = skill.to_dict()
     skill_cache.store_item(skill_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched skill successfully",
         status_code=200,
-        data=skill_dict
+        data=selection.project(skill_dict)
+    )
+
+
+@skill_router.put("/order", status_code=200, response_model=success_response)
+async def reorder_skills(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder skills. `ids` lists every skill in the new order."""
+
+    Skill.reorder(db, payload.ids)
+
+    skill_cache.clear()
+
+    logger.info(f'Skill order updated')
+
+    return success_response(
+        message=f"Skills reordered successfully",
+        status_code=200
     )
 
 
 @skill_router.patch("/{id}", status_code=200, response_model=success_response)
 async def update_skill(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: skill_schemas.UpdateSkill,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to update a skill"""
     
-    if payload.position:
-        Skill.move_to_position(db, id, payload.position)
-
-    skill = Skill.update(
-        db=db,
-        id=id,
-        **payload.model_dump(exclude_unset=True)
-    )
+    with unit_of_work(db):
+        if payload.position:
+            Skill.move_to_position(db, id, payload.position, bg_tasks=bg_tasks, commit=False)
+
+        skill = Skill.update(
+            db=db,
+            id=id,
+            commit=False,
+            **payload.model_dump(exclude_unset=True, exclude={'position'})
+        )
 
     skill_cache.clear()
 
@@ -160,6 +196,8 @@ async def delete_skill(
     Skill.soft_delete(db, id)
 
     skill_cache.clear()
+    # The cached profile holds skills_count
+    profile_cache.clear()
 
     return success_response(
         message=f"Deleted successfully",
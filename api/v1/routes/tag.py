@@ -45,6 +45,8 @@ async def create_tag(
     )
 
     tag_cache.clear()
+    # cached `tags` fields and tag filtered listings of the tagged model are stale
+    get_cache(tag.model_type).clear()
 
     return success_response(
         message=f"Tag created successfully",
@@ -58,6 +60,7 @@ async def get_tags(
     name: str = None,
     group: str = None,
     model_type: str = None,
+    fields: str = None,
     page: int = 1,
     per_page: int = 25,
     sort_by: str = 'created_at',
@@ -67,18 +70,22 @@ async def get_tags(
 ):
     """Endpoint to get all tags"""
 
+    selection = Tag.resolve_selection(fields=fields)
+
     use_cache = (
         not name and not group and not model_type
         and sort_by == 'created_at' and order.lower() == 'desc'
     )
 
-    if use_cache and tag_cache.has_page(page, per_page):
+    list_cache = tag_cache.for_selection(selection) if use_cache else tag_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=tag_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/tags',
             page=page,
             size=per_page,
-            total=tag_cache.total,
+            total=list_cache.total,
         )
 
     query, tags, count = Tag.fetch_by_field(
@@ -87,6 +94,7 @@ async def get_tags(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={
             'name': name,
         },
@@ -94,10 +102,10 @@ async def get_tags(
         model_type=model_type,
     )
 
-    items = [tag.to_dict() for tag in tags]
+    items = [tag.to_dict(selection=selection) for tag in tags]
 
     if use_cache:
-        tag_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -158,12 +166,15 @@ async def detatch_tag_from_entity(
 @tag_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_tag_by_id(
     id: str,
+    fields: str = None,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a tag by ID or unique_id in case ID fails."""
 
-    cached_tag = tag_cache.get_item(id)
+    selection = Tag.resolve_selection(fields=fields)
+
+    cached_tag = tag_cache.get_item(id, selection=selection)
     if cached_tag:
         return success_response(
             message=f"Fetched tag successfully",
@@ -171,14 +182,14 @@ async def get_tag_by_id(
             data=cached_tag
         )
 
-    tag = Tag.fetch_by_id(db, id)
+    tag = Tag.fetch_by_id(db, id, selection=Tag.full_selection())
     tag_dict = tag.to_dict()
     tag_cache.store_item(tag_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched tag successfully",
         status_code=200,
-        data=tag_dict
+        data=selection.project(tag_dict)
     )
 
 
@@ -216,6 +227,9 @@ async def update_tag(
     )
 
     tag_cache.clear()
+    # cached `tags` fields and tag filtered listings of the tagged model are stale
+    get_cache(tag.model_type).clear()
+    get_cache(updated_tag.model_type).clear()
 
     return success_response(
         message=f"Tag updated successfully",
@@ -232,9 +246,11 @@ async def delete_tag(
 ):
     """Endpoint to delete a tag"""
 
-    Tag.soft_delete(db, id)
+    tag = Tag.fetch_by_id(db, id)
+    Tag.soft_delete(db, tag.id)
 
     tag_cache.clear()
+    get_cache(tag.model_type).clear()
 
     return success_response(
         message=f"Deleted successfully",
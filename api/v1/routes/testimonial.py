@@ -1,12 +1,13 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from sqlalchemy.orm import Session
 from decouple import config
 import sqlalchemy as sa
 
 from api.core.dependencies.email_sending_service import send_email
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
 from api.utils import paginator, helpers
 from api.utils.cache import get_cache
+from api.utils.rate_limiter import limiter
 from api.utils.responses import success_response
 from api.utils.settings import settings
 from api.v1.models.user import User
@@ -14,6 +15,7 @@ from api.v1.models.testimonial import Testimonial
 from api.v1.services.auth import AuthService
 from api.v1.services.testimonial import TestimonialService
 from api.v1.schemas import testimonial as testimonial_schemas
+from api.v1.schemas.base import ReorderItems
 from api.utils.loggers import create_logger
 
 
@@ -22,18 +24,18 @@ logger = create_logger(__name__)
 testimonial_cache = get_cache('testimonials')
 
 @testimonial_router.post("", status_code=201, response_model=success_response)
+@limiter.limit(settings.RATE_LIMIT_CREATE_TESTIMONIAL)
 async def create_testimonial(
+    request: Request,
     bg_tasks: BackgroundTasks,
     payload: testimonial_schemas.TestimonialBase,
     db: Session=Depends(get_db),
 ):
     """Endpoint to create a new testimonial"""
 
-    max_position = Testimonial.get_max_position(db)
-
     testimonial = Testimonial.create(
         db=db,
-        position=max_position+1,
+        position=Testimonial.next_position(db),
         **payload.model_dump(exclude_unset=True)
     )
 
@@ -67,6 +69,7 @@ async def create_testimonial(
 async def get_testimonials(
     name: str = None,
     is_published: bool = None,
+    fields: str = None,
     page: int = 1,
     per_page: int = 10,
     sort_by: str = 'created_at',
@@ -75,18 +78,22 @@ async def get_testimonials(
 ):
     """Endpoint to get all testimonials"""
 
+    selection = Testimonial.resolve_selection(fields=fields)
+
     use_cache = (
         not name and is_published is None
         and sort_by == 'created_at' and order.lower() == 'desc'
     )
 
-    if use_cache and testimonial_cache.has_page(page, per_page):
+    list_cache = testimonial_cache.for_selection(selection) if use_cache else testimonial_cache
+
+    if use_cache and list_cache.has_page(page, per_page):
         return paginator.build_paginated_response(
-            items=testimonial_cache.get_page(page, per_page),
+            items=list_cache.get_page(page, per_page),
             endpoint='/testimonials',
             page=page,
             size=per_page,
-            total=testimonial_cache.total,
+            total=list_cache.total,
         )
 
     query, testimonials, count = Testimonial.fetch_by_field(
@@ -95,16 +102,17 @@ async def get_testimonials(
         order=order.lower(),
         page=page,
         per_page=per_page,
+        selection=selection,
         search_fields={
             'name': name,
         },
         is_published=is_published
     )
 
-    items = [testimonial.to_dict() for testimonial in testimonials]
+    items = [testimonial.to_dict(selection=selection) for testimonial in testimonials]
 
     if use_cache:
-        testimonial_cache.store_page(items, count, 'id', 'unique_id')
+        list_cache.store_page(items, count, 'id', 'unique_id')
 
     return paginator.build_paginated_response(
         items=items,
@@ -118,12 +126,15 @@ async def get_testimonials(
 @testimonial_router.get("/{id}", status_code=200, response_model=success_response)
 async def get_testimonial_by_id(
     id: str,
+    fields: str = None,
     db: Session=Depends(get_db),
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to get a testimonial by ID or unique_id in case ID fails."""
 
-    cached_testimonial = testimonial_cache.get_item(id)
+    selection = Testimonial.resolve_selection(fields=fields)
+
+    cached_testimonial = testimonial_cache.get_item(id, selection=selection)
     if cached_testimonial:
         return success_response(
             message=f"Fetched testimonial successfully",
@@ -131,34 +142,57 @@ async def get_testimonial_by_id(
             data=cached_testimonial
         )
 
-    testimonial = Testimonial.fetch_by_id(db, id)
+    testimonial = Testimonial.fetch_by_id(db, id, selection=Testimonial.full_selection())
     testimonial_dict = testimonial.to_dict()
     testimonial_cache.store_item(testimonial_dict, 'id', 'unique_id')
 
     return success_response(
         message=f"Fetched testimonial successfully",
         status_code=200,
-        data=testimonial_dict
+        data=selection.project(testimonial_dict)
+    )
+
+
+@testimonial_router.put("/order", status_code=200, response_model=success_response)
+async def reorder_testimonials(
+    payload: ReorderItems,
+    db: Session=Depends(get_db), 
+    current_user: User=Depends(AuthService.get_current_superuser)
+):
+    """Endpoint to reorder testimonials. `ids` lists every testimonial in the new order."""
+
+    Testimonial.reorder(db, payload.ids)
+
+    testimonial_cache.clear()
+
+    logger.info(f'Testimonial order updated')
+
+    return success_response(
+        message=f"Testimonials reordered successfully",
+        status_code=200
     )
 
 
 @testimonial_router.patch("/{id}", status_code=200, response_model=success_response)
 async def update_testimonial(
     id: str,
+    bg_tasks: BackgroundTasks,
     payload: testimonial_schemas.UpdateTestimonial,
     db: Session=Depends(get_db), 
     current_user: User=Depends(AuthService.get_current_superuser)
 ):
     """Endpoint to update a testimonial"""
     
-    if payload.position:
-        Testimonial.move_to_position(db, id, payload.position)
-
-    testimonial = Testimonial.update(
-        db=db,
-        id=id,
-        **payload.model_dump(exclude_unset=True)
-    )
+    with unit_of_work(db):
+        if payload.position:
+            Testimonial.move_to_position(db, id, payload.position, bg_tasks=bg_tasks, commit=False)
+
+        testimonial = Testimonial.update(
+            db=db,
+            id=id,
+            commit=False,
+            **payload.model_dump(exclude_unset=True, exclude={'position'})
+        )
 
     testimonial_cache.clear()
 
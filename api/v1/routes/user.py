@@ -106,7 +106,7 @@ async def update_user_details(
     """Endpoint to a user to update their details"""
     
     if payload.password and payload.old_password:
-        payload.password = UserService.verify_password_change(
+        payload.password = await UserService.verify_password_change(
             db, 
             email=payload.email,
             old_password=payload.old_password,
@@ -1,19 +1,20 @@
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
+from api.v1.schemas.base import RecordId
 
 
 class AwardBase(BaseModel):
     name: str
     issuer: str
     issue_date: Optional[datetime] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
 
 
 class UpdateAward(BaseModel):
     name: Optional[str] = None
     issuer: Optional[str] = None
     issue_date: Optional[datetime] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
 
 
@@ -1,15 +1,36 @@
-from typing import Any, List, Optional
-from pydantic import BaseModel
+from typing import Annotated, Any, List, Optional
+from pydantic import BaseModel, BeforeValidator
 
+from api.core.base.identifiers import parse_id
 from api.v1.models import *
 
+
+def check_id(value: Any) -> str:
+    """Normalises a record id to 32 lower case hex digits. Anything that is not a
+    UUID is rejected here with a 422, as it can never match a stored id.
+    """
+    
+    id = parse_id(value)
+    if id is None:
+        raise ValueError('must be a valid id')
+    return id
+
+
+# A field holding the id of another record
+RecordId = Annotated[str, BeforeValidator(check_id)]
+
+
 class AdditionalInfoSchema(BaseModel):
     key: str
     value: Any
         
     
 class DeleteMultiple(BaseModel):
-    ids: List[str]
+    ids: List[RecordId]
+
+
+class ReorderItems(BaseModel):
+    ids: List[RecordId]
 
 
 class PaginatedResponseBase(BaseModel):
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, field_validator
 from typing import List, Optional
+from api.v1.schemas.base import RecordId
 
 
 class CategoryBase(BaseModel):
@@ -30,5 +31,5 @@ class UpdateCategory(BaseModel):
 class AttachOrDetatchCategory(BaseModel):
     
     category_ids: List[str]
-    entity_id: str
+    entity_id: RecordId
     model_type: str
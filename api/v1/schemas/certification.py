@@ -1,6 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
+from api.v1.schemas.base import RecordId
 
 
 class CertificationBase(BaseModel):
@@ -9,7 +10,7 @@ class CertificationBase(BaseModel):
     issue_date: Optional[datetime] = None
     credential_id: Optional[str] = None
     credential_url: Optional[str] = None
-    issuer_file_id: Optional[str] = None
+    issuer_file_id: Optional[RecordId] = None
 
 
 class UpdateCertification(BaseModel):
@@ -18,5 +19,5 @@ class UpdateCertification(BaseModel):
     issue_date: Optional[datetime] = None
     credential_id: Optional[str] = None
     credential_url: Optional[str] = None
-    issuer_file_id: Optional[str] = None
+    issuer_file_id: Optional[RecordId] = None
     position: Optional[int] = None
@@ -1,6 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
+from api.v1.schemas.base import RecordId
 
 
 class EducationBase(BaseModel):
@@ -10,7 +11,7 @@ class EducationBase(BaseModel):
     grade: Optional[str] = None
     start_date: datetime
     end_date: Optional[datetime] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
     description: Optional[str] = None
 
 
@@ -21,5 +22,5 @@ class UpdateEducation(BaseModel):
     grade: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
     description: Optional[str] = None
\ No newline at end of file
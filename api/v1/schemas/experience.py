@@ -1,6 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
+from api.v1.schemas.base import RecordId
 
 
 class ExperienceBase(BaseModel):
@@ -9,7 +10,7 @@ class ExperienceBase(BaseModel):
     role: str
     start_date: datetime
     end_date: Optional[datetime] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
     description: Optional[str] = None
 
 
@@ -19,5 +20,5 @@ class UpdateExperience(BaseModel):
     role: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
     description: Optional[str] = None
\ No newline at end of file
@@ -2,13 +2,14 @@ from typing import List, Optional
 from fastapi import UploadFile
 from pydantic import BaseModel, field_validator
 from api.utils.form_factory import as_form_factory
+from api.v1.schemas.base import RecordId
 
 # @as_form
 class FileBase(BaseModel):
     
     file: UploadFile
     file_name: Optional[str] = None
-    model_id: Optional[str] = None
+    model_id: Optional[RecordId] = None
     model_name: str
     url: Optional[str] = None
     description: Optional[str] = None
@@ -37,7 +38,7 @@ class UpdateFile(BaseModel):
 
 class BulkUploadFile(BaseModel):
     files: List[UploadFile]
-    model_id: Optional[str] = None
+    model_id: Optional[RecordId] = None
     model_name: str
 
 
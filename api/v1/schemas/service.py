@@ -1,17 +1,18 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from api.v1.schemas.base import RecordId
 
 
 class ServiceBase(BaseModel):
     name: str
     description: str
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
     skills: Optional[List[str]] = None
 
 
 class UpdateService(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    file_id: Optional[str] = None
+    file_id: Optional[RecordId] = None
     skills: Optional[List[str]] = None
     position: Optional[int] = None
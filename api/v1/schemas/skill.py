@@ -1,15 +1,16 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from api.v1.schemas.base import RecordId
 
 
 class SkillBase(BaseModel):
     name: str
     proficiency: int = Field(le=100)
-    file_id: Optional[str] = None 
+    file_id: Optional[RecordId] = None 
 
 
 class UpdateSkill(BaseModel):
     name: Optional[str] = None
     proficiency: Optional[int] = Field(default=None, le=100)
-    file_id: Optional[str] = None 
+    file_id: Optional[RecordId] = None 
     position: Optional[int] = None 
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
+from api.v1.schemas.base import RecordId
 
 
 class TagBase(BaseModel):
@@ -27,5 +28,5 @@ class UpdateTag(BaseModel):
 class AttachOrDetatchTag(BaseModel):
     
     tag_ids: List[str]
-    entity_id: str
+    entity_id: RecordId
     model_type: str
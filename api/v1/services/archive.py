@@ -0,0 +1,204 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import sqlalchemy as sa
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from api.core.base.base_model import BaseTableModel
+from api.core.base.identifiers import parse_id
+from api.db.database import Base
+from api.utils.cache import get_cache
+from api.utils.loggers import create_logger
+from api.utils.settings import settings
+from api.v1.models.archived_record import ArchivedRecord
+
+
+logger = create_logger(__name__)
+
+class ArchiveService:
+
+    @classmethod
+    def models(cls) -> Dict[str, type]:
+        '''Maps table names to every soft deletable model (except the archive itself)'''
+
+        return {
+            mapper.class_.__tablename__: mapper.class_
+            for mapper in Base.registry.mappers
+            if issubclass(mapper.class_, BaseTableModel) and mapper.class_ is not ArchivedRecord
+        }
+
+    @classmethod
+    def get_model(cls, table_name: str):
+        model = cls.models().get(table_name)
+        if model is None:
+            raise HTTPException(400, f'Unknown table `{table_name}`')
+        return model
+
+    @classmethod
+    def _encode_row(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        '''Makes a row JSON serializable'''
+
+        return {
+            key: value.isoformat() if isinstance(value, (datetime, date)) else value
+            for key, value in row.items()
+        }
+
+    @classmethod
+    def _decode_row(cls, table: sa.Table, data: Dict[str, Any]) -> Dict[str, Any]:
+        '''Reverses `_encode_row` for the columns that still exist on `table`'''
+
+        row = {}
+        for column in table.columns:
+            if column.key not in data:
+                continue
+
+            value = data[column.key]
+            if value is not None and isinstance(column.type, sa.DateTime):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(column.type, sa.Date):
+                value = date.fromisoformat(value)
+            row[column.key] = value
+
+        return row
+
+    @classmethod
+    def _purgeable(cls, table: sa.Table, cutoff: datetime):
+        '''Soft deleted rows of `table` deleted before `cutoff` and not referenced by a foreign key'''
+
+        conditions = [table.c.is_deleted == True, table.c.deleted_at < cutoff]
+
+        for other in Base.metadata.tables.values():
+            for fk in other.foreign_keys:
+                if fk.column.table is table:
+                    conditions.append(~sa.exists().where(fk.parent == fk.column))
+
+        return sa.and_(*conditions)
+
+    @classmethod
+    def archive_deleted(
+        cls,
+        db: Session,
+        model,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        '''Moves soft deleted rows older than the retention window out of the model's table.\n
+        Rows are copied to `archived_records` first unless the model sets `_archive_deleted = False`.
+        Works in batches of `batch_size`, each in its own transaction, so locks are held briefly.
+        Returns the number of rows removed.
+        '''
+
+        retention_days = settings.SOFT_DELETE_RETENTION_DAYS if retention_days is None else retention_days
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+
+        table = model.__table__
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        total = 0
+
+        while True:
+            rows = db.execute(
+                sa.select(table)
+                .where(cls._purgeable(table, cutoff))
+                .order_by(table.c.deleted_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).mappings().all()
+
+            if not rows:
+                break
+
+            if model._archive_deleted:
+                db.execute(sa.insert(ArchivedRecord), [
+                    {
+                        'table_name': table.name,
+                        'record_id': row['id'],
+                        'data': cls._encode_row(dict(row)),
+                    }
+                    for row in rows
+                ])
+
+            db.execute(sa.delete(table).where(table.c.id.in_([row['id'] for row in rows])))
+            db.commit()
+
+            total += len(rows)
+
+            if len(rows) < batch_size:
+                break
+
+        if total:
+            logger.info(f'{"Archived" if model._archive_deleted else "Purged"} {total} deleted rows from {table.name}')
+
+        return total
+
+    @classmethod
+    def archive_all(
+        cls,
+        db: Session,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        table_names: Optional[List[str]] = None,
+    ) -> Dict[str, int]:
+        '''Runs `archive_deleted` on every model (or the given tables)'''
+
+        models = [cls.get_model(name) for name in table_names] if table_names else list(cls.models().values())
+
+        # Referencing tables first, so their purged rows no longer hold back the referenced ones
+        models.sort(key=lambda model: not model.__table__.foreign_keys)
+
+        return {
+            model.__tablename__: cls.archive_deleted(db, model, retention_days=retention_days, batch_size=batch_size)
+            for model in models
+        }
+
+    @classmethod
+    def restore(cls, db: Session, table_name: str, record_id: str):
+        '''Restores a deleted record, whether it is still soft deleted or already archived'''
+
+        model = cls.get_model(table_name)
+
+        pk = parse_id(record_id)
+        if pk is None:
+            raise HTTPException(404, f'No deleted record `{record_id}` in table `{table_name}`')
+        record_id = pk
+
+        obj = db.query(model).filter(model.id == record_id, model.is_deleted == True).first()
+        if obj is not None:
+            obj.is_deleted = False
+            obj.deleted_at = None
+            db.commit()
+            cls.clear_caches(obj)
+            return obj
+
+        record = (
+            db.query(ArchivedRecord)
+            .filter_by(table_name=table_name, record_id=record_id)
+            .order_by(ArchivedRecord.archived_at.desc())
+            .first()
+        )
+        if record is None:
+            raise HTTPException(404, f'No deleted record `{record_id}` in table `{table_name}`')
+
+        row = cls._decode_row(model.__table__, record.data)
+        row.update(is_deleted=False, deleted_at=None)
+
+        try:
+            db.execute(sa.insert(model.__table__).values(**row))
+            db.delete(record)
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            logger.error(f'Could not restore {table_name} {record_id}: {e.orig}')
+            raise HTTPException(409, f'Record `{record_id}` conflicts with an existing record or references one that no longer exists')
+
+        logger.info(f'Restored {table_name} {record_id} from the archive')
+        obj = db.get(model, record_id)
+        cls.clear_caches(obj)
+        return obj
+
+    @classmethod
+    def clear_caches(cls, obj: BaseTableModel):
+        '''Clears the caches serving `obj`'s model, so a restored row is listed again'''
+
+        for name in obj.cache_names():
+            get_cache(name).clear()
@@ -3,29 +3,28 @@ import datetime as dt
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, APIKeyQuery
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, Request, BackgroundTasks
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from sqlalchemy.orm import Session, class_mapper
 from decouple import config
 
 from api.core.dependencies.email_sending_service import send_email
-from api.db.database import get_db
+from api.db.database import get_db, unit_of_work
+from api.utils.cache import principal_cache
 from api.utils.loggers import create_logger
-from api.utils.settings import settings
+from api.utils.password_hasher import password_hasher
 from api.v1.models.token import BlacklistedToken, Token, TokenType
 from api.v1.models.user import User
 from api.v1.schemas.token import TokenData
-from api.v1.services.token import TokenService
+from api.v1.services.token import TokenService, revoked_tokens
 
 
 bearer_scheme = HTTPBearer()
-pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
 logger = create_logger(__name__)
 
 
 class AuthService:
     
     @classmethod
-    def authenticate(cls, db: Session, email: str, password: str, create_token: bool=True):
+    async def authenticate(cls, db: Session, email: str, password: str, create_token: bool=True):
         
         user = User.fetch_one_by_field(db=db, email=email)
         
@@ -39,15 +38,22 @@ class AuthService:
         if not user.password:
             raise HTTPException(400, 'You do not have a password. Try magic login or another available authentication method')
         
-        if user.password and not cls.verify_hash(password, user.password):
+        is_valid, new_hash = await password_hasher.verify_and_update(password, user.password)
+        if not is_valid:
             raise HTTPException(status_code=400, detail="Invalid user credentials")
         
-        # Update last_login of user
-        user = User.update(db, user.id, last_login=dt.datetime.now())
+        # Update last_login of user, and upgrade the password hash if its scheme or cost is outdated.
+        # When tokens are issued the update is committed in the same transaction as them.
+        user = User.update(
+            db, 
+            user.id, 
+            commit=not create_token,
+            last_login=dt.datetime.now(),
+            **({'password': new_hash} if new_hash else {})
+        )
         
         if create_token:
-            access_token = cls.create_access_token(db, user.id)
-            refresh_token = cls.create_refresh_token(db, user.id)
+            access_token, refresh_token = TokenService.issue_token_pair(db, user.id)
             
             return user, access_token, refresh_token
         
@@ -55,40 +61,9 @@ class AuthService:
         return user, None, None
     
     @classmethod
-    def hash_secret(cls, secret: str):
-        return pwd_context.hash(secret)
-    
-    @classmethod
-    def verify_hash(cls, secret: str, hash: str):
-        return pwd_context.verify(secret, hash)
-    
-    @classmethod
-    def create_access_token(cls, db: Session, user_id: str):
-        
-        # Check if user has a token already
-        TokenService.check_and_revoke_existing_token(db, user_id=user_id, token_type=TokenType.ACCESS.value)
-        
-        encoded_jwt = TokenService.create_token(
-            db=db,
-            token_type=TokenType.ACCESS.value,
-            expiry_in_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-            user_id=user_id
-        )
-        return encoded_jwt
-
-    @classmethod
-    def create_refresh_token(cls, db: Session, user_id: str):
-        
-        # Check if user has a token already and it has not expired
-        TokenService.check_and_revoke_existing_token(db, user_id=user_id, token_type=TokenType.REFRESH.value)
-        
-        encoded_jwt = TokenService.create_token(
-            db=db,
-            token_type=TokenType.REFRESH.value,
-            expiry_in_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
-            user_id=user_id
-        )
-        return encoded_jwt
+    async def hash_password(cls, password: str):
+        '''Hashes a password on the password hashing pool, off the event loop'''
+        return await password_hasher.hash(password)
     
     @classmethod
     def verify_token(cls, db: Session, token: str, expected_token_type: str, credentials_exception):
@@ -148,22 +123,19 @@ class AuthService:
         )
 
         if token:
-            access = cls.create_access_token(db=db, user_id=token.user_id)
-            refresh = cls.create_refresh_token(db=db, user_id=token.user_id)
-
-            return access, refresh
+            return TokenService.issue_token_pair(db, token.user_id)
     
     @classmethod
     def logout(cls, db: Session, user_id: str):
         """Function to log a user out of their account"""
         
-        # get both access and refresh tokens of the user
-        access_token_obj = Token.fetch_one_by_field(db=db, user_id=user_id, token_type='access')
-        refresh_token_obj = Token.fetch_one_by_field(db=db, user_id=user_id, token_type='refresh')
+        # Revoke both access and refresh tokens of the user
+        with unit_of_work(db):
+            revoked = TokenService.revoke_user_tokens(
+                db, user_id, [TokenType.ACCESS.value, TokenType.REFRESH.value]
+            )
         
-        # Revoke both tokens
-        TokenService.revoke_token(db, access_token_obj.token, user_id)
-        TokenService.revoke_token(db, refresh_token_obj.token, user_id)
+        TokenService.forget_revoked(revoked)
         
     @classmethod
     def send_magic_link(cls, db: Session, email: str, bg_tasks: BackgroundTasks):
@@ -215,8 +187,7 @@ class AuthService:
         )
         
         user = User.fetch_by_id(db, user_id)
-        access_token = cls.create_access_token(db, user.id)
-        refresh_token = cls.create_refresh_token(db, user.id)
+        access_token, refresh_token = TokenService.issue_token_pair(db, user.id)
         
         # Revoke token
         TokenService.revoke_token(db, token, user_id)
@@ -285,19 +256,34 @@ class AuthService:
         try:
             # Extract the token from the HTTPBearer credentials
             token_str = token.credentials
+            token_digest = revoked_tokens.digest(token_str)
 
-            # Verify the token
-            token_data = cls.verify_access_token(
+            # Verify the token (signature, expiry, type and revocation)
+            payload = TokenService.decode_and_verify_token(
                 db=db, 
-                access_token=token_str, 
-                credentials_exception=credentials_exception
+                token=token_str, 
+                expected_token_type=TokenType.ACCESS.value,
+                credentials_exception=credentials_exception,
+                token_digest=token_digest
             )
             
-            user = User.fetch_by_id(db, token_data.user_id)
+            # Repeated calls with the same token skip the user lookup
+            snapshot = principal_cache.get(token_digest)
+            if snapshot is not None:
+                return User(**snapshot)
+            
+            user = User.fetch_by_id(db, payload.get("user_id"))
             
             if not user.is_active:
                 raise HTTPException(403, "Account is inactive")
             
+            principal_cache.put(
+                token_digest,
+                user.id,
+                {attr.key: getattr(user, attr.key) for attr in class_mapper(User).column_attrs},
+                token_expires_at=payload.get("exp"),
+            )
+            
             return user
         
         except AttributeError:
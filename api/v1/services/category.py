@@ -1,7 +1,11 @@
+from datetime import datetime, timezone
 from typing import List
+import sqlalchemy as sa
+from fastapi import HTTPException
 from slugify import slugify
 from sqlalchemy.orm import Session
 
+from api.core.base.identifiers import ID_PATTERN, parse_id
 from api.utils.loggers import create_logger
 from api.v1.models.category import Category, CategoryAssociation
 from api.v1.schemas import category as category_schemas
@@ -12,53 +16,89 @@ logger = create_logger(__name__)
 class CategoryService:
     
     @classmethod
-    def create_category_association(
-        cls, 
+    def resolve_categories(
+        cls,
         db: Session,
         category_ids: List[str],
         model_type: str,
-        entity_id: str
-    ):
-        '''Function to create a category association for an entity'''
+        create_missing: bool = False
+    ) -> List[str]:
+        '''Function to resolve category ids or category names to the ids of live categories
+        of `model_type`.\n
+        Names are matched on their slug, in the same query as the ids. With `create_missing`,
+        values matching no category are created in one `ON CONFLICT DO NOTHING` insert on the
+        slug and fetched back. Slugs are unique across model types, so attaching a name whose
+        slug belongs to a category of another model type is rejected.
+        '''
         
-        for category_id in category_ids:
-            # Check that categorys exist 
-            category = Category.fetch_one_by_field(
-                db, 
-                throw_error=False,
-                id=category_id, 
-                model_type=model_type
-            )
-            
-            # If category does not exist, skip
-            if not category:
-                # Assuming the category id is the name provided
-                category = Category.create(
-                    db=db,
-                    name=category_id.lower(),
-                    model_type=model_type,
-                    slug=slugify(category_id)
-                )
-            
-            category_association = CategoryAssociation.fetch_one_by_field(
+        # Ids in any spelling are normalised to the stored form
+        values = {parse_id(value) or value.strip() for value in category_ids if value.strip()}
+        if not values:
+            return []
+        
+        ids = [value for value in values if ID_PATTERN.match(value)]
+        slugs = {slugify(value): value for value in values}
+        
+        categories = db.query(Category.id, Category.slug, Category.model_type).filter(
+            Category.is_deleted == False,
+            sa.or_(Category.id.in_(ids), Category.slug.in_(slugs)),
+        ).all()
+        
+        found = {category.id for category in categories} | {category.slug for category in categories}
+        missing = {slug: value for slug, value in slugs.items() if slug not in found and value not in found}
+        
+        if missing and create_missing:
+            Category.insert_missing(
                 db,
-                throw_error=False,
-                entity_id=entity_id,
-                model_type=model_type,
-                category_id=category.id,
+                [
+                    {'name': value.lower(), 'slug': slug, 'model_type': model_type}
+                    for slug, value in missing.items()
+                ],
+                conflict_columns=('slug',),
             )
             
-            # If category association exists, skip
-            if category_association:
-                continue
+            categories += db.query(Category.id, Category.slug, Category.model_type).filter(
+                Category.is_deleted == False,
+                Category.slug.in_(missing),
+            ).all()
             
-            # Create template category association
-            CategoryAssociation.create(
-                db=db,
-                entity_id=entity_id,
-                category_id=category.id,
-                model_type=model_type
-            )
+            unresolved = set(missing) - {category.slug for category in categories}
+            if unresolved:
+                raise HTTPException(400, f"Categories `{', '.join(sorted(unresolved))}` could not be created, their slugs are taken by deleted categories")
+        
+        foreign = sorted(category.slug for category in categories if category.model_type != model_type)
+        if foreign and create_missing:
+            raise HTTPException(400, f"Categories `{', '.join(foreign)}` belong to another model type")
+        
+        return list({category.id for category in categories if category.model_type == model_type})
+    
+    @classmethod
+    def create_category_association(
+        cls, 
+        db: Session,
+        category_ids: List[str],
+        model_type: str,
+        entity_id: str
+    ):
+        '''Function to create category associations for an entity.\n
+        Each of `category_ids` is a category id, or the name of a category that is created
+        if it does not exist. Categories and associations are inserted in bulk in one transaction.
+        '''
+        
+        resolved_ids = cls.resolve_categories(db, category_ids, model_type, create_missing=True)
+        
+        # Associations that already exist are skipped by the unique index on live rows
+        CategoryAssociation.insert_missing(
+            db,
+            [
+                {'entity_id': entity_id, 'category_id': category_id, 'model_type': model_type}
+                for category_id in resolved_ids
+            ],
+            conflict_columns=('model_type', 'category_id', 'entity_id'),
+            active_only=True,
+        )
+        
+        db.commit()
             
     
     @classmethod
@@ -69,32 +109,23 @@ class CategoryService:
         model_type: str,
         entity_id: str
     ):
-        '''Function to delete a category association for an entity'''
+        '''Function to delete category associations for an entity, in a single update'''
         
-        for category_id in category_ids:
-            # Check that categorys exist 
-            category = Category.fetch_one_by_field(
-                db, 
-                throw_error=False,
-                id=category_id, 
-                model_type=model_type
-            )
-            
-            # If category does not exist, skip
-            if not category:
-                continue
-            
-            category_association = CategoryAssociation.fetch_one_by_field(
-                db,
-                throw_error=False,
-                entity_id=entity_id,
-                model_type=model_type,
-                category_id=category_id,
-            )
-            
-            # If category association exists, skip
-            if not category_association:
-                continue
-            
-            # Delete category association
-            CategoryAssociation.soft_delete(db, category_association.id)
+        resolved_ids = cls.resolve_categories(db, category_ids, model_type)
+        if not resolved_ids:
+            return
+        
+        db.query(CategoryAssociation).filter(
+            CategoryAssociation.entity_id == entity_id,
+            CategoryAssociation.model_type == model_type,
+            CategoryAssociation.category_id.in_(resolved_ids),
+            CategoryAssociation.is_deleted == False,
+        ).update(
+            {
+                CategoryAssociation.is_deleted: True,
+                CategoryAssociation.deleted_at: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+        
+        db.commit()
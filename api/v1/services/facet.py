@@ -0,0 +1,123 @@
+from typing import Any, Dict, List
+import sqlalchemy as sa
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, class_mapper
+
+from api.core.base.base_model import BaseTableModel
+from api.db.database import Base
+from api.utils.loggers import create_logger
+from api.v1.models.category import Category, CategoryAssociation
+from api.v1.models.tag import Tag, TagAssociation
+
+
+logger = create_logger(__name__)
+
+class FacetService:
+
+    @classmethod
+    def models(cls) -> Dict[str, type]:
+        '''Maps model types (table names) to the models that have facets: tags,
+        categories or `_facet_columns`
+        '''
+
+        return {
+            mapper.class_.__tablename__: mapper.class_
+            for mapper in Base.registry.mappers
+            if issubclass(mapper.class_, BaseTableModel) and (
+                mapper.class_._facet_columns
+                or {'tags', 'categories'} & set(class_mapper(mapper.class_).relationships.keys())
+            )
+        }
+
+    @classmethod
+    def get_model(cls, model_type: str):
+        model = cls.models().get(model_type)
+        if model is None:
+            raise HTTPException(400, f'No facets for model type `{model_type}`')
+        return model
+
+    @classmethod
+    def column_counts(cls, db: Session, model) -> Dict[str, List[Dict[str, Any]]]:
+        '''Value counts of every column in `model._facet_columns` over the live rows,
+        in one query (a UNION ALL of one GROUP BY per column)
+        '''
+
+        if not model._facet_columns:
+            return {}
+
+        selects = [
+            sa.select(
+                sa.literal(name).label('facet'),
+                sa.cast(getattr(model, name), sa.String).label('value'),
+                sa.func.count().label('count'),
+            )
+            .where(model.is_deleted == False, getattr(model, name).isnot(None))
+            .group_by(getattr(model, name))
+            for name in model._facet_columns
+        ]
+
+        facets = {name: [] for name in model._facet_columns}
+        for row in db.execute(sa.union_all(*selects).order_by(sa.desc('count'), 'value')):
+            facets[row.facet].append({'value': row.value, 'count': row.count})
+
+        return facets
+
+    @classmethod
+    def tag_counts(cls, db: Session, model) -> List[Dict[str, Any]]:
+        '''Number of live `model` records carrying each tag, in one grouped query'''
+
+        rows = db.execute(
+            sa.select(Tag.id, Tag.name, sa.func.count(sa.distinct(model.id)).label('count'))
+            .join(TagAssociation, TagAssociation.tag_id == Tag.id)
+            .join(model, model.id == TagAssociation.entity_id)
+            .where(
+                Tag.model_type == model.__tablename__,
+                Tag.is_deleted == False,
+                TagAssociation.model_type == model.__tablename__,
+                TagAssociation.is_deleted == False,
+                model.is_deleted == False,
+            )
+            .group_by(Tag.id, Tag.name)
+            .order_by(sa.desc('count'), Tag.name)
+        )
+
+        return [{'id': row.id, 'name': row.name, 'count': row.count} for row in rows]
+
+    @classmethod
+    def category_counts(cls, db: Session, model) -> List[Dict[str, Any]]:
+        '''Number of live `model` records in each category, in one grouped query'''
+
+        rows = db.execute(
+            sa.select(Category.id, Category.name, Category.slug, sa.func.count(sa.distinct(model.id)).label('count'))
+            .join(CategoryAssociation, CategoryAssociation.category_id == Category.id)
+            .join(model, model.id == CategoryAssociation.entity_id)
+            .where(
+                Category.model_type == model.__tablename__,
+                Category.is_deleted == False,
+                CategoryAssociation.model_type == model.__tablename__,
+                CategoryAssociation.is_deleted == False,
+                model.is_deleted == False,
+            )
+            .group_by(Category.id, Category.name, Category.slug)
+            .order_by(sa.desc('count'), Category.name)
+        )
+
+        return [{'id': row.id, 'name': row.name, 'slug': row.slug, 'count': row.count} for row in rows]
+
+    @classmethod
+    def get_facets(cls, db: Session, model_type: str) -> Dict[str, Any]:
+        '''Facet counts of a model type: its tags, its categories and its facet columns.
+        Each group is one aggregate query, and groups the model does not have are skipped.
+        '''
+
+        model = cls.get_model(model_type)
+        relationships = class_mapper(model).relationships.keys()
+
+        facets: Dict[str, Any] = {}
+        if 'tags' in relationships:
+            facets['tags'] = cls.tag_counts(db, model)
+        if 'categories' in relationships:
+            facets['categories'] = cls.category_counts(db, model)
+        facets.update(cls.column_counts(db, model))
+
+        return facets
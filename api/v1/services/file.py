@@ -1,12 +1,14 @@
+import hashlib
 import os
 import secrets
-import sqlalchemy as sa
-from typing import List, Optional
-from fastapi import UploadFile, HTTPException
+from typing import List, Optional, Tuple
+import anyio
+from fastapi import BackgroundTasks, UploadFile, HTTPException
 from sqlalchemy.orm import Session
 from decouple import config
 
 from api.utils.loggers import create_logger
+from api.utils.settings import settings
 from api.v1.models.file import File
 from api.v1.schemas.file import FileBase
 
@@ -15,6 +17,40 @@ logger = create_logger(__name__)
 
 class FileService:
     
+    @classmethod
+    async def stream_to_disk(cls, upload: UploadFile, file_path: str, max_file_size: int) -> Tuple[int, str]:
+        '''Copies an upload to `file_path` one chunk at a time through an async file, so at most
+        one chunk is held in memory and the event loop is not blocked on disk I/O.\n
+        The size limit is checked as chunks are read, stopping at the first chunk past it.
+        Returns the size of the file and the sha256 of its content.
+        '''
+        
+        chunk_size = settings.FILE_UPLOAD_CHUNK_SIZE_KB * 1024
+        content_hash = hashlib.sha256()
+        file_size = 0
+        
+        try:
+            async with await anyio.open_file(file_path, 'wb') as buffer:
+                while chunk := await upload.read(chunk_size):
+                    file_size += len(chunk)
+                    if file_size > max_file_size:
+                        raise HTTPException(
+                            status_code=400, 
+                            detail=f"File size exceeds the limit of {max_file_size // (1024 * 1024)} MB"
+                        )
+                    
+                    content_hash.update(chunk)
+                    await buffer.write(chunk)
+        except BaseException:
+            # Do not leave a partial file behind
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            raise
+        
+        return file_size, content_hash.hexdigest()
+    
     @classmethod
     async def upload_file(
         cls, 
@@ -46,7 +82,8 @@ class FileService:
         max_file_size_mb = config("FILE_UPLOAD_LIMIT_MB", cast=int, default=5)
         max_file_size =  int(max_file_size_mb) * 1024 * 1024
         
-        if payload.file.size > max_file_size:
+        # Reject early when the size is known up front. It is checked again while the file is written
+        if payload.file.size is not None and payload.file.size > max_file_size:
             raise HTTPException(
                 status_code=400, 
                 detail=f"File size exceeds the limit of {max_file_size_mb} MB"
@@ -72,32 +109,24 @@ class FileService:
             )
         
         # Save file to disk
-        with open(file_path, "wb") as buffer:
-            buffer.write(payload.file.file.read())
+        file_size, content_hash = await cls.stream_to_disk(payload.file, file_path, max_file_size)
             
         logger.info(f"File saved to {file_path}")
         
-        file_url = f"{config('API_URL')}/{file_path}" if not payload.url else payload.url,  # TODO: fix up. generate url by uploading to a storage location
+        file_url = f"{config('API_URL')}/{file_path}" if not payload.url else payload.url  # TODO: fix up. generate url by uploading to a storage location
         
         if add_to_db:
-            # Find the highest position for the given model_name
-            query = (
-                db.query(sa.func.max(File.position))
-                .filter(File.model_name == payload.model_name)
-            )
-            
-            if payload.model_id:
-                query = query.filter(File.model_id == payload.model_id)
-            
-            max_position = query.scalar() or 0
+            # Append to the end of the files of this entity
+            position = File.next_position(db, model_name=payload.model_name, model_id=payload.model_id)
             
             # Save file metadata to database
             file_instance = File.create(
                 db,
-                position=max_position+1,
+                position=position,
                 file_name=new_filename,
                 file_path=file_path,
-                file_size=payload.file.size,
+                file_size=file_size,
+                content_hash=content_hash,
                 model_id=payload.model_id,
                 model_name=payload.model_name,
                 url=file_url,
@@ -112,7 +141,8 @@ class FileService:
                 'file_name': new_filename,
                 'file_path': file_path,
                 'url': file_url,
-                'file_size': payload.file.size
+                'file_size': file_size,
+                'content_hash': content_hash,
             }
 
     
@@ -160,46 +190,14 @@ class FileService:
     
     
     @classmethod
-    def move_file_to_position(cls, db: Session, file_id: str, new_position: int):
-        # Get the file to move
-        file = File.fetch_by_id(db, file_id)
-
-        current_position = file.position
-        model_name = file.model_name
-        model_id = file.model_id
-
-        if new_position == current_position:
-            return  # No change needed
-
-        # Shift positions of other files accordingly
-        if new_position < current_position:
-            # Moving up: shift others down
-            query = db.query(File).filter(
-                File.model_name == model_name,
-                File.position >= new_position,
-                File.position < current_position,
-                File.id != file.id
-            )
-            
-            if model_id:
-                query = query.filter(File.model_id == model_id)
-            
-            query.update({File.position: File.position + 1}, synchronize_session="fetch")
-        else:
-            # Moving down: shift others up
-            query = db.query(File).filter(
-                File.model_name == model_name,
-                File.position <= new_position,
-                File.position > current_position,
-                File.id != file.id
-            )
-            
-            if model_id:
-                query = query.filter(File.model_id == model_id)
-            
-            query.update({File.position: File.position - 1}, synchronize_session="fetch")
-
-        # Set new position for the dragged file
-        file.position = new_position
-        db.commit()
-        db.refresh(file)
+    def move_file_to_position(
+        cls,
+        db: Session,
+        file_id: str,
+        new_position: int,
+        bg_tasks: Optional[BackgroundTasks] = None,
+        commit: bool = True,
+    ):
+        """Moves a file to `new_position` among the files of the same entity"""
+        
+        File.move_to_position(db, file_id, new_position, bg_tasks=bg_tasks, commit=commit)
@@ -1,35 +1,37 @@
 from datetime import datetime
 from fastapi import BackgroundTasks, HTTPException, Request
-import requests
 from sqlalchemy.orm import Session
 from decouple import config
 
 from api.db.database import get_db
+from api.utils.google_id_token import GoogleIdTokenVerifier, GoogleKeySource
+from api.utils.http_client import get_http_client
 from api.utils.loggers import create_logger
 from api.utils.telex_notification import TelexNotification
 from api.v1.models.user import User
 from api.v1.schemas.auth import CreateUser
 from api.v1.services.user import UserService
 from api.v1.services.auth import AuthService
+from api.v1.services.token import TokenService
 
 
 logger = create_logger(__name__)
 
 class GoogleOauthService:
     """Handles database operations for google oauth"""
+    
+    # Replaceable, eg. with a verifier over a StaticKeySource to sign test tokens locally
+    id_token_verifier = GoogleIdTokenVerifier(
+        GoogleKeySource(),
+        audience=config("GOOGLE_CLIENT_ID"),
+    )
 
     @classmethod
-    def authenticate(cls, db: Session, id_token: str):
+    async def authenticate(cls, db: Session, id_token: str):
         """Authenticate user with Google OAuth"""
         
-        profile_endpoint = f'https://www.googleapis.com/oauth2/v3/tokeninfo?id_token={id_token}'
-        profile_response = requests.get(profile_endpoint)
-        
-        if profile_response.status_code != 200:
-            logger.error(f"Failed to fetch user info: {profile_response.text}\nStatus code: {profile_response.status_code}")
-            raise HTTPException(status_code=profile_response.status_code, detail="Invalid token or failed to fetch user info")
-        
-        profile_data = profile_response.json()
+        # The ID token carries the profile, verified locally against Google's signing keys
+        profile_data = await cls.id_token_verifier.verify(id_token)
 
         email = profile_data.get('email')
         user = User.fetch_one_by_field(db=db, throw_error=False, email=email)
@@ -40,11 +42,10 @@ class GoogleOauthService:
                 raise HTTPException(403, "Account is inactive")
             
             # User already exists, return their details
-            access_token = AuthService.create_access_token(db, user_id=user.id)
-            refresh_token = AuthService.create_refresh_token(db, user_id=user.id)
+            access_token, refresh_token = TokenService.issue_token_pair(db, user_id=user.id)
         else:
             # Create user
-            user, access_token, refresh_token = UserService.create(
+            user, access_token, refresh_token = await UserService.create(
                 db=db,
                 payload = CreateUser(
                     email=email,
@@ -61,7 +62,7 @@ class GoogleOauthService:
         return user, access_token, refresh_token
     
     @classmethod
-    def callback(cls, db: Session, request: Request):
+    async def callback(cls, db: Session, request: Request):
         code = request.query_params.get("code")
 
         if not code:
@@ -69,7 +70,7 @@ class GoogleOauthService:
     
         # Exchange the authorization code for an access token
         token_url = "https://oauth2.googleapis.com/token"
-        token_response = requests.post(
+        token_response = await get_http_client().post(
             token_url,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             data={
@@ -89,5 +90,5 @@ class GoogleOauthService:
         id_token = token_data.get("id_token")
         
         # Authenticate user
-        user, access_token, refresh_token = cls.authenticate(db=db, id_token=id_token)
+        user, access_token, refresh_token = await cls.authenticate(db=db, id_token=id_token)
         return user, access_token, refresh_token
@@ -1,3 +1,4 @@
+import sqlalchemy as sa
 from sqlalchemy.orm import Session
 
 from api.utils.loggers import create_logger
@@ -11,12 +12,31 @@ logger = create_logger(__name__)
 
 class ProfileService:
     
+    @classmethod
+    def count_live(cls, model):
+        '''Scalar subquery counting the rows of `model` that are not soft deleted.
+        The filter matches the predicate of the model's partial position index, so
+        the count reads the index instead of the table rows.
+        '''
+        
+        return (
+            sa.select(sa.func.count())
+            .select_from(model)
+            .where(model.is_deleted == False)
+            .scalar_subquery()
+        )
+    
     @classmethod
     def load_properties(cls, db: Session, objs: list):
-        _, _, project_count = Project.fetch_by_field(db, paginate=False)
-        _, _, skill_count = Skill.fetch_by_field(db, paginate=False)
+        profiles = [obj for obj in objs if isinstance(obj, Profile)]
+        if not profiles:
+            return
+        
+        # Both counts in one round trip, without loading any project or skill
+        project_count, skill_count = db.execute(
+            sa.select(cls.count_live(Project), cls.count_live(Skill))
+        ).one()
         
-        for obj in objs:
-            if isinstance(obj, Profile):
-                obj._projects_count = project_count
-                obj._skills_count = skill_count
+        for obj in profiles:
+            obj._projects_count = project_count
+            obj._skills_count = skill_count
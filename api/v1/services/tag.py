@@ -1,7 +1,10 @@
+from datetime import datetime, timezone
 from typing import List
+import sqlalchemy as sa
 from slugify import slugify
 from sqlalchemy.orm import Session
 
+from api.core.base.identifiers import ID_PATTERN, parse_id
 from api.utils.loggers import create_logger
 from api.v1.models.tag import Tag, TagAssociation
 from api.v1.schemas import tag as tag_schemas
@@ -11,6 +14,88 @@ logger = create_logger(__name__)
 
 class TagService:
     
+    @classmethod
+    def build_tag_filter(cls, model, tag_names: List[str], match_all: bool = False):
+        '''Function to build a filter expression matching `model` records tagged with
+        any (or, with `match_all`, every one) of `tag_names`.
+        
+        The filter is a semi-join (`id IN (SELECT entity_id ...)`) served by the
+        (model_type, tag_id, entity_id) index on tag_association, so it can be passed
+        to `fetch_by_field` as `filter_expr` and paginated and counted like any other filter.
+        '''
+        
+        tag_names = list({name.strip().lower() for name in tag_names if name.strip()})
+        
+        entity_ids = (
+            sa.select(TagAssociation.entity_id)
+            .join(Tag, Tag.id == TagAssociation.tag_id)
+            .where(
+                TagAssociation.model_type == model.__tablename__,
+                TagAssociation.is_deleted == False,
+                Tag.name.in_(tag_names),
+                Tag.is_deleted == False,
+            )
+        )
+        
+        if match_all:
+            entity_ids = (
+                entity_ids
+                .group_by(TagAssociation.entity_id)
+                .having(sa.func.count(sa.distinct(Tag.name)) == len(tag_names))
+            )
+        
+        return model.id.in_(entity_ids)
+    
+    @classmethod
+    def resolve_tags(
+        cls,
+        db: Session,
+        tag_ids: List[str],
+        model_type: str,
+        create_missing: bool = False
+    ) -> List[str]:
+        '''Function to resolve tag ids or tag names to the ids of live tags of `model_type`.\n
+        Ids and names are resolved in one query. With `create_missing`, values matching no
+        tag are created as tags named after them in one `ON CONFLICT DO NOTHING` insert and
+        fetched back, so tags created concurrently are picked up instead of duplicated.
+        '''
+        
+        # Ids in any spelling are normalised to the stored form
+        values = {parse_id(value) or value.strip() for value in tag_ids if value.strip()}
+        if not values:
+            return []
+        
+        ids = [value for value in values if ID_PATTERN.match(value)]
+        names = {value.lower() for value in values}
+        
+        tags = db.query(Tag.id, Tag.name).filter(
+            Tag.model_type == model_type,
+            Tag.is_deleted == False,
+            sa.or_(Tag.id.in_(ids), Tag.name.in_(names)),
+        ).all()
+        
+        resolved = {tag.id for tag in tags}
+        found = resolved | {tag.name for tag in tags}
+        missing = {value.lower() for value in values if value not in found and value.lower() not in found}
+        
+        if missing and create_missing:
+            Tag.insert_missing(
+                db,
+                [{'name': name, 'model_type': model_type} for name in missing],
+                conflict_columns=('model_type', 'name'),
+                active_only=True,
+            )
+            
+            resolved.update(db.scalars(
+                sa.select(Tag.id).where(
+                    Tag.model_type == model_type,
+                    Tag.is_deleted == False,
+                    Tag.name.in_(missing),
+                )
+            ))
+        
+        return list(resolved)
+    
     @classmethod
     def create_tag_association(
         cls, 
@@ -19,45 +104,26 @@ class TagService:
         model_type: str,
         entity_id: str
     ):
-        '''Function to create a tag association for an entity'''
-        
-        for tag_id in tag_ids:
-            # Check that tags exist 
-            tag = Tag.fetch_one_by_field(
-                db, 
-                throw_error=False,
-                id=tag_id, 
-                model_type=model_type
-            )
-            
-            # If tag does not exist, skip
-            if not tag:
-                # Assuming the tag id is the name provided
-                tag = Tag.create(
-                    db=db,
-                    name=tag_id.lower(),
-                    model_type=model_type,
-                )
-            
-            tag_association = TagAssociation.fetch_one_by_field(
-                db,
-                throw_error=False,
-                entity_id=entity_id,
-                model_type=model_type,
-                tag_id=tag.id,
-            )
-            
-            # If tag association exists, skip
-            if tag_association:
-                continue
-            
-            # Create template tag association
-            TagAssociation.create(
-                db=db,
-                entity_id=entity_id,
-                tag_id=tag.id,
-                model_type=model_type
-            )
+        '''Function to create tag associations for an entity.\n
+        Each of `tag_ids` is a tag id, or the name of a tag that is created if it does not
+        exist. Tags and associations are inserted in bulk in one transaction, so tagging an
+        entity takes the same few statements whatever the number of tags.
+        '''
+        
+        resolved_ids = cls.resolve_tags(db, tag_ids, model_type, create_missing=True)
+        
+        # Associations that already exist are skipped by the unique index on live rows
+        TagAssociation.insert_missing(
+            db,
+            [
+                {'entity_id': entity_id, 'tag_id': tag_id, 'model_type': model_type}
+                for tag_id in resolved_ids
+            ],
+            conflict_columns=('model_type', 'tag_id', 'entity_id'),
+            active_only=True,
+        )
+        
+        db.commit()
 
     
     @classmethod
@@ -68,32 +134,23 @@ class TagService:
         model_type: str,
         entity_id: str
     ):
-        '''Function to delete a tag association for an entity'''
-        
-        for tag_id in tag_ids:
-            # Check that tags exist 
-            tag = Tag.fetch_one_by_field(
-                db, 
-                throw_error=False,
-                id=tag_id, 
-                model_type=model_type
-            )
-            
-            # If tag does not exist, skip
-            if not tag:
-                continue
-            
-            tag_association = TagAssociation.fetch_one_by_field(
-                db,
-                throw_error=False,
-                entity_id=entity_id,
-                model_type=model_type,
-                tag_id=tag_id,
-            )
-            
-            # If tag association exists, skip
-            if not tag_association:
-                continue
-            
-            # Delete tag association
-            TagAssociation.soft_delete(db, tag_association.id)
+        '''Function to delete tag associations for an entity, in a single update'''
+        
+        resolved_ids = cls.resolve_tags(db, tag_ids, model_type)
+        if not resolved_ids:
+            return
+        
+        db.query(TagAssociation).filter(
+            TagAssociation.entity_id == entity_id,
+            TagAssociation.model_type == model_type,
+            TagAssociation.tag_id.in_(resolved_ids),
+            TagAssociation.is_deleted == False,
+        ).update(
+            {
+                TagAssociation.is_deleted: True,
+                TagAssociation.deleted_at: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+        
+        db.commit()
@@ -1,34 +1,150 @@
 import datetime as dt
-from typing import Optional
+import hashlib
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import sqlalchemy as sa
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 
+from api.core.base.identifiers import generate_id
+from api.db.database import get_db_with_ctx_manager, unit_of_work
+from api.utils.cache import TokenClaimsCache, principal_cache
 from api.utils.loggers import create_logger
 from api.utils.settings import settings
-from api.v1.models.token import BlacklistedToken, Token
+from api.v1.models.token import BlacklistedToken, Token, TokenType
 
 
 logger = create_logger(__name__)
 
+
+class RevokedTokens:
+    """In-process set of the sha256 digests of blacklisted tokens.
+
+    Checking a token is a set lookup instead of a query on the blacklist table.
+    The set is loaded in full on first use, then brought up to date at most every
+    `sync_interval` seconds with the blacklist rows created since the last sync
+    (an indexed range scan that usually returns nothing). Revocations made by this
+    process are added straight away; other workers see them after their next sync.
+    Digests are exact, so a token in the set is revoked without a database check.
+    Entries are kept with their token's expiry and pruned once it has passed, as
+    expired tokens are rejected before the revocation check. Expiries are also kept
+    in a heap, so a prune only visits the entries that have expired.
+    """
+
+    # Re-read rows this far behind the newest seen, so rows committed late with
+    # an earlier `created_at` are not missed
+    SYNC_OVERLAP = dt.timedelta(seconds=60)
+
+    def __init__(self, sync_interval: int):
+        self.sync_interval = sync_interval
+        self._digests: Dict[bytes, Optional[dt.datetime]] = {}
+        # (expiry_time, digest) of the entries that expire, earliest first
+        self._expiries: List[Tuple[dt.datetime, bytes]] = []
+        self._watermark: Optional[dt.datetime] = None
+        self._last_sync: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def _now() -> dt.datetime:
+        # `expiry_time` columns hold naive UTC datetimes
+        return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+    def add(self, token_digest: str, expiry_time: Optional[dt.datetime] = None):
+        with self._lock:
+            self._set(bytes.fromhex(token_digest), expiry_time)
+
+    def _set(self, digest: bytes, expiry_time: Optional[dt.datetime]):
+        # Rows re-read by an overlapping sync are already known and left as they are
+        if digest in self._digests and self._digests[digest] == expiry_time:
+            return
+
+        self._digests[digest] = expiry_time
+        if expiry_time is not None:
+            heapq.heappush(self._expiries, (expiry_time, digest))
+
+    def sync(self, db: Session):
+        """Loads the blacklist rows created since the last sync (all of them on the first)"""
+
+        query = db.query(
+            BlacklistedToken.token_digest,
+            BlacklistedToken.expiry_time,
+            BlacklistedToken.created_at,
+        ).filter(
+            BlacklistedToken.is_deleted == False,
+            BlacklistedToken.token_digest.isnot(None),
+        )
+        if self._watermark is not None:
+            query = query.filter(BlacklistedToken.created_at >= self._watermark - self.SYNC_OVERLAP)
+
+        rows = query.all()
+
+        with self._lock:
+            for row in rows:
+                self._set(bytes.fromhex(row.token_digest), row.expiry_time)
+            self._prune()
+
+            created = [row.created_at for row in rows if row.created_at is not None]
+            if created and (self._watermark is None or max(created) > self._watermark):
+                self._watermark = max(created)
+
+            self._last_sync = time.monotonic()
+
+    def is_revoked(self, db: Session, token: str, token_digest: Optional[str] = None) -> bool:
+        if self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync(db)
+
+        return bytes.fromhex(token_digest or self.digest(token)) in self._digests
+
+    def _prune(self):
+        now = self._now()
+        while self._expiries and self._expiries[0][0] < now:
+            expiry_time, digest = heapq.heappop(self._expiries)
+            # Skip heap entries left behind when a digest was stored again with another expiry
+            if self._digests.get(digest, expiry_time) == expiry_time:
+                self._digests.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._digests.clear()
+            self._expiries.clear()
+            self._watermark = None
+            self._last_sync = None
+
+
+revoked_tokens = RevokedTokens(sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS)
+
+
 class TokenService:
     
+    # Verified claims of recently seen tokens (see `decode_token`)
+    claims_cache = TokenClaimsCache(max_size=settings.TOKEN_CLAIMS_CACHE_SIZE)
+    
     @classmethod
-    def create_token(
+    def encode_token(
         cls, 
-        db: Session, 
         token_type: str, 
         expiry_in_minutes: int,
         user_id: Optional[str]=None,
         payload={}
-    ):
+    ) -> Tuple[str, Dict[str, Any]]:
+        '''Function to sign a token. Returns the token and the values of its `tokens` row'''
         
         expires = dt.datetime.now(dt.timezone.utc) + dt.timedelta(minutes=expiry_in_minutes)
         data = {
             **payload,
             "user_id": user_id, 
             "exp": expires, 
-            "type": token_type
+            "type": token_type,
+            # Unique per token, so a token issued in the same second as the one it
+            # replaces does not encode to the same (now revoked) string
+            "jti": generate_id(),
         }
         
         # Remove user_id from payload if it is None
@@ -37,22 +153,121 @@ class TokenService:
             
         encoded_jwt = jwt.encode(data, settings.SECRET_KEY, settings.ALGORITHM)
         
-        Token.create(
-            db=db,
-            token=encoded_jwt,
-            token_type=token_type,
-            expiry_time=expires,
-            user_id=user_id
-        )
+        return encoded_jwt, {
+            'token': encoded_jwt,
+            'token_type': token_type,
+            'expiry_time': expires.replace(tzinfo=None),
+            'user_id': user_id,
+        }
+    
+    @classmethod
+    def create_token(
+        cls, 
+        db: Session, 
+        token_type: str, 
+        expiry_in_minutes: int,
+        user_id: Optional[str]=None,
+        payload={}
+    ):
+        
+        encoded_jwt, row = cls.encode_token(token_type, expiry_in_minutes, user_id, payload)
+        Token.create(db=db, **row)
+        
         return encoded_jwt
     
+    @classmethod
+    def issue_token_pair(cls, db: Session, user_id: str) -> Tuple[str, str]:
+        '''Function to revoke the user's access and refresh tokens and issue a new pair.\n
+        Revocation and issuance are bulk statements in a single transaction, which also
+        commits the changes already pending on `db` (eg. the user's last_login).
+        Returns the new access and refresh tokens.
+        '''
+        
+        access_token, access_row = cls.encode_token(
+            TokenType.ACCESS.value, settings.ACCESS_TOKEN_EXPIRE_MINUTES, user_id
+        )
+        refresh_token, refresh_row = cls.encode_token(
+            TokenType.REFRESH.value, settings.REFRESH_TOKEN_EXPIRE_MINUTES, user_id
+        )
+        
+        with unit_of_work(db):
+            revoked = cls.revoke_user_tokens(db, user_id, [TokenType.ACCESS.value, TokenType.REFRESH.value])
+            db.execute(sa.insert(Token), [access_row, refresh_row])
+        
+        cls.forget_revoked(revoked)
+        return access_token, refresh_token
+    
+    @classmethod
+    def revoke_user_tokens(cls, db: Session, user_id: str, token_types: List[str]) -> List[Dict[str, Any]]:
+        '''Function to blacklist and delete every token of `token_types` the user holds, with
+        one select, one bulk insert and one bulk delete. Nothing is committed, so the caller
+        passes the returned blacklist entries to `forget_revoked` once it has committed.
+        '''
+        
+        tokens = db.execute(
+            sa.select(Token.id, Token.token, Token.expiry_time)
+            .where(Token.user_id == user_id, Token.token_type.in_(token_types))
+        ).all()
+        
+        if not tokens:
+            return []
+        
+        entries = [
+            {
+                'token': token.token,
+                'token_digest': revoked_tokens.digest(token.token),
+                'user_id': user_id,
+                'expiry_time': token.expiry_time,
+            }
+            for token in tokens
+        ]
+        db.execute(sa.insert(BlacklistedToken), entries)
+        db.execute(sa.delete(Token).where(Token.id.in_([token.id for token in tokens])))
+        
+        return entries
+    
+    @classmethod
+    def forget_revoked(cls, entries: List[Dict[str, Any]]):
+        '''Function to add committed blacklist entries to this process' revoked token set
+        and drop their cached principals
+        '''
+        
+        for entry in entries:
+            revoked_tokens.add(entry['token_digest'], entry['expiry_time'])
+            principal_cache.invalidate(entry['token_digest'])
+            cls.claims_cache.invalidate(entry['token_digest'])
+    
     @classmethod
     def revoke_token(cls, db: Session, token: str, user_id: str):
         """Function to revoke token"""
         
         token_obj = Token.fetch_one_by_field(db=db, token=token)
-        BlacklistedToken.create(db=db, token=token_obj.token, user_id=user_id)
+        cls.blacklist_token(db, token_obj.token, user_id, expiry_time=token_obj.expiry_time)
         Token.hard_delete(db=db, id=token_obj.id)
+    
+    @classmethod
+    def blacklist_token(
+        cls,
+        db: Session,
+        token: str,
+        user_id: Optional[str] = None,
+        expiry_time: Optional[dt.datetime] = None
+    ):
+        """Function to blacklist a token and add it to this process' revoked token set.\n
+        `expiry_time` is the token's own expiry, after which the entry can be purged.
+        """
+        
+        token_digest = revoked_tokens.digest(token)
+        BlacklistedToken.create(
+            db=db,
+            token=token,
+            token_digest=token_digest,
+            user_id=user_id,
+            expiry_time=expiry_time,
+        )
+        revoked_tokens.add(token_digest, expiry_time)
+        principal_cache.invalidate(token_digest)
+        cls.claims_cache.invalidate(token_digest)
         
         
     @classmethod
@@ -67,10 +282,90 @@ class TokenService:
         
         if existing_token:
             # Blacklist the token and delete it
-            BlacklistedToken.create(db=db, token=existing_token.token, user_id=user_id)
+            cls.blacklist_token(db, existing_token.token, user_id, expiry_time=existing_token.expiry_time)
             Token.hard_delete(db, existing_token.id)
 
     
+    @classmethod
+    def delete_expired(cls, db: Session, model, batch_size: int) -> int:
+        '''Function to delete the rows of `model` (Token or BlacklistedToken) whose token has
+        expired, `batch_size` rows per transaction. Returns the number of rows deleted.
+        '''
+        
+        now = RevokedTokens._now()
+        total = 0
+        
+        while True:
+            ids = db.scalars(
+                sa.select(model.id)
+                .where(model.expiry_time < now)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            
+            if not ids:
+                break
+            
+            db.execute(sa.delete(model).where(model.id.in_(ids)))
+            db.commit()
+            
+            total += len(ids)
+            
+            if len(ids) < batch_size:
+                break
+        
+        return total
+    
+    @classmethod
+    def purge_expired(cls, db: Session, batch_size: Optional[int] = None) -> Dict[str, int]:
+        '''Function to delete expired tokens and the blacklist entries of expired tokens.\n
+        A blacklist entry is useless once its token has expired, since expired tokens are
+        rejected before the blacklist is checked. Returns the number of rows deleted per table.
+        '''
+        
+        batch_size = batch_size or settings.TOKEN_GC_BATCH_SIZE
+        started = time.perf_counter()
+        
+        removed = {
+            model.__tablename__: cls.delete_expired(db, model, batch_size)
+            for model in (Token, BlacklistedToken)
+        }
+        
+        logger.info(
+            f'Purged {removed[Token.__tablename__]} expired tokens and '
+            f'{removed[BlacklistedToken.__tablename__]} expired blacklist entries '
+            f'in {(time.perf_counter() - started) * 1000:.1f}ms'
+        )
+        
+        return removed
+    
+    @classmethod
+    def purge_expired_in_background(cls):
+        '''Function to run `purge_expired` with its own session, eg. from a scheduled task'''
+        
+        with get_db_with_ctx_manager() as db:
+            return cls.purge_expired(db)
+    
+    @classmethod
+    def decode_token(cls, token: str, token_digest: Optional[str] = None) -> Dict[str, Any]:
+        '''Function to verify a token's signature and expiry and return its claims.\n
+        Claims are memoized in `claims_cache` until the token expires, so a token seen
+        again skips the signature check. Revocation is not checked here.
+        Raises JWTError if the token is missing or invalid.
+        '''
+        
+        if not token:
+            raise JWTError('Token is missing')
+        
+        token_digest = token_digest or revoked_tokens.digest(token)
+        
+        claims = cls.claims_cache.get(token_digest)
+        if claims is None:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            cls.claims_cache.put(token_digest, claims)
+        
+        return claims
+    
     @classmethod
     def decode_and_verify_token(
         cls, 
@@ -78,24 +373,27 @@ class TokenService:
         token: str, 
         expected_token_type: str,
         credentials_exception,
-        check_user_id_in_payload: bool = True
+        check_user_id_in_payload: bool = True,
+        token_digest: Optional[str] = None
     ):
-        '''Function to decode and verify a token'''
+        '''Function to decode and verify a token. `token_digest` saves hashing the token
+        again when the caller already has it.
+        '''
         
         try:
-            payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-            )
+            if not token:
+                raise JWTError('Token is missing')
+            
+            token_digest = token_digest or revoked_tokens.digest(token)
+            payload = cls.decode_token(token, token_digest)
             user_id = payload.get("user_id")
             jwt_payload_token_type = payload.get("type")
             
-            # Check if token is blackliosted
-            blacklisted_token = BlacklistedToken.fetch_one_by_field(db=db, throw_error=False, token=token)
-
             if check_user_id_in_payload and not user_id:
                 raise credentials_exception
             
-            if blacklisted_token is not None:
+            # Check if token is blacklisted
+            if revoked_tokens.is_revoked(db, token, token_digest):
                 raise credentials_exception
                 
             if jwt_payload_token_type != expected_token_type:
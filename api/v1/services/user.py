@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import BackgroundTasks, HTTPException
 from sqlalchemy.orm import Session
 
@@ -14,7 +15,7 @@ logger = create_logger(__name__)
 
 class UserService:
     @classmethod
-    def create(cls, db: Session, payload: CreateUser, bg_tasks: BackgroundTasks):
+    async def create(cls, db: Session, payload: CreateUser, bg_tasks: Optional[BackgroundTasks] = None):
         """Creates a new user"""
         
         payload.email = payload.email.lower().strip()
@@ -22,23 +23,24 @@ class UserService:
         if user_with_email_exists:
             raise HTTPException(400, 'User with email already exist')
         
-        payload.password = AuthService.hash_secret(payload.password) if payload.password else None
+        payload.password = await AuthService.hash_password(payload.password) if payload.password else None
         
+        # Committed together with the user's first tokens
         new_user = User.create(
             db=db,
+            commit=False,
             **payload.model_dump(exclude_unset=True),
         )
         
-        access_token = AuthService.create_access_token(db, new_user.id)
-        refresh_token = AuthService.create_refresh_token(db, new_user.id)
+        access_token, refresh_token = TokenService.issue_token_pair(db, new_user.id)
         
         return new_user, access_token, refresh_token
     
     @classmethod
-    def verify_password_change(cls, db: Session, email: str, old_password: str, new_password: str):
+    async def verify_password_change(cls, db: Session, email: str, old_password: str, new_password: str):
         """Fucntion to change user password"""
         
-        user, _, _ = AuthService.authenticate(
+        user, _, _ = await AuthService.authenticate(
             db, 
             email=email, 
             password=old_password, 
@@ -48,7 +50,7 @@ class UserService:
         if new_password == old_password:
             raise HTTPException(400, 'New and old password cannot be the same')
         
-        password_hash = AuthService.hash_secret(new_password)
+        password_hash = await AuthService.hash_password(new_password)
         
         return password_hash
     
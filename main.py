@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import uvicorn, os, time
 from typing import Optional
@@ -10,19 +11,24 @@ from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, status
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware  # required by google oauth
 from decouple import config
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
-from api.db.database import create_database, get_db
+from api.db.database import create_database, get_db, get_db_with_ctx_manager
+from api.db.instrumentation import report_query_stats, start_query_stats, stop_query_stats
+from api.utils.http_client import close_http_client
 from api.utils.loggers import create_logger
 from api.utils.log_streamer import log_streamer
+from api.utils.password_hasher import password_hasher
+from api.utils.rate_limiter import limiter
 from api.utils.responses import success_response
 from api.utils.telex_notification import TelexNotification
 from api.v1.routes import v1_router
+from api.v1.services.token import TokenService, revoked_tokens
 from api.utils.settings import settings
 
 
@@ -31,16 +37,60 @@ create_database()
 logger = create_logger(__name__, log_file='logs/error.log')
 # performance_logger = create_logger(__name__, log_file='logs/performance.log')
 
+async def purge_expired_tokens_periodically(interval_minutes: int):
+    '''Purges expired tokens and blacklist entries every `interval_minutes`, off the event loop'''
+    
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await run_in_threadpool(TokenService.purge_expired_in_background)
+        except Exception as e:
+            logger.error(f'Could not purge expired tokens: {e}')
+
+
+async def report_password_hasher_stats_periodically(interval_seconds: int):
+    '''Logs the password hashing pool's queue depth every `interval_seconds`'''
+    
+    while True:
+        await asyncio.sleep(interval_seconds)
+        password_hasher.report_stats()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Load the revoked token set before the first authenticated request. If the
+    # database is unreachable it is loaded by the first token check instead.
+    try:
+        with get_db_with_ctx_manager() as db:
+            revoked_tokens.sync(db)
+    except Exception as e:
+        logger.error(f'Could not load revoked tokens at startup: {e}')
+    
+    token_gc = None
+    if settings.TOKEN_GC_INTERVAL_MINUTES > 0:
+        token_gc = asyncio.create_task(purge_expired_tokens_periodically(settings.TOKEN_GC_INTERVAL_MINUTES))
+    
+    hasher_stats = None
+    if settings.PASSWORD_HASH_STATS_INTERVAL_SECONDS > 0:
+        hasher_stats = asyncio.create_task(
+            report_password_hasher_stats_periodically(settings.PASSWORD_HASH_STATS_INTERVAL_SECONDS)
+        )
+    
     yield
+    
+    if token_gc is not None:
+        token_gc.cancel()
+    
+    if hasher_stats is not None:
+        hasher_stats.cancel()
+    
+    await close_http_client()
 
 app = FastAPI(
     lifespan=lifespan,
     title='API Documentation'
 )
 
-limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -69,15 +119,28 @@ app.add_middleware(
 async def log_requests(request: Request, call_next):
     # Capture request start time
     start_time = time.time()
+    
+    # Record the queries issued while handling the request
+    query_stats, query_stats_token = start_query_stats()
 
     # Process the request
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    finally:
+        stop_query_stats(query_stats_token)
 
     # Calculate processing time
     process_time = time.time() - start_time
     formatted_process_time = f"{process_time:.3f}s"
     
     response.headers["X-Process-Time"] = formatted_process_time
+    
+    if settings.PYTHON_ENV == 'dev':
+        response.headers["X-DB-Query-Count"] = str(query_stats.count)
+        response.headers["X-DB-Time"] = f"{query_stats.duration * 1000:.1f}ms"
+        response.headers["X-DB-Max-Repeats"] = str(query_stats.max_repeats)
+    
+    report_query_stats(query_stats, request.method, request.url.path)
 
     # Capture request and response details
     client_ip = request.client.host
@@ -0,0 +1,163 @@
+"""Prints the query plans of the hot list and lookup queries on a seeded dataset.
+
+Used to check that the composite and partial (`WHERE is_deleted = false`)
+indexes are picked up by the planner. The tables are created, seeded and
+dropped again in the database at `--url` (an in-memory sqlite database by
+default). Any other database must be an empty scratch one: `--scratch` is
+required, and the script refuses to run if the app's tables already exist.
+
+Usage:
+    python scripts/benchmarks/explain_hot_queries.py [rows] [--url URL --scratch]
+"""
+
+import sys
+import pathlib
+import argparse
+import sqlalchemy as sa
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+
+# ADD PROJECT ROOT TO IMPORT SEARCH SCOPE
+sys.path.append(str(ROOT_DIR))
+
+from api.db.database import Base
+from api.v1.models import File, Project, Tag, TagAssociation
+from api.v1.models.token import Token
+
+
+def seed(db, rows: int):
+    tags = [Tag(name=f'tag-{i}', model_type='projects') for i in range(10)]
+    db.add_all(tags)
+    db.flush()
+
+    for i in range(rows):
+        project = Project(
+            name=f'Project {i}',
+            slug=f'project-{i}',
+            domain='web',
+            project_type='api',
+            role='backend',
+            position=i,
+            # Roughly one in ten rows is soft deleted
+            is_deleted=i % 10 == 0,
+        )
+        db.add(project)
+        db.flush()
+
+        for j in range(3):
+            db.add(File(
+                file_name=f'file-{i}-{j}.png',
+                file_path=f'filestorage/projects/{project.id}/file-{i}-{j}.png',
+                file_size=1024,
+                model_name='projects',
+                model_id=project.id,
+                url=f'https://example.com/file-{i}-{j}.png',
+                position=j,
+            ))
+
+        for tag in tags[i % 7:i % 7 + 3]:
+            db.add(TagAssociation(entity_id=project.id, tag_id=tag.id, model_type='projects'))
+
+        for token_type in ('access', 'refresh'):
+            db.add(Token(token=f'{token_type}-{i}', token_type=token_type, user_id=project.id, expiry_time=project.created_at))
+
+    db.commit()
+
+
+def hot_queries(db):
+    project = db.query(Project).filter(Project.is_deleted == False).order_by(Project.position).offset(5).first()
+
+    return {
+        'projects list (is_deleted = false ORDER BY position)': (
+            db.query(Project)
+            .filter(Project.is_deleted == False)
+            .order_by(Project.position)
+            .limit(10)
+        ),
+        'files of an entity (ORDER BY position)': (
+            db.query(File)
+            .filter(File.is_deleted == False, File.model_name == 'projects', File.model_id == project.id)
+            .order_by(File.position)
+        ),
+        'tag associations of an entity': (
+            db.query(TagAssociation.tag_id)
+            .filter(
+                TagAssociation.entity_id == project.id,
+                TagAssociation.model_type == 'projects',
+                TagAssociation.is_deleted == False,
+            )
+        ),
+        'token by user and type': (
+            db.query(Token)
+            .filter(Token.user_id == project.id, Token.token_type == 'access', Token.is_deleted == False)
+        ),
+    }
+
+
+def explain(db, query) -> list:
+    dialect = db.get_bind().dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        return [row[-1] for row in db.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+    return [row[0] for row in db.execute(text(f'EXPLAIN {sql}'))]
+
+
+def is_in_memory(engine) -> bool:
+    return engine.url.get_backend_name() == 'sqlite' and engine.url.database in (None, '', ':memory:')
+
+
+def check_scratch(engine, scratch: bool):
+    """Refuses to seed a database that is not an explicit, empty scratch database,
+    as its tables are dropped at the end of the run
+    """
+    
+    if is_in_memory(engine):
+        return
+    
+    if not scratch:
+        sys.exit(f'{engine.url!r} is not an in-memory database, pass --scratch to confirm it is a scratch one')
+    
+    existing = set(sa.inspect(engine).get_table_names()) & set(Base.metadata.tables)
+    if existing:
+        sys.exit(f'{engine.url!r} already has tables of the app ({", ".join(sorted(existing))}), refusing to use it')
+
+
+def run(rows: int = 2000, url: str = 'sqlite://', scratch: bool = False):
+    engine = create_engine(url)
+    check_scratch(engine, scratch)
+    
+    # None of these existed (see check_scratch), so dropping them only removes what this run created
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    try:
+        seed(db, rows)
+        db.execute(text('ANALYZE'))
+
+        for name, query in hot_queries(db).items():
+            print(f'-- {name}')
+            for line in explain(db, query):
+                print(f'   {line}')
+            print()
+    finally:
+        db.close()
+        if not is_in_memory(engine):
+            Base.metadata.drop_all(bind=engine)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Print the query plans of the hot queries on a seeded dataset')
+    parser.add_argument('rows', type=int, nargs='?', default=2000)
+    parser.add_argument('--url', default='sqlite://', help='Database to seed (default: in-memory sqlite)')
+    parser.add_argument('--scratch', action='store_true', help='Confirm --url is a scratch database whose tables can be dropped')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    run(args.rows, args.url, args.scratch)
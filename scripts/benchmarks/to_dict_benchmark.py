@@ -0,0 +1,110 @@
+"""Benchmarks `BaseTableModel.to_dict` against the previous per-instance implementation.
+
+Seeds an in-memory sqlite database with a page of files (the shape served by
+`GET /files`) and projects with tags attached, then times serializing them
+with both implementations.
+
+Usage:
+    python scripts/benchmarks/to_dict_benchmark.py [rows] [repeats]
+"""
+
+import sys
+import pathlib
+import timeit
+from inspect import getmembers
+from sqlalchemy import create_engine
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import sessionmaker
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+
+# ADD PROJECT ROOT TO IMPORT SEARCH SCOPE
+sys.path.append(str(ROOT_DIR))
+
+from api.db.database import Base
+from api.v1.models import File, Project, Tag, TagAssociation
+
+
+def legacy_to_dict(obj, excludes=[]):
+    """The implementation `to_dict` used before serializer plans"""
+
+    obj_dict = obj.__dict__.copy()
+
+    del obj_dict["_sa_instance_state"]
+    del obj_dict["is_deleted"]
+    obj_dict["id"] = obj.id
+
+    if obj.created_at:
+        obj_dict["created_at"] = obj.created_at.isoformat()
+    if obj.updated_at:
+        obj_dict["updated_at"] = obj.updated_at.isoformat()
+
+    for name, attr in getmembers(obj):
+        if isinstance(attr, hybrid_property):
+            obj_dict[name] = getattr(obj, name)
+
+    for exclude in excludes:
+        if exclude in list(obj_dict.keys()):
+            obj_dict.pop(exclude, None)
+
+    return obj_dict
+
+
+def seed(db, rows: int):
+    tags = [Tag(name=f'tag-{i}', model_type='projects') for i in range(5)]
+    db.add_all(tags)
+    db.flush()
+
+    for i in range(rows):
+        db.add(File(
+            file_name=f'file-{i}.png',
+            file_path=f'filestorage/projects/file-{i}.png',
+            file_size=1024,
+            model_name='projects',
+            url=f'https://example.com/file-{i}.png',
+            position=i,
+        ))
+
+        project = Project(
+            name=f'Project {i}',
+            slug=f'project-{i}',
+            domain='web',
+            project_type='api',
+            role='backend',
+            tools=['fastapi', 'postgres'],
+            position=i,
+        )
+        db.add(project)
+        db.flush()
+
+        for tag in tags:
+            db.add(TagAssociation(entity_id=project.id, tag_id=tag.id, model_type='projects'))
+
+    db.commit()
+
+
+def run(rows: int = 500, repeats: int = 20):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    seed(db, rows)
+
+    for model in (File, Project):
+        objs = db.query(model).all()
+
+        legacy = min(timeit.repeat(lambda: [legacy_to_dict(obj) for obj in objs], number=1, repeat=repeats))
+        compiled = min(timeit.repeat(lambda: [obj.to_dict() for obj in objs], number=1, repeat=repeats))
+
+        print(
+            f'{model.__tablename__:<10} rows={len(objs):<6} '
+            f'legacy={legacy * 1000:8.2f}ms  compiled={compiled * 1000:8.2f}ms  '
+            f'speedup={legacy / compiled:5.1f}x'
+        )
+
+    db.close()
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
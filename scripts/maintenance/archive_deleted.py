@@ -0,0 +1,64 @@
+"""Archives (or purges) soft deleted rows older than the retention window, and restores them.
+
+Rows soft deleted more than SOFT_DELETE_RETENTION_DAYS ago are copied to
+`archived_records` and removed from their table, ARCHIVE_BATCH_SIZE rows per
+transaction. Link tables (tag/category associations) are purged without
+being archived. Meant to be run periodically, eg. from cron.
+
+Usage:
+    python scripts/maintenance/archive_deleted.py [--retention-days N] [--batch-size N] [--tables t1,t2]
+    python scripts/maintenance/archive_deleted.py restore <table_name> <record_id>
+"""
+
+import sys
+import pathlib
+import argparse
+from fastapi import HTTPException
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+
+# ADD PROJECT ROOT TO IMPORT SEARCH SCOPE
+sys.path.append(str(ROOT_DIR))
+
+from api.db.database import get_db_with_ctx_manager
+from api.utils import helpers
+from api.v1.models import *
+from api.v1.services.archive import ArchiveService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Archive, purge or restore soft deleted rows')
+    parser.add_argument('--retention-days', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--tables', default=None, help='Comma separated table names (defaults to all)')
+
+    subparsers = parser.add_subparsers(dest='command')
+    restore = subparsers.add_parser('restore', help='Restore a deleted or archived record')
+    restore.add_argument('table_name')
+    restore.add_argument('record_id')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    with get_db_with_ctx_manager() as db:
+        if args.command == 'restore':
+            try:
+                obj = ArchiveService.restore(db, args.table_name, args.record_id)
+            except HTTPException as e:
+                print(e.detail)
+                sys.exit(1)
+            print(f'Restored {args.table_name} {obj.id}')
+        else:
+            removed = ArchiveService.archive_all(
+                db,
+                retention_days=args.retention_days,
+                batch_size=args.batch_size,
+                table_names=helpers.parse_csv(args.tables) or None,
+            )
+            for table_name, count in removed.items():
+                if count:
+                    print(f'{table_name}: {count}')
+            print(f'Removed {sum(removed.values())} soft deleted rows')
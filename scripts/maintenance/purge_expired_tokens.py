@@ -0,0 +1,40 @@
+"""Deletes expired tokens and the blacklist entries of expired tokens.
+
+Rows are deleted TOKEN_GC_BATCH_SIZE at a time, each batch in its own
+transaction. The API also runs this every TOKEN_GC_INTERVAL_MINUTES; the
+script is for deployments that disable that and schedule it, eg. from cron.
+
+Usage:
+    python scripts/maintenance/purge_expired_tokens.py [--batch-size N]
+"""
+
+import sys
+import pathlib
+import argparse
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+
+# ADD PROJECT ROOT TO IMPORT SEARCH SCOPE
+sys.path.append(str(ROOT_DIR))
+
+from api.db.database import get_db_with_ctx_manager
+from api.v1.models import *
+from api.v1.services.token import TokenService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Purge expired tokens and blacklist entries')
+    parser.add_argument('--batch-size', type=int, default=None)
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    with get_db_with_ctx_manager() as db:
+        removed = TokenService.purge_expired(db, batch_size=args.batch_size)
+
+    for table_name, count in removed.items():
+        print(f'{table_name}: {count}')
+    print(f'Removed {sum(removed.values())} expired rows')